@@ -28,5 +28,6 @@ cd build
 cmake -D CMAKE_BUILD_TYPE=Release \
       -D BUILD_MPI=ON \
       -D PKG_ML-PACE=ON \
+      -D PKG_MANYBODY=ON \
       ../cmake
 cmake --build . -- -j 32
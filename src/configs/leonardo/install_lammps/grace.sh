@@ -38,6 +38,7 @@ cd build
 cmake -D CMAKE_BUILD_TYPE=Release \
       -D BUILD_MPI=ON \
       -D PKG_ML-PACE=ON \
+      -D PKG_MANYBODY=ON \
       -D PKG_MC=ON \
       -C ../cmake/presets/nvhpc.cmake \
       ../cmake
@@ -32,6 +32,7 @@ cd build
 cmake -D CMAKE_BUILD_TYPE=Release \
       -D BUILD_MPI=ON \
       -D PKG_ML-PACE=ON \
+      -D PKG_MANYBODY=ON \
       -D PKG_MC=ON \
       ../cmake
 cmake --build . -- -j 32
\ No newline at end of file
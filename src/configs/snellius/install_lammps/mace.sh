@@ -45,6 +45,7 @@ cmake -D CMAKE_INSTALL_PREFIX=$(pwd) \
       -D BUILD_OMP=ON \
       -D PKG_OPENMP=ON \
       -D PKG_ML-MACE=ON \
+      -D PKG_MANYBODY=ON \
       -D CMAKE_PREFIX_PATH=$(pwd)/../../libtorch \
       ../cmake
 cmake --build . -- -j 32
@@ -5,10 +5,17 @@ This module contains the ConfigReader class which is used to read the configurat
 from .config_reader import (
     ConfigReader,
     BenchConfig,
+    PropSimConfig,
+    ScreeningConfig,
+    PairTuneConfig,
+    LayoutTuneConfig,
     ExperimentConfig,
     HyperConfig,
+    EvaluationConfig,
+    ThroughputTuneConfig,
     DeepTrainConfig,
     JobConfig,
     MainSectionKW,
     GeneralKW,
+    COMPILE_CACHE_DIR_NAME,
     )
@@ -7,6 +7,8 @@ from enum import Enum
 
 import hjson # type: ignore
 
+COMPILE_CACHE_DIR_NAME: str = 'compile_cache'
+
 class MainSectionKW(Enum):
     """
     Main sections of the configuration file.
@@ -19,6 +21,11 @@ class MainSectionKW(Enum):
     HARD_SPLIT_SCREW = 'hard_split_screw'
     DISCLOCATIONS = 'dislocations'
     CRACKS = 'cracks'
+    SCREENING = 'screening'
+    PAIR_TUNING = 'pair_tuning'
+    LAYOUT_TUNING = 'layout_tuning'
+    EVALUATION = 'evaluation'
+    THROUGHPUT_TUNING = 'throughput_tuning'
 
 class SlurmJobKW(Enum):
     """
@@ -28,6 +35,8 @@ class SlurmJobKW(Enum):
     SLURM_OPTS = 'slurm_opts'
     MODULES = 'modules'
     PY_SCRIPTS = 'py_scripts'
+    STAGING = 'staging'
+    STAGING_INTERVAL = 'staging_interval'
 
 class GeneralKW(Enum):
     """
@@ -42,12 +51,22 @@ class GeneralKW(Enum):
     REPO_PATH = 'repo_path'
     PRETRAINED_PATH = 'pretrained_path'
     PYTHON_BIN = 'python_bin'
+    RESULT_STORE_PATH = 'result_store_path'
+    LINK_MODE = 'link_mode'
+    Q_PREDICTOR_PATH = 'q_predictor_path'
+    Q_PREDICTOR_MARGIN = 'q_predictor_margin'
+    HISTORY_PATH = 'history_path'
+    COMPILE_CACHE = 'compile_cache'
 
 class DeepTrainKW(Enum):
     """
     Deep training keywords for the configuration file.
     """
     MAX_EPOCHS = 'max_epochs'
+    DISTRIBUTED = 'distributed'
+    BACKEND = 'backend'
+    PARITY_EPOCHS = 'parity_epochs'
+    PARITY_TOLERANCE = 'parity_tolerance'
 
 class InferenceKW(Enum):
     """
@@ -55,11 +74,22 @@ class InferenceKW(Enum):
     """
     PRE_STEPS = 'prerun_steps'
     MAX_STEPS = 'max_steps'
+    SCALING_SIZES = 'scaling_sizes'
+    SCALING_LAYOUTS = 'scaling_layouts'
+    REPETITIONS = 'repetitions'
+    WARMUP_REPS = 'warmup_repetitions'
+    PAIRED = 'paired'
+    MEMORY_SIZES = 'memory_sizes'
+    MEMORY_STEPS = 'memory_steps'
+    WORKLOADS = 'workloads'
+    REFERENCE_POTENTIAL = 'reference_potential'
+    REFERENCE_PAIR_STYLE = 'reference_pair_style'
 
 class PropSimKW(Enum):
     """
     Keywords for the property simulation configuration.
     """
+    SCAN_CHUNKS = 'scan_chunks'
 
 class HardSplitKW(Enum):
     """
@@ -76,6 +106,52 @@ class CracksKW(Enum):
     Keywords for the cracks configuration.
     """
 
+class ScreeningKW(Enum):
+    """
+    Keywords for the screening configuration.
+    """
+    A0_TOL = 'a0_tolerance'
+    ELASTIC_TOL = 'elastic_tolerance'
+    MAX_DRIFT = 'max_energy_drift'
+    NVE_STEPS = 'nve_steps'
+
+class PairTuneKW(Enum):
+    """
+    Keywords for the pair style tuning configuration.
+    """
+    PRE_STEPS = 'prerun_steps'
+    STEPS = 'steps'
+    SKINS = 'skins'
+    OMP = 'omp'
+
+class LayoutTuneKW(Enum):
+    """
+    Keywords for the thread/rank layout tuning configuration.
+    """
+    PRE_STEPS = 'prerun_steps'
+    STEPS = 'steps'
+    LAYOUTS = 'layouts'
+    BINDINGS = 'bindings'
+
+class EvaluationKW(Enum):
+    """
+    Keywords for the evaluation on a common test set.
+    """
+    TEST_PATH = 'test_path'
+    BATCH_SIZE = 'batch_size'
+    ENERGY_KEY = 'energy_key'
+    FORCES_KEY = 'forces_key'
+
+class ThroughputTuneKW(Enum):
+    """
+    Keywords for the training throughput tuning configuration.
+    """
+    MAXITER = 'maxiter'
+    KNOBS = 'knobs'
+    CPU = 'cpu'
+    REPEATS = 'repeats'
+    NOISE_MARGIN = 'noise_margin'
+
 class HyperSearchKW(Enum):
     """
     Keywords for the hyperparameter search configuration.
@@ -87,6 +163,7 @@ class HyperSearchKW(Enum):
     ENERGY_WEIGHT = 'energy_weight'
     OPTIMIZER_PARAMS = 'optimizer_params'
     HANDLE_COLLECT_ERRORS = 'handle_collect_errors'
+    PREPARE_DATA = 'prepare_data'
 
 class JobConfig():
     """
@@ -98,7 +175,10 @@ class JobConfig():
                  py_scripts: list[Path],
                  cluster: str,
                  ntasks: int = 1,
-                 cpus_per_task: int = 1,):
+                 cpus_per_task: int = 1,
+                 staging: bool = False,
+                 staging_interval: int = 600,
+                 compile_cache_path: Path | None = None,):
         self.slurm_watcher: dict = slurm_watcher
         self.slurm_opts: dict = slurm_opts
         self.modules: list[Path] = modules
@@ -106,6 +186,9 @@ class JobConfig():
         self.cluster: str = cluster
         self.ntasks: int = ntasks
         self.cpus_per_task: int = cpus_per_task
+        self.staging: bool = staging
+        self.staging_interval: int = staging_interval
+        self.compile_cache_path: Path | None = compile_cache_path
 
 class ExperimentConfig():
     """
@@ -128,11 +211,121 @@ class BenchConfig():
     """
     def __init__(self, prerun_steps: int,
                  max_steps: int,
+                 scaling_sizes: list[list[int]],
+                 scaling_layouts: list[list[int]],
+                 repetitions: int,
+                 warmup_repetitions: int,
+                 paired: bool,
+                 memory_sizes: list[list[int]],
+                 memory_steps: int,
+                 workloads: list[str],
+                 reference_potential: Path | None,
+                 reference_pair_style: str,
                  experiment_config: ExperimentConfig,):
         self.prerun_steps: int = prerun_steps
         self.max_steps: int = max_steps
+        self.scaling_sizes: list[list[int]] = scaling_sizes
+        self.scaling_layouts: list[list[int]] = scaling_layouts
+        self.repetitions: int = repetitions
+        self.warmup_repetitions: int = warmup_repetitions
+        self.paired: bool = paired
+        self.memory_sizes: list[list[int]] = memory_sizes
+        self.memory_steps: int = memory_steps
+        self.workloads: list[str] = workloads
+        self.reference_potential: Path | None = reference_potential
+        self.reference_pair_style: str = reference_pair_style
         self.experiment_config: ExperimentConfig = experiment_config
 
+class PropSimConfig():
+    """
+    Configuration class for the properties simulation step.
+    """
+    def __init__(self, scan_chunks: int,
+                 experiment_config: ExperimentConfig,):
+        self.scan_chunks: int = scan_chunks
+        self.experiment_config: ExperimentConfig = experiment_config
+
+class ScreeningConfig():
+    """
+    Configuration class for the screening step.
+    """
+    def __init__(self, a0_tolerance: float,
+                 elastic_tolerance: float,
+                 max_energy_drift: float,
+                 nve_steps: int,
+                 experiment_config: ExperimentConfig,):
+        self.a0_tolerance: float = a0_tolerance
+        self.elastic_tolerance: float = elastic_tolerance
+        self.max_energy_drift: float = max_energy_drift
+        self.nve_steps: int = nve_steps
+        self.experiment_config: ExperimentConfig = experiment_config
+
+class PairTuneConfig():
+    """
+    Configuration class for the pair style tuning step.
+    """
+    def __init__(self, prerun_steps: int,
+                 steps: int,
+                 skins: list[float],
+                 omp: bool,
+                 experiment_config: ExperimentConfig,):
+        self.prerun_steps: int = prerun_steps
+        self.steps: int = steps
+        self.skins: list[float] = skins
+        self.omp: bool = omp
+        self.experiment_config: ExperimentConfig = experiment_config
+
+class LayoutTuneConfig():
+    """
+    Configuration class for the thread/rank layout tuning step.
+    """
+    def __init__(self, prerun_steps: int,
+                 steps: int,
+                 layouts: list[str],
+                 bindings: list[str],
+                 experiment_config: ExperimentConfig,):
+        self.prerun_steps: int = prerun_steps
+        self.steps: int = steps
+        self.layouts: list[str] = layouts
+        self.bindings: list[str] = bindings
+        self.experiment_config: ExperimentConfig = experiment_config
+
+class EvaluationConfig():
+    """
+    Configuration class for the evaluation on a common test set.
+    """
+    def __init__(self, test_path: Path,
+                 batch_size: int,
+                 energy_key: str,
+                 forces_key: str,
+                 sweep_path: Path,
+                 model_name: str,
+                 job_config: JobConfig,):
+        self.test_path: Path = test_path
+        self.batch_size: int = batch_size
+        self.energy_key: str = energy_key
+        self.forces_key: str = forces_key
+        self.sweep_path: Path = sweep_path
+        self.model_name: str = model_name
+        self.job_config: JobConfig = job_config
+
+class ThroughputTuneConfig():
+    """
+    Configuration class for the training throughput tuning.
+    """
+    def __init__(self, maxiter: int,
+                 knobs: dict[str, list],
+                 cpu: bool,
+                 job_config: JobConfig,
+                 repeats: int = 2,
+                 noise_margin: float = 0.05,):
+        self.maxiter: int = maxiter
+        self.knobs: dict[str, list] = knobs
+        self.cpu: bool = cpu
+        self.job_config: JobConfig = job_config
+        self.repeats: int = repeats
+        self.noise_margin: float = noise_margin
+
 class HyperConfig():
     """
     Configuration class for the hyperparameter search.
@@ -146,7 +339,8 @@ class HyperConfig():
                  energy_weight: float,
                  optimizer_params: dict,
                  job_config: JobConfig,
-                 handle_collect_errors: bool,):
+                 handle_collect_errors: bool,
+                 prepare_data: bool = False,):
         self.model_name: str = model_name
         self.sweep_path: Path = sweep_path
         self.max_iter: int = max_iter
@@ -157,6 +351,7 @@ class HyperConfig():
         self.optimizer_params: dict = optimizer_params
         self.job_config: JobConfig = job_config
         self.handle_collect_errors: bool = handle_collect_errors
+        self.prepare_data: bool = prepare_data
 
 class DeepTrainConfig():
     """
@@ -167,13 +362,21 @@ class DeepTrainConfig():
                  job_config: JobConfig,
                  model_name: str,
                  energy_weight: float,
-                 best_n_models: int):
+                 best_n_models: int,
+                 distributed: bool = False,
+                 backend: str = 'nccl',
+                 parity_epochs: int = 0,
+                 parity_tolerance: float = 0.05):
         self.max_epochs: int = max_epochs
         self.sweep_path: Path = sweep_path
         self.job_config: JobConfig = job_config
         self.model_name: str = model_name
         self.energy_weight: float = energy_weight
         self.best_n_models: int = best_n_models
+        self.distributed: bool = distributed
+        self.backend: str = backend
+        self.parity_epochs: int = parity_epochs
+        self.parity_tolerance: float = parity_tolerance
 
 class GeneralConfig():
     """
@@ -188,7 +391,13 @@ class GeneralConfig():
                  sweep_path: Path,
                  job_config: JobConfig,
                  repo_path: Path,
-                 pretrained_path: Path | None = None,):
+                 pretrained_path: Path | None = None,
+                 result_store_path: Path | None = None,
+                 link_mode: str = 'copy',
+                 q_predictor_path: Path | None = None,
+                 q_predictor_margin: float = 1.0,
+                 history_path: Path | None = None,
+                 compile_cache: bool = False):
         self.lammps_bin_path: Path = lammps_bin_path
         self.python_bin: str = python_bin
         self.model_name: str = model_name
@@ -199,6 +408,12 @@ class GeneralConfig():
         self.job_config: JobConfig = job_config
         self.repo_path: Path = repo_path
         self.pretrained_path: Path | None = pretrained_path
+        self.result_store_path: Path | None = result_store_path
+        self.link_mode: str = link_mode
+        self.q_predictor_path: Path | None = q_predictor_path
+        self.q_predictor_margin: float = q_predictor_margin
+        self.history_path: Path | None = history_path
+        self.compile_cache: bool = compile_cache
 
 def patify(config_dict: dict[str, Any]) -> dict:
     """
@@ -218,6 +433,8 @@ class ConfigReader():
     - deep_training: configuration for the deep training after the hyperparameter search.
     - inference: configuration for the inference benchmark with LAMMPS.
     - data_analysis: configuration for the data analysis on mechanical properties with LAMMPS.
+    - evaluation: configuration for the evaluation of the models on a common test set.
+    - throughput_tuning: configuration for the tuning of the training runtime settings.
     """
     def __init__(self, file_path: Path):
         if not file_path.exists() or not file_path.is_file():
@@ -266,6 +483,10 @@ class ConfigReader():
             gen_config[GeneralKW.CLUSTER.value],
             slurm_opts.get('ntasks', 1),
             slurm_opts.get('cpus_per_task', 1),
+            bool(section_config.get(SlurmJobKW.STAGING.value, False)),
+            int(str(section_config.get(SlurmJobKW.STAGING_INTERVAL.value, 600))),
+            Path(str(gen_config[GeneralKW.SWEEP_PATH.value])) / COMPILE_CACHE_DIR_NAME
+            if gen_config.get(GeneralKW.COMPILE_CACHE.value, False) else None,
         )
 
     def get_optimizer_config(self) -> HyperConfig:
@@ -288,17 +509,113 @@ class ConfigReader():
             self.get_slurm_config(MainSectionKW.HYPER_SEARCH.value),
             bool(str(self.get_config_section(
                 MainSectionKW.HYPER_SEARCH.value)[HyperSearchKW.HANDLE_COLLECT_ERRORS.value])),
+            bool(self.get_config_section(
+                MainSectionKW.HYPER_SEARCH.value).get(HyperSearchKW.PREPARE_DATA.value, False)),
         )
 
     def get_bench_config(self) -> BenchConfig:
         if MainSectionKW.INFERENCE.value not in self.config_data:
             raise ValueError('No benchmark configuration found in the config file.')
+        reference_potential = self.get_config_section(
+            MainSectionKW.INFERENCE.value).get(InferenceKW.REFERENCE_POTENTIAL.value)
         return BenchConfig(
             int(str(self.get_config_section(MainSectionKW.INFERENCE.value)[InferenceKW.PRE_STEPS.value])),
             int(str(self.get_config_section(MainSectionKW.INFERENCE.value)[InferenceKW.MAX_STEPS.value])),
+            [[int(n) for n in size] for size in self.get_config_section(
+                MainSectionKW.INFERENCE.value).get(InferenceKW.SCALING_SIZES.value, [])],
+            [[int(n) for n in layout] for layout in self.get_config_section(
+                MainSectionKW.INFERENCE.value).get(InferenceKW.SCALING_LAYOUTS.value, [])],
+            int(str(self.get_config_section(
+                MainSectionKW.INFERENCE.value).get(InferenceKW.REPETITIONS.value, 1))),
+            int(str(self.get_config_section(
+                MainSectionKW.INFERENCE.value).get(InferenceKW.WARMUP_REPS.value, 0))),
+            bool(self.get_config_section(MainSectionKW.INFERENCE.value).get(InferenceKW.PAIRED.value, False)),
+            [[int(n) for n in size] for size in self.get_config_section(
+                MainSectionKW.INFERENCE.value).get(InferenceKW.MEMORY_SIZES.value, [])],
+            int(str(self.get_config_section(
+                MainSectionKW.INFERENCE.value).get(InferenceKW.MEMORY_STEPS.value, 10))),
+            [str(workload) for workload in self.get_config_section(
+                MainSectionKW.INFERENCE.value).get(InferenceKW.WORKLOADS.value, [])],
+            Path(reference_potential) if reference_potential else None,
+            str(self.get_config_section(
+                MainSectionKW.INFERENCE.value).get(InferenceKW.REFERENCE_PAIR_STYLE.value, 'eam/fs')),
             self.get_experiment_config(MainSectionKW.INFERENCE.value),
         )
 
+    def get_prop_sim_config(self) -> PropSimConfig:
+        if MainSectionKW.PROP_SIM.value not in self.config_data:
+            raise ValueError('No properties simulation configuration found in the config file.')
+        return PropSimConfig(
+            int(str(self.get_config_section(
+                MainSectionKW.PROP_SIM.value).get(PropSimKW.SCAN_CHUNKS.value, 1))),
+            self.get_experiment_config(MainSectionKW.PROP_SIM.value),
+        )
+
+    def get_screening_config(self) -> ScreeningConfig:
+        if MainSectionKW.SCREENING.value not in self.config_data:
+            raise ValueError('No screening configuration found in the config file.')
+        section: dict = self.get_config_section(MainSectionKW.SCREENING.value)
+        return ScreeningConfig(
+            float(str(section.get(ScreeningKW.A0_TOL.value, 0.02))),
+            float(str(section.get(ScreeningKW.ELASTIC_TOL.value, 0.3))),
+            float(str(section.get(ScreeningKW.MAX_DRIFT.value, 1e-3))),
+            int(str(section.get(ScreeningKW.NVE_STEPS.value, 1000))),
+            self.get_experiment_config(MainSectionKW.SCREENING.value),
+        )
+
+    def get_pair_tune_config(self) -> PairTuneConfig:
+        if MainSectionKW.PAIR_TUNING.value not in self.config_data:
+            raise ValueError('No pair style tuning configuration found in the config file.')
+        section: dict = self.get_config_section(MainSectionKW.PAIR_TUNING.value)
+        return PairTuneConfig(
+            int(str(section.get(PairTuneKW.PRE_STEPS.value, 20))),
+            int(str(section.get(PairTuneKW.STEPS.value, 100))),
+            [float(skin) for skin in section.get(PairTuneKW.SKINS.value, [1.0])],
+            bool(section.get(PairTuneKW.OMP.value, True)),
+            self.get_experiment_config(MainSectionKW.PAIR_TUNING.value),
+        )
+
+    def get_layout_tune_config(self) -> LayoutTuneConfig:
+        if MainSectionKW.LAYOUT_TUNING.value not in self.config_data:
+            raise ValueError('No layout tuning configuration found in the config file.')
+        section: dict = self.get_config_section(MainSectionKW.LAYOUT_TUNING.value)
+        return LayoutTuneConfig(
+            int(str(section.get(LayoutTuneKW.PRE_STEPS.value, 20))),
+            int(str(section.get(LayoutTuneKW.STEPS.value, 100))),
+            [str(layout) for layout in section.get(LayoutTuneKW.LAYOUTS.value, [])],
+            [str(binding) for binding in section.get(LayoutTuneKW.BINDINGS.value,
+                                                     ['spread/threads', 'close/cores'])],
+            self.get_experiment_config(MainSectionKW.LAYOUT_TUNING.value),
+        )
+
+    def get_eval_config(self) -> EvaluationConfig:
+        if MainSectionKW.EVALUATION.value not in self.config_data:
+            raise ValueError('No evaluation configuration found in the config file.')
+        section: dict = self.get_config_section(MainSectionKW.EVALUATION.value)
+        return EvaluationConfig(
+            Path(str(section[EvaluationKW.TEST_PATH.value])),
+            int(str(section.get(EvaluationKW.BATCH_SIZE.value, 64))),
+            str(section.get(EvaluationKW.ENERGY_KEY.value, 'energy')),
+            str(section.get(EvaluationKW.FORCES_KEY.value, 'forces')),
+            Path(str(self.get_config_section(MainSectionKW.GENERAL.value)[GeneralKW.SWEEP_PATH.value])),
+            str(self.get_config_section(MainSectionKW.GENERAL.value)[GeneralKW.MODEL.value]),
+            self.get_slurm_config(MainSectionKW.EVALUATION.value),
+        )
+
+    def get_throughput_tune_config(self) -> ThroughputTuneConfig:
+        if MainSectionKW.THROUGHPUT_TUNING.value not in self.config_data:
+            raise ValueError('No throughput tuning configuration found in the config file.')
+        section: dict = self.get_config_section(MainSectionKW.THROUGHPUT_TUNING.value)
+        return ThroughputTuneConfig(
+            int(str(section.get(ThroughputTuneKW.MAXITER.value, 3))),
+            {str(knob): list(values) for knob, values in
+             section.get(ThroughputTuneKW.KNOBS.value, {}).items()},
+            bool(section.get(ThroughputTuneKW.CPU.value, True)),
+            self.get_slurm_config(MainSectionKW.THROUGHPUT_TUNING.value),
+            max(1, int(str(section.get(ThroughputTuneKW.REPEATS.value, 2)))),
+            float(str(section.get(ThroughputTuneKW.NOISE_MARGIN.value, 0.05))),
+        )
+
     def get_experiment_config(self, section_name: str) -> ExperimentConfig:
         if section_name not in self.config_data:
             raise ValueError(f'No {section_name} configuration found in the config file.')
@@ -313,15 +630,19 @@ class ConfigReader():
     def get_deep_train_config(self) -> DeepTrainConfig:
         if MainSectionKW.DEEP_TRAINING.value not in self.config_data:
             raise ValueError('No deep training configuration found in the config file.')
+        section: dict = self.get_config_section(MainSectionKW.DEEP_TRAINING.value)
         return DeepTrainConfig(
-            int(str(self.get_config_section(
-                MainSectionKW.DEEP_TRAINING.value)[DeepTrainKW.MAX_EPOCHS.value])),
+            int(str(section[DeepTrainKW.MAX_EPOCHS.value])),
             Path(str(self.get_config_section(MainSectionKW.GENERAL.value)[GeneralKW.SWEEP_PATH.value])),
             self.get_slurm_config(MainSectionKW.DEEP_TRAINING.value),
             str(self.get_config_section(MainSectionKW.GENERAL.value)[GeneralKW.MODEL.value]),
             float(str(self.get_config_section(
                 MainSectionKW.HYPER_SEARCH.value)[HyperSearchKW.ENERGY_WEIGHT.value])),
-            int(str(self.get_config_section(MainSectionKW.GENERAL.value)[GeneralKW.BEST_N.value]))
+            int(str(self.get_config_section(MainSectionKW.GENERAL.value)[GeneralKW.BEST_N.value])),
+            bool(section.get(DeepTrainKW.DISTRIBUTED.value, False)),
+            str(section.get(DeepTrainKW.BACKEND.value, 'nccl')),
+            int(str(section.get(DeepTrainKW.PARITY_EPOCHS.value, 0))),
+            float(str(section.get(DeepTrainKW.PARITY_TOLERANCE.value, 0.05))),
         )
 
     def get_general_config(self) -> GeneralConfig:
@@ -329,6 +650,12 @@ class ConfigReader():
             raise ValueError('No general configuration found in the config file.')
         pretrained_path = self.get_config_section(
             MainSectionKW.GENERAL.value).get(GeneralKW.PRETRAINED_PATH.value)
+        result_store_path = self.get_config_section(
+            MainSectionKW.GENERAL.value).get(GeneralKW.RESULT_STORE_PATH.value)
+        q_predictor_path = self.get_config_section(
+            MainSectionKW.GENERAL.value).get(GeneralKW.Q_PREDICTOR_PATH.value)
+        history_path = self.get_config_section(
+            MainSectionKW.GENERAL.value).get(GeneralKW.HISTORY_PATH.value)
         return GeneralConfig(
             Path(str(self.get_config_section(MainSectionKW.GENERAL.value)[GeneralKW.LMP_BIN.value])),
             self.get_config_section(
@@ -341,4 +668,12 @@ class ConfigReader():
             self.get_slurm_config(MainSectionKW.GENERAL.value),
             Path(str(self.get_config_section(MainSectionKW.GENERAL.value)[GeneralKW.REPO_PATH.value])),
             Path(pretrained_path) if pretrained_path else None,
+            Path(result_store_path) if result_store_path else None,
+            str(self.get_config_section(MainSectionKW.GENERAL.value).get(GeneralKW.LINK_MODE.value, 'copy')),
+            Path(q_predictor_path) if q_predictor_path else None,
+            float(str(self.get_config_section(
+                MainSectionKW.GENERAL.value).get(GeneralKW.Q_PREDICTOR_MARGIN.value, 1.0))),
+            Path(history_path) if history_path else None,
+            bool(self.get_config_section(
+                MainSectionKW.GENERAL.value).get(GeneralKW.COMPILE_CACHE.value, False)),
         )
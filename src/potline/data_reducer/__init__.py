@@ -0,0 +1,6 @@
+"""
+Dataset reduction module.
+"""
+
+from .data_reducer import DataReducer, REPORT_FILE_NAME
+from .sampling import farthest_point_sampling, k_medoids, stratified_select
@@ -0,0 +1,184 @@
+"""
+Reduction of a training dataset to a diverse subset of its configurations.
+"""
+
+from pathlib import Path
+
+import ase.io
+import numpy as np
+import pandas as pd
+from ase import Atoms
+from ase.neighborlist import neighbor_list
+
+from .sampling import stratified_select, pairwise_distances
+from ..dataset_io import read_dataset, write_dataset, is_xyz, read_xyz, get_xyz_energies
+
+REPORT_FILE_NAME: str = 'reduction_report.csv'
+
+class DataReducer():
+    """
+    Coreset selection on a training dataset, in the pacemaker/gracemaker format
+    (a pickled DataFrame with an ase_atoms column) or the MACE format (an extended xyz file).
+    Every configuration is described by its smoothed radial distribution per atom and its volume per atom,
+    computed in batches, and a diverse subset is selected in every energy stratum.
+
+    Args:
+        - data_path: the path to the dataset.
+        - cutoff: the cutoff of the radial distribution.
+        - n_bins: the number of bins of the radial distribution.
+        - energy_key: the key of the energy in the xyz info, for the MACE format.
+    """
+    def __init__(self, data_path: Path, cutoff: float = 5.0, n_bins: int = 32, energy_key: str = 'energy'):
+        self._cutoff = cutoff
+        self._n_bins = n_bins
+        self._is_xyz: bool = is_xyz(data_path)
+        if self._is_xyz:
+            self._structures: list[Atoms] = read_xyz(data_path)
+            energies: list[float] = get_xyz_energies(self._structures, energy_key)
+        else:
+            self._frame: pd.DataFrame = read_dataset(data_path)
+            self._structures = list(self._frame['ase_atoms'])
+            energy_column: str = 'energy_corrected' if 'energy_corrected' in self._frame else 'energy'
+            energies = list(self._frame[energy_column])
+        self._energies: np.ndarray = np.array(energies) / np.array([len(a) for a in self._structures])
+        self._features: np.ndarray | None = None
+
+    def __len__(self) -> int:
+        return len(self._structures)
+
+    def get_features(self, batch_size: int = 256) -> np.ndarray:
+        """
+        Get the standardised descriptors of the configurations, computed once.
+        The distances of a batch of configurations are binned together and smoothed
+        with a gaussian kernel, as a single matrix product.
+
+        Args:
+            - batch_size: the number of configurations per batch.
+
+        Returns:
+            np.ndarray: the descriptors, one row per configuration.
+        """
+        if self._features is not None:
+            return self._features
+
+        width: float = self._cutoff / self._n_bins
+        centres: np.ndarray = (np.arange(self._n_bins) + 0.5) * width
+        kernel: np.ndarray = np.exp(-0.5 * ((centres[:, None] - centres[None, :]) / width) ** 2)
+        rows: list[np.ndarray] = []
+        for start in range(0, len(self._structures), batch_size):
+            batch: list[Atoms] = self._structures[start:start+batch_size]
+            distances: list[np.ndarray] = [neighbor_list('d', atoms, self._cutoff) for atoms in batch]
+            owners: np.ndarray = np.repeat(np.arange(len(batch)), [len(d) for d in distances])
+            bins: np.ndarray = np.minimum((np.concatenate(distances) / width).astype(int), self._n_bins - 1)
+            histograms: np.ndarray = np.bincount(owners * self._n_bins + bins,
+                                                 minlength=len(batch) * self._n_bins)
+            histograms = histograms.reshape(len(batch), self._n_bins) @ kernel
+            n_atoms: np.ndarray = np.array([len(atoms) for atoms in batch])
+            volumes: np.ndarray = np.array([atoms.get_volume() if atoms.pbc.all() else 0 for atoms in batch])
+            rows.append(np.column_stack([histograms / n_atoms[:, None], volumes / n_atoms]))
+
+        features: np.ndarray = np.concatenate(rows)
+        std: np.ndarray = features.std(axis=0)
+        self._features = (features - features.mean(axis=0)) / np.where(std > 0, std, 1)
+        return self._features
+
+    def select(self, fraction: float, n_strata: int = 5, method: str = 'fps',
+               indices: np.ndarray | None = None) -> np.ndarray:
+        """
+        Select a diverse subset of the configurations.
+
+        Args:
+            - fraction: the fraction of the configurations to keep.
+            - n_strata: the number of energy strata.
+            - method: 'fps' for the farthest point sampling or 'kmedoids' for the k-medoids.
+            - indices: the configurations to select from, all of them if None.
+
+        Returns:
+            np.ndarray: the sorted indices of the selected configurations.
+        """
+        if indices is None:
+            indices = np.arange(len(self))
+        return indices[stratified_select(self.get_features()[indices], self._energies[indices],
+                                         fraction, n_strata, method)]
+
+    def save(self, indices: np.ndarray, out_path: Path) -> None:
+        """
+        Write the selected configurations in the format of the original dataset.
+
+        Args:
+            - indices: the indices of the configurations.
+            - out_path: the path of the reduced dataset.
+        """
+        if self._is_xyz:
+            ase.io.write(out_path, [self._structures[i] for i in indices], format='extxyz')
+        else:
+            write_dataset(self._frame.iloc[indices].reset_index(drop=True), out_path)
+
+    def evaluate(self, fractions: list[float], n_strata: int = 5, method: str = 'fps',
+                 test_size: float = 0.1, n_neighbors: int = 5, seed: int = 42) -> list[dict[str, float]]:
+        """
+        Estimate the accuracy/size trade-off of the reduction on a held-out split.
+        The subsets are selected from the remaining configurations, and compared with random subsets
+        of the same size by the error of a nearest neighbours regression of the energy per atom
+        on the held-out configurations, a surrogate for the accuracy of a potential trained on them,
+        and by the mean distance of the held-out configurations to the closest selected one.
+
+        Args:
+            - fractions: the fractions of the configurations to keep.
+            - n_strata: the number of energy strata.
+            - method: 'fps' for the farthest point sampling or 'kmedoids' for the k-medoids.
+            - test_size: the fraction of the configurations held out.
+            - n_neighbors: the number of neighbours of the regression.
+            - seed: the seed of the split and of the random subsets.
+
+        Returns:
+            list[dict[str, float]]: the size, the errors (meV/atom) and the coverage of each fraction,
+            for the selected and for the random subsets.
+        """
+        rng = np.random.default_rng(seed)
+        order: np.ndarray = rng.permutation(len(self))
+        n_test: int = max(1, round(test_size * len(self)))
+        test, pool = order[:n_test], order[n_test:]
+
+        rows: list[dict[str, float]] = []
+        for fraction in fractions:
+            subset: np.ndarray = self.select(fraction, n_strata, method, pool)
+            error, coverage = self._score(test, subset, n_neighbors)
+            random_error, random_coverage = self._score(
+                test, rng.choice(pool, len(subset), replace=False), n_neighbors)
+            rows.append({
+                'fraction': fraction,
+                'size': len(subset),
+                'knn_mae_mev': error,
+                'coverage': coverage,
+                'random_knn_mae_mev': random_error,
+                'random_coverage': random_coverage,
+            })
+        full_error, full_coverage = self._score(test, pool, n_neighbors)
+        rows.append({'fraction': 1.0, 'size': len(pool), 'knn_mae_mev': full_error, 'coverage': full_coverage,
+                     'random_knn_mae_mev': full_error, 'random_coverage': full_coverage})
+        return rows
+
+    def _score(self, test: np.ndarray, subset: np.ndarray, n_neighbors: int,
+               chunk_size: int = 1024) -> tuple[float, float]:
+        """
+        Get the error (meV/atom) of the nearest neighbours regression of the energy per atom
+        of the test configurations on a subset, and the mean distance of the test configurations
+        to the closest configuration of the subset.
+        The test configurations are processed in chunks, so that only a chunk x subset distance matrix
+        is kept, and the neighbours are partitioned instead of sorted.
+        """
+        features: np.ndarray = self.get_features()
+        subset_features: np.ndarray = features[subset]
+        subset_energies: np.ndarray = self._energies[subset]
+        k: int = min(n_neighbors, len(subset))
+        abs_errors: np.ndarray = np.empty(len(test))
+        min_distances: np.ndarray = np.empty(len(test))
+        for start in range(0, len(test), chunk_size):
+            chunk: np.ndarray = test[start:start+chunk_size]
+            distances: np.ndarray = pairwise_distances(features[chunk], subset_features)
+            nearest: np.ndarray = np.argpartition(distances, k - 1, axis=1)[:, :k]
+            predictions: np.ndarray = subset_energies[nearest].mean(axis=1)
+            abs_errors[start:start+len(chunk)] = np.abs(predictions - self._energies[chunk])
+            min_distances[start:start+len(chunk)] = distances.min(axis=1)
+        return float(abs_errors.mean() * 1000), float(min_distances.mean())
@@ -0,0 +1,106 @@
+"""
+Diverse subset selection on the descriptors of a dataset.
+"""
+
+import numpy as np
+
+def pairwise_distances(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """
+    Euclidean distances between the rows of two matrices, without the rows x rows x features
+    intermediate array.
+
+    Args:
+        - a: the first matrix, one row per point.
+        - b: the second matrix, one row per point.
+
+    Returns:
+        np.ndarray: the distances, with the rows of a as rows and the rows of b as columns.
+    """
+    squared: np.ndarray = (a ** 2).sum(axis=1)[:, None] + (b ** 2).sum(axis=1)[None, :] - 2 * a @ b.T
+    return np.sqrt(np.clip(squared, 0, None))
+
+def farthest_point_sampling(features: np.ndarray, n_samples: int, start: int = 0) -> np.ndarray:
+    """
+    Greedily select the point farthest from the already selected ones.
+
+    Args:
+        - features: the descriptors, one row per configuration.
+        - n_samples: the number of points to select.
+        - start: the index of the first selected point.
+
+    Returns:
+        np.ndarray: the indices of the selected points, in the order of selection.
+    """
+    n_samples = min(n_samples, len(features))
+    selected: np.ndarray = np.empty(n_samples, dtype=int)
+    min_dist: np.ndarray = np.full(len(features), np.inf)
+    selected[0] = start
+    for i in range(1, n_samples):
+        min_dist = np.minimum(min_dist, np.linalg.norm(features - features[selected[i-1]], axis=1))
+        selected[i] = int(np.argmax(min_dist))
+    return selected
+
+def k_medoids(features: np.ndarray, n_samples: int, max_iter: int = 20) -> np.ndarray:
+    """
+    Alternate k-medoids clustering, initialised with the farthest point sampling.
+    Every configuration is assigned to its closest medoid, then every medoid is replaced
+    by the member of its cluster with the smallest total distance to the other members.
+
+    Args:
+        - features: the descriptors, one row per configuration.
+        - n_samples: the number of medoids.
+        - max_iter: the maximum number of iterations.
+
+    Returns:
+        np.ndarray: the indices of the medoids.
+    """
+    medoids: np.ndarray = farthest_point_sampling(features, n_samples)
+    for _ in range(max_iter):
+        labels: np.ndarray = np.argmin(pairwise_distances(features, features[medoids]), axis=1)
+        new_medoids: np.ndarray = medoids.copy()
+        for cluster in range(len(medoids)):
+            members: np.ndarray = np.flatnonzero(labels == cluster)
+            if len(members) == 0:
+                continue
+            cost: np.ndarray = pairwise_distances(features[members], features[members]).sum(axis=1)
+            new_medoids[cluster] = members[np.argmin(cost)]
+        if np.array_equal(new_medoids, medoids):
+            break
+        medoids = new_medoids
+    return medoids
+
+def stratified_select(features: np.ndarray, energies: np.ndarray, fraction: float,
+                      n_strata: int, method: str = 'fps') -> np.ndarray:
+    """
+    Select a diverse subset in each energy stratum, the quantiles of the energy per atom,
+    so that the energy distribution of the dataset is preserved.
+    Every stratum keeps the same fraction of its configurations, at least one.
+
+    Args:
+        - features: the standardised descriptors, one row per configuration.
+        - energies: the energy per atom of each configuration.
+        - fraction: the fraction of the configurations to keep.
+        - n_strata: the number of energy strata.
+        - method: 'fps' for the farthest point sampling or 'kmedoids' for the k-medoids.
+
+    Returns:
+        np.ndarray: the sorted indices of the selected configurations, without duplicates.
+    """
+    if method not in ['fps', 'kmedoids']:
+        raise ValueError(f'Unknown selection method {method}, choose from fps, kmedoids.')
+    edges: np.ndarray = np.quantile(energies, np.linspace(0, 1, n_strata + 1)[1:-1])
+    strata: np.ndarray = np.searchsorted(edges, energies, side='right')
+
+    selected: list[np.ndarray] = []
+    for stratum in np.unique(strata):
+        members: np.ndarray = np.flatnonzero(strata == stratum)
+        n_samples: int = max(1, round(fraction * len(members)))
+        if method == 'fps':
+            # start from the configuration closest to the centre of the stratum
+            start: int = int(np.argmin(np.linalg.norm(
+                features[members] - features[members].mean(axis=0), axis=1)))
+            local: np.ndarray = farthest_point_sampling(features[members], n_samples, start)
+        else:
+            local = k_medoids(features[members], n_samples)
+        selected.append(members[local])
+    return np.unique(np.concatenate(selected))
@@ -0,0 +1,87 @@
+"""
+Reading and writing of the pickled datasets of pacemaker and gracemaker,
+and reading of the extended xyz datasets of MACE.
+Kept apart from the utils module, so that the models can import it without an import cycle.
+"""
+
+from pathlib import Path
+
+import ase.io
+import pandas as pd
+from ase import Atoms
+
+# the .gzip suffix of the pacemaker datasets is not recognised by pandas
+GZIP_SUFFIX: str = '.gzip'
+XYZ_SUFFIXES: list[str] = ['.xyz', '.extxyz']
+
+def _get_compression(path: Path | str) -> str:
+    return 'gzip' if str(path).endswith(GZIP_SUFFIX) else 'infer'
+
+def read_dataset(path: Path | str) -> pd.DataFrame:
+    """
+    Read a pickled dataset, compressed or not.
+
+    Args:
+        - path: the path to the dataset.
+
+    Returns:
+        pd.DataFrame: the dataset.
+    """
+    return pd.read_pickle(path, compression=_get_compression(path))
+
+def write_dataset(frame: pd.DataFrame, path: Path | str) -> None:
+    """
+    Write a pickled dataset, compressed as its suffix says.
+
+    Args:
+        - frame: the dataset.
+        - path: the path of the dataset.
+    """
+    frame.to_pickle(path, compression=_get_compression(path))
+
+def get_data_train_size(data: dict) -> int:
+    """
+    Get the number of training configurations of the data section of a pacemaker or gracemaker config.
+
+    Args:
+        - data: the data section of the config.
+
+    Returns:
+        int: the number of training configurations.
+    """
+    size: int = len(read_dataset(data['filename']))
+    # an explicit test set is read from another file
+    return size if 'test_filename' in data else round(size * (1 - float(data.get('test_size', 0))))
+
+def is_xyz(path: Path) -> bool:
+    """
+    Check if a dataset is in the MACE format, an extended xyz file, rather than a pickled DataFrame.
+    """
+    return path.suffix in XYZ_SUFFIXES
+
+def read_xyz(path: Path | str) -> list[Atoms]:
+    """
+    Read all the structures of an extended xyz dataset.
+
+    Args:
+        - path: the path to the dataset.
+
+    Returns:
+        list[Atoms]: the structures.
+    """
+    return list(ase.io.read(path, index=':'))
+
+def get_xyz_energies(structures: list[Atoms], energy_key: str = 'energy') -> list[float]:
+    """
+    Get the reference energies of the structures of an extended xyz dataset,
+    from their info, or from their calculator when the key is missing.
+
+    Args:
+        - structures: the structures.
+        - energy_key: the key of the energy in the xyz info.
+
+    Returns:
+        list[float]: the total energy of each structure, in eV.
+    """
+    return [float(atoms.info[energy_key]) if energy_key in atoms.info else atoms.get_potential_energy()
+            for atoms in structures]
@@ -2,4 +2,4 @@
 Deep trainer.
 """
 
-from .deep_trainer import DeepTrainer, DEEP_TRAIN_DIR_NAME
+from .deep_trainer import DeepTrainer, DEEP_TRAIN_DIR_NAME, PARITY_DIR_NAME
@@ -2,18 +2,44 @@
 DeepTrainer class for training after hyperparameter search.
 """
 
+import math
 from pathlib import Path
 
+import yaml
+
 from ..config_reader import ConfigReader
 from ..loss_logger import LossLogger, ModelTracker
-from ..dispatcher import DispatcherManager, JobType
-from ..model import get_fit_cmd
+from ..dispatcher import DispatcherManager, JobType, LAUNCH_ENV_NAME
+from ..model import PotModel, CONFIG_NAME, get_fit_cmd, get_model_class
+from ..hyper_searcher import ThroughputTuner
 
 DEEP_TRAIN_DIR_NAME: str = 'deep_train'
+PARITY_DIR_NAME: str = 'parity'
+PARITY_RESULT_NAME: str = 'parity.yaml'
+# array ids of the parity runs, on all the ranks and on a single one
+PARITY_DISTRIBUTED_ID: int = 1
+PARITY_SINGLE_ID: int = 2
+
+def get_world_size(slurm_opts: dict) -> int:
+    """
+    Get the number of ranks of the data-parallel jobs, the tasks of their allocation.
+
+    Args:
+        - slurm_opts: the Slurm options of the jobs.
+
+    Returns:
+        int: the number of ranks.
+    """
+    if 'ntasks' in slurm_opts:
+        return int(slurm_opts['ntasks'])
+    return int(slurm_opts.get('nodes', 1)) * int(slurm_opts.get('ntasks_per_node', 1))
 
 class DeepTrainer():
     """
     Class for training after hyperparameter search.
+    In the distributed mode every model is trained data-parallel over the tasks of its job,
+    and the convergence of the best model over a few epochs on all the ranks and on a single one
+    can be compared before the training jobs are released.
 
     Args:
         - config: configuration for deep training
@@ -21,26 +47,128 @@ class DeepTrainer():
     """
     def __init__(self, config_path: Path, tracker_list: list[ModelTracker]):
         self._config = ConfigReader(config_path).get_deep_train_config()
+        self._link_mode = ConfigReader(config_path).get_general_config().link_mode
         self._config_path = config_path
         self._tracker_list = tracker_list
         self._out_path = self._config.sweep_path / DEEP_TRAIN_DIR_NAME
+        self._world_size: int = get_world_size(self._config.job_config.slurm_opts)
 
     def prep_deep(self) -> None:
         self._out_path.mkdir(exist_ok=True)
+        if self._config.distributed and self._config.parity_epochs > 0 and self._tracker_list:
+            self._prep_parity(self._tracker_list[0])
         for i, tracker in enumerate(self._tracker_list):
             iter_path = self._out_path / str(i+1)
             iter_path.mkdir(exist_ok=True)
-            tracker.model.switch_out_path(iter_path)
+            tracker.model.switch_out_path(iter_path, self._link_mode)
             tracker.model.set_config_maxiter(self._config.max_epochs)
+            if self._config.distributed:
+                self._set_launch(tracker.model, self._world_size)
             tracker.save_info(iter_path)
 
+    def _prep_parity(self, tracker: ModelTracker) -> None:
+        """
+        Prepare the parity runs of a model, for a few epochs from scratch with the same configuration
+        and seed, on all the ranks and on a single rank with a single device.
+        The checkpoint of the search is already past the first epochs, a restart from it would not train.
+
+        Args:
+            - tracker: the tracker of the model, before its deep training.
+        """
+        for array_id, world_size in [(PARITY_DISTRIBUTED_ID, self._world_size), (PARITY_SINGLE_ID, 1)]:
+            run_path: Path = self._out_path / PARITY_DIR_NAME / str(array_id)
+            run_path.mkdir(parents=True, exist_ok=True)
+            run_tracker = ModelTracker.from_path(self._config.model_name, tracker.model.get_out_path())
+            run_tracker.model.switch_out_path(run_path, self._link_mode)
+            run_tracker.model.set_config_maxiter(self._config.parity_epochs)
+            self._set_launch(run_tracker.model, world_size, single_device=array_id == PARITY_SINGLE_ID)
+            run_tracker.save_info(run_path)
+
+    def _set_launch(self, model: PotModel, world_size: int, single_device: bool = False) -> None:
+        """
+        Write the training configuration of every rank and the launch settings of a data-parallel model.
+
+        Args:
+            - model: the model, in its training directory.
+            - world_size: the number of ranks.
+            - single_device: whether to keep only the first GPU of the allocation.
+        """
+        config: dict = get_model_class(self._config.model_name).get_distributed_config(
+            model.get_params(), world_size)
+        with (model.get_out_path() / CONFIG_NAME).open('w', encoding='utf-8') as file:
+            yaml.safe_dump(config, file)
+        with (model.get_out_path() / LAUNCH_ENV_NAME).open('w', encoding='utf-8') as file:
+            file.write(f'export DIST_WORLD_SIZE={world_size}\n'
+                       f'export DIST_BACKEND={self._config.backend}\n'
+                       f'export DIST_SINGLE_DEVICE={int(single_device)}\n')
+
     def collect(self):
         loss_logger = LossLogger(self._out_path)
         for tracker in self._tracker_list:
             tracker.valid_losses = tracker.model.collect_loss()
             loss_logger.write_error_file(tracker)
+            ThroughputTuner.log_throughput(self._config.sweep_path, tracker, 'deep')
             tracker.save_info(tracker.model.get_out_path())
 
+    def check_parity(self) -> bool:
+        """
+        Compare the validation loss of the parity runs on all the ranks and on a single rank.
+        The data-parallel training passes when its loss is at most parity_tolerance (relative) above
+        the single-rank one, the comparison is written in the parity directory.
+
+        Returns:
+            bool: whether the data-parallel training converges like the single-rank one.
+        """
+        parity_path: Path = self._out_path / PARITY_DIR_NAME
+        totals: dict[int, float] = {}
+        result: dict = {'world_size': self._world_size, 'epochs': self._config.parity_epochs}
+        for array_id, name in [(PARITY_DISTRIBUTED_ID, 'distributed'), (PARITY_SINGLE_ID, 'single')]:
+            try:
+                tracker = ModelTracker.from_path(self._config.model_name, parity_path / str(array_id))
+                tracker.valid_losses = tracker.model.collect_loss()
+            except Exception as e:
+                print(f'Error collecting the {name} parity run')
+                print(e)
+                totals[array_id] = math.nan
+                continue
+            totals[array_id] = tracker.get_total_valid_loss(self._config.energy_weight)
+            result[name] = {'energy': tracker.valid_losses.energy, 'force': tracker.valid_losses.force,
+                            'total': totals[array_id]}
+
+        single: float = totals[PARITY_SINGLE_ID]
+        distributed: float = totals[PARITY_DISTRIBUTED_ID]
+        # a missing loss (nan) fails the check
+        difference: float = (distributed - single) / single if single > 0 \
+            else 0.0 if distributed <= single else math.inf
+        passed: bool = difference <= self._config.parity_tolerance
+        result.update({'relative_difference': difference, 'tolerance': self._config.parity_tolerance,
+                       'passed': passed})
+        with (parity_path / PARITY_RESULT_NAME).open('w', encoding='utf-8') as file:
+            yaml.safe_dump(result, file)
+        print(f'Parity of {self._world_size} ranks: relative loss difference {difference:.4g}, '
+              f'tolerance {self._config.parity_tolerance}, {"passed" if passed else "FAILED"}')
+        return passed
+
+    @staticmethod
+    def release_deep(passed: bool, fit_id: int, coll_id: int, n_models: int) -> None:
+        """
+        Release the held training jobs if the parity check passed, cancel them and their collection otherwise.
+
+        Args:
+            - passed: whether the parity check passed.
+            - fit_id: the id of the held array job.
+            - coll_id: the id of the collection job.
+            - n_models: the number of models in the array job.
+        """
+        if not passed:
+            print('The data-parallel training does not converge like the single-rank one, '
+                  'cancelling the deep training.')
+            DispatcherManager.cancel_id(fit_id)
+            DispatcherManager.cancel_id(coll_id)
+            return
+        for array_id in range(1, n_models+1):
+            DispatcherManager.release_id(fit_id, array_id=array_id)
+
     @staticmethod
     def get_model_trackers(sweep_path: Path, model_name: str) -> list[ModelTracker]:
         """
@@ -54,7 +182,7 @@ class DeepTrainer():
             - list of model trackers from the deep train directory
         """
         deep_path: Path = sweep_path / DEEP_TRAIN_DIR_NAME
-        model_dirs: list[Path] = [d for d in deep_path.iterdir() if d.is_dir()]
+        model_dirs: list[Path] = [d for d in deep_path.iterdir() if d.is_dir() and d.name != PARITY_DIR_NAME]
         print(f"Found {len(model_dirs)} models in {deep_path}")
         print(f"{model_dirs}")
         models: list[ModelTracker] = []
@@ -68,6 +196,9 @@ class DeepTrainer():
     def run_deep(config_path: Path, dependency: int | None = None) -> int:
         """
         Run deep training.
+        With the throughput tuning, the fit jobs use the fastest environment settings and are timed.
+        In the distributed mode with a parity check, the fit jobs are held until the check
+        of the parity runs releases them.
 
         Args:
             - config_path: the path to the configuration file.
@@ -92,12 +223,37 @@ class DeepTrainer():
         init_id = watch_manager.dispatch_job()
 
         # fit jobs
-        deep_cmd: str = get_fit_cmd(deep_config.model_name, deep=True)
-        deep_manager.set_job([deep_cmd], out_path, deep_config.job_config, dependency=init_id,
-                            array_ids=list(range(1, deep_config.best_n_models+1)))
+        tuned: bool = ThroughputTuner.is_enabled(config_path)
+        deep_cmds: list[str] = [get_fit_cmd(deep_config.model_name, deep=True,
+                                            compile_cache_path=deep_config.job_config.compile_cache_path,
+                                            timed=tuned, distributed=deep_config.distributed)]
+        if tuned:
+            deep_cmds.insert(0, ThroughputTuner.get_env_cmd(deep_config.sweep_path))
+        parity: bool = deep_config.distributed and deep_config.parity_epochs > 0
+        deep_manager.set_job(deep_cmds, out_path, deep_config.job_config,
+                             dependency=init_id if not parity else None, hold=parity,
+                             array_ids=list(range(1, deep_config.best_n_models+1)))
         fit_id = deep_manager.dispatch_job()
 
         # collect job
         coll_cmd: str = f'{gen_config.python_bin} {cli_path} --config {config_path} --collect'
         watch_manager.set_job([coll_cmd], out_path, deep_config.job_config, dependency=fit_id)
-        return watch_manager.dispatch_job()
+        coll_id = watch_manager.dispatch_job()
+        if not parity:
+            return coll_id
+
+        # parity runs and their check, releasing the fit jobs
+        parity_path: Path = out_path / PARITY_DIR_NAME
+        parity_path.mkdir(exist_ok=True)
+        # trained from scratch, not restarted from the checkpoint
+        parity_cmds: list[str] = deep_cmds[:-1] + [get_fit_cmd(
+            deep_config.model_name, deep=False, compile_cache_path=deep_config.job_config.compile_cache_path,
+            timed=tuned, distributed=True)]
+        deep_manager.set_job(parity_cmds, parity_path, deep_config.job_config, dependency=init_id,
+                             array_ids=[PARITY_DISTRIBUTED_ID, PARITY_SINGLE_ID])
+        parity_id = deep_manager.dispatch_job()
+        check_cmd: str = f'{gen_config.python_bin} {cli_path} --config {config_path} --parity' \
+            f' --fitid {fit_id} --collectid {coll_id}'
+        watch_manager.set_job([check_cmd], parity_path, deep_config.job_config, dependency=parity_id)
+        watch_manager.dispatch_job()
+        return coll_id
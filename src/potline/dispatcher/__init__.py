@@ -2,5 +2,7 @@
 Dispatcher module for the potline package.
 """
 
-from .dispatcher_manager import DispatcherManager
+from .dispatcher_manager import (DispatcherManager, LAYOUT_PREFIX, FIRST_STEP_SCRIPT_PATH,
+                                 DISTRIBUTED_SCRIPT_PATH, DIST_CHECK_SCRIPT_PATH, LAUNCH_ENV_NAME)
 from .slurm_preset import SupportedModel, JobType, SlurmCluster
+from .first_step import FIRST_STEP_FILE_NAME
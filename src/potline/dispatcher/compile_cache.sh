@@ -0,0 +1,21 @@
+#!/bin/bash
+#------------------------------
+# Persistent compile cache shared by the jobs of a sweep.
+# Source this file from a job script with the cache directory:
+#   source compile_cache.sh <directory>
+# The XLA clusters compiled by TensorFlow (GRACE, PACE with the tensorpot backend),
+# the graphs compiled by torch.compile (MACE) and the CUDA kernels compiled at run time
+# are stored in the directory and reused by the following jobs with the same architectures.
+#------------------------------
+
+COMPILE_CACHE_DIR=$1
+mkdir -p "${COMPILE_CACHE_DIR}/xla" "${COMPILE_CACHE_DIR}/inductor" \
+    "${COMPILE_CACHE_DIR}/triton" "${COMPILE_CACHE_DIR}/cuda"
+
+export TF_XLA_FLAGS="${TF_XLA_FLAGS:+${TF_XLA_FLAGS} }--tf_xla_persistent_cache_directory=${COMPILE_CACHE_DIR}/xla"
+export TORCHINDUCTOR_CACHE_DIR=${COMPILE_CACHE_DIR}/inductor
+export TORCHINDUCTOR_FX_GRAPH_CACHE=1
+export TORCHINDUCTOR_AUTOGRAD_CACHE=1
+export TRITON_CACHE_DIR=${COMPILE_CACHE_DIR}/triton
+export CUDA_CACHE_PATH=${COMPILE_CACHE_DIR}/cuda
+export CUDA_CACHE_MAXSIZE=4294967296
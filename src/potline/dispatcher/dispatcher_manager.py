@@ -9,6 +9,17 @@ from .slurm_preset import get_slurm_options
 from .slurm_dispatcher import SlurmDispatcher
 from ..config_reader import JobConfig
 
+LAYOUT_SCRIPT_PATH: Path = Path(__file__).parent / 'layout.sh'
+STAGING_SCRIPT_PATH: Path = Path(__file__).parent / 'staging.sh'
+COMPILE_CACHE_SCRIPT_PATH: Path = Path(__file__).parent / 'compile_cache.sh'
+FIRST_STEP_SCRIPT_PATH: Path = Path(__file__).parent / 'first_step.py'
+DISTRIBUTED_SCRIPT_PATH: Path = Path(__file__).parent / 'distributed.sh'
+DIST_CHECK_SCRIPT_PATH: Path = Path(__file__).parent / 'dist_check.py'
+# launch settings of the data-parallel jobs, read by distributed.sh in the directory of the job
+LAUNCH_ENV_NAME: str = 'launch.env'
+# prefix of the thread/rank layouts in the layout files, followed by the partition
+LAYOUT_PREFIX: str = '# layout '
+
 class DispatcherManager():
     """
     Dispatcher manager.
@@ -31,9 +42,18 @@ class DispatcherManager():
                 job_config: JobConfig,
                 array_ids: list[int] | None = None,
                 dependency: int | None = None,
-                hold: bool = False):
+                hold: bool = False,
+                layout_file: str | None = None):
         """
         Create a dispatcher based on the options.
+        The OpenMP binding defaults to spread over the threads,
+        array jobs can instead read the layout tuned for their partition from a file of their directory,
+        setting LAYOUT_NTASKS and LAYOUT_THREADS for the commands.
+        With staging, array jobs run from a copy of their directory on the node-local disk,
+        with local copies of the inputs it references, and their results are copied back
+        periodically, by the stage_out function, and at exit. Their commands then run in the background,
+        so that a termination signal stops them and copies the results back right away.
+        With a compile cache, every job stores and reuses its compiled graphs and kernels in it.
 
         Args:
             - commands: commands to run
@@ -42,6 +62,7 @@ class DispatcherManager():
             - array_ids: array ids to run
             - dependency: job dependency
             - hold: whether to hold the job
+            - layout_file: file of the array directories holding the tuned layouts
 
         Returns:
             Dispatcher: the dispatcher to use.
@@ -61,7 +82,18 @@ class DispatcherManager():
         array_cmds = ['cd $SLURM_ARRAY_TASK_ID'] if array_ids else []
         export_cmds = ['export OMP_PROC_BIND=spread', 'export OMP_PLACES=threads',
                        'export PSM2_CUDA=0']
-        tot_cmds = export_cmds + array_cmds + source_cmds + py_cmds + commands
+        layout_cmds = [f'source {LAYOUT_SCRIPT_PATH} ./{layout_file}'] \
+            if is_array_job and layout_file else []
+        staging_cmds = [f'source {STAGING_SCRIPT_PATH} {job_config.staging_interval}'] \
+            if is_array_job and job_config.staging else []
+        cache_cmds = [f'source {COMPILE_CACHE_SCRIPT_PATH} {job_config.compile_cache_path}'] \
+            if job_config.compile_cache_path else []
+        # after the modules, which may set the compiler flags
+        job_cmds = source_cmds + cache_cmds + py_cmds + commands
+        if staging_cmds:
+            # in the background, so that the staged results are copied back as soon as the job is signalled
+            job_cmds = ['{'] + job_cmds + ['} &', 'stage_wait $!']
+        tot_cmds = export_cmds + array_cmds + layout_cmds + staging_cmds + job_cmds
 
         # Create dispatcher
         print("Commands to run:", tot_cmds)
@@ -104,3 +136,12 @@ class DispatcherManager():
             '"scontrol release %i" | ' +
             grep_cmd + ' | sh',
             stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, check=True)
+
+    @staticmethod
+    def cancel_id(job_id: int, array_id: int | None = None):
+        """
+        Cancel a job.
+        """
+        target: str = f'{job_id}_{array_id}' if array_id else f'{job_id}'
+        subprocess.run(['scancel', target],
+                       stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, check=True)
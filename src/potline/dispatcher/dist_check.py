@@ -0,0 +1,59 @@
+"""
+Check of the launch environment of the data-parallel training, run by every rank before the training:
+
+    bash distributed.sh python dist_check.py
+
+Every rank joins the process group of the DIST_BACKEND backend (nccl on the GPUs, gloo on the CPU)
+from the torch.distributed variables, then the sum of the ranks and a broadcast from the first rank
+are checked on every rank, so that a wrong rank layout or an unreachable master fails in seconds
+instead of hanging the training. A single rank has nothing to check.
+Only the standard library is needed to import this module, torch is imported by the check.
+"""
+
+import os
+import sys
+import socket
+from datetime import timedelta
+
+BROADCAST_VALUE: float = 42.0
+
+def check_ranks() -> bool:
+    """
+    Check the communication between the ranks.
+
+    Returns:
+        bool: whether the sum and the broadcast are correct on this rank.
+    """
+    world_size: int = int(os.environ.get('WORLD_SIZE', '1'))
+    rank: int = int(os.environ.get('RANK', '0'))
+    if world_size == 1:
+        print('Single rank, nothing to check.')
+        return True
+
+    import torch
+    import torch.distributed as dist
+
+    backend: str = os.environ.get('DIST_BACKEND', 'nccl')
+    device = torch.device('cpu')
+    if backend == 'nccl':
+        device = torch.device('cuda', int(os.environ.get('LOCAL_RANK', '0')))
+        torch.cuda.set_device(device)
+    dist.init_process_group(backend=backend, init_method='env://', world_size=world_size, rank=rank,
+                            timeout=timedelta(minutes=5))
+
+    total = torch.tensor([float(rank)], device=device)
+    dist.all_reduce(total)
+    value = torch.tensor([BROADCAST_VALUE if rank == 0 else 0.0], device=device)
+    dist.broadcast(value, src=0)
+    dist.barrier()
+    dist.destroy_process_group()
+
+    expected: float = world_size * (world_size - 1) / 2
+    passed: bool = total.item() == expected and value.item() == BROADCAST_VALUE
+    print(f'Rank {rank}/{world_size} (local {os.environ.get("LOCAL_RANK", "0")}) on {socket.gethostname()}, '
+          f'{backend}: sum {total.item()} (expected {expected}), broadcast {value.item()}, '
+          f'{"ok" if passed else "FAILED"}')
+    return passed
+
+if __name__ == '__main__':
+    sys.exit(0 if check_ranks() else 1)
@@ -0,0 +1,62 @@
+#!/bin/bash
+#------------------------------
+# Launch of the data-parallel training jobs.
+# Run this file from a job script, in the directory of the training, with the command of every rank:
+#   bash distributed.sh <command>
+# The launch settings are read from the launch.env file of the directory:
+#   DIST_WORLD_SIZE: the number of ranks, default 1.
+#   DIST_BACKEND: the torch.distributed backend of dist_check.py, nccl on the GPUs or gloo on the CPU,
+#   default nccl. The trainers create their process group with their own backend.
+#   DIST_SINGLE_DEVICE: 1 to keep only the first GPU of the allocation, default 0.
+# In a Slurm job the ranks are the tasks of an srun step, one node is used for a single rank.
+# Outside Slurm the ranks are started on the local host, e.g. to test the launch with CPU ranks and gloo.
+# Every rank gets the torch.distributed variables: MASTER_ADDR, MASTER_PORT, WORLD_SIZE, RANK,
+# LOCAL_RANK, LOCAL_WORLD_SIZE and NODE_RANK.
+# The command fails if any rank fails.
+#------------------------------
+
+[ ! -f launch.env ] || source ./launch.env
+export DIST_WORLD_SIZE=${DIST_WORLD_SIZE:-1}
+export DIST_BACKEND=${DIST_BACKEND:-nccl}
+
+if [ -z "${DIST_RANK_STEP}" ]; then
+    export DIST_RANK_STEP=1
+    export WORLD_SIZE=${DIST_WORLD_SIZE}
+    # one port per job, so that the jobs sharing a node do not collide
+    export MASTER_PORT=${MASTER_PORT:-$((20000 + ${SLURM_JOB_ID:-$$} % 20000))}
+    if [ "${DIST_SINGLE_DEVICE:-0}" -eq 1 ] && [ -n "${CUDA_VISIBLE_DEVICES}" ]; then
+        export CUDA_VISIBLE_DEVICES=${CUDA_VISIBLE_DEVICES%%,*}
+    fi
+
+    if [ -n "${SLURM_JOB_ID}" ]; then
+        export MASTER_ADDR=$(scontrol show hostnames "${SLURM_JOB_NODELIST}" | head -n 1)
+        dist_nodes=${SLURM_JOB_NUM_NODES:-1}
+        [ "${DIST_WORLD_SIZE}" -ge "${dist_nodes}" ] || dist_nodes=${DIST_WORLD_SIZE}
+        echo "Launching ${DIST_WORLD_SIZE} ranks on ${dist_nodes} nodes, backend ${DIST_BACKEND}"
+        exec srun --ntasks="${DIST_WORLD_SIZE}" --nodes="${dist_nodes}" --kill-on-bad-exit=1 \
+            bash "$0" "$@"
+    fi
+
+    export MASTER_ADDR=127.0.0.1
+    echo "Launching ${DIST_WORLD_SIZE} local ranks, backend ${DIST_BACKEND}"
+    dist_pids=()
+    for dist_rank in $(seq 0 $((DIST_WORLD_SIZE - 1))); do
+        SLURM_PROCID=${dist_rank} SLURM_LOCALID=${dist_rank} SLURM_NODEID=0 \
+            SLURM_STEP_TASKS_PER_NODE=${DIST_WORLD_SIZE} bash "$0" "$@" &
+        dist_pids+=($!)
+    done
+    dist_status=0
+    for dist_pid in "${dist_pids[@]}"; do
+        wait "${dist_pid}" || dist_status=1
+    done
+    exit ${dist_status}
+fi
+
+# rank of the srun step, or of the local launch
+export RANK=${SLURM_PROCID:-0}
+export LOCAL_RANK=${SLURM_LOCALID:-0}
+export NODE_RANK=${SLURM_NODEID:-0}
+# tasks per node as "2(x3),1", the ranks are distributed in blocks
+export LOCAL_WORLD_SIZE=${SLURM_STEP_TASKS_PER_NODE%%[(,]*}
+export LOCAL_WORLD_SIZE=${LOCAL_WORLD_SIZE:-1}
+exec "$@"
@@ -0,0 +1,147 @@
+"""
+Time to the first step of a training command, with the state of the compile cache.
+Run from a job script, it only needs the standard library:
+    python first_step.py --pattern <regex> [--epochs <regex>] [--cache <directory>] -- <command>
+The command runs in a shell, its output is forwarded unchanged, and the time to the first line
+of the output matching the pattern, the first progress line of the trainer, and the total time
+are written to first_step.json in the working directory.
+With --epochs, a regular expression of the progress lines whose group is the epoch number,
+the epochs trained after the first step are counted: a run resumed from a checkpoint
+only trains the epochs left, not the maximum number of epochs of its configuration.
+With a compile cache, the record is also appended to first_step.jsonl in the cache.
+The number of cache files written by the command counts the compilations missing from the cache:
+the run is cold when it wrote any, warm when everything was found in the cache.
+With --report <directory>, the records of the cache are summarised instead.
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import fcntl
+import signal
+import statistics
+import threading
+import subprocess
+from argparse import Namespace, ArgumentParser, REMAINDER
+from pathlib import Path
+from typing import TextIO
+
+FIRST_STEP_FILE_NAME: str = 'first_step.json'
+FIRST_STEP_HISTORY_NAME: str = 'first_step.jsonl'
+
+def count_files(path: Path) -> int:
+    """
+    Count the files of the cache directories, without the records at the top level.
+    """
+    return sum(len(files) for root, _, files in os.walk(path) if Path(root) != path)
+
+def get_epoch(line: str, epoch_pattern: re.Pattern | None) -> str | None:
+    """
+    Get the epoch number of a progress line, None for another line.
+    """
+    match = epoch_pattern.search(line) if epoch_pattern else None
+    return match.group(1) if match else None
+
+def run(command: str, pattern: re.Pattern, cache_path: Path | None,
+        epoch_pattern: re.Pattern | None = None) -> int:
+    """
+    Run the command and record its time to the first step, and the epochs trained after it.
+    """
+    files_before: int = count_files(cache_path) if cache_path else 0
+    start: float = time.time()
+    first_step: list[float] = []
+    # epoch numbers of the progress lines, up to the first step line they are not timed
+    first_epochs: set[str] = set()
+    epochs: set[str] = set()
+    lock = threading.Lock()
+
+    # the trainers are python scripts, unbuffered so that the lines are timed when they are printed
+    process = subprocess.Popen(command, shell=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                               text=True, bufsize=1, env={**os.environ, 'PYTHONUNBUFFERED': '1'})
+    for sig in [signal.SIGTERM, signal.SIGUSR1]:
+        signal.signal(sig, lambda signum, _: process.send_signal(signum))
+
+    def forward(source: TextIO, dest: TextIO):
+        for line in source:
+            dest.write(line)
+            dest.flush()
+            with lock:
+                untimed: bool = not first_step
+                if untimed and pattern.search(line):
+                    first_step.append(time.time() - start)
+                epoch: str | None = get_epoch(line, epoch_pattern)
+                if epoch is not None:
+                    (first_epochs if untimed else epochs).add(epoch)
+
+    threads = [threading.Thread(target=forward, args=(process.stdout, sys.stdout)),
+               threading.Thread(target=forward, args=(process.stderr, sys.stderr))]
+    for thread in threads:
+        thread.start()
+    exit_code: int = process.wait()
+    for thread in threads:
+        thread.join()
+
+    files_after: int = count_files(cache_path) if cache_path else 0
+    # a cache shared by other architectures is not empty but can still miss every graph of this run
+    new_files: int = files_after - files_before
+    record: dict = {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'job_id': os.environ.get('SLURM_JOB_ID', ''),
+        'array_task_id': os.environ.get('SLURM_ARRAY_TASK_ID', ''),
+        'path': os.getcwd(),
+        'command': command,
+        'time_to_first_step': first_step[0] if first_step else None,
+        'elapsed': time.time() - start,
+        'epochs': len(epochs - first_epochs) if epoch_pattern else None,
+        'cache': ('warm' if new_files == 0 else 'cold') if cache_path else 'none',
+        'cache_files_before': files_before,
+        'new_cache_files': new_files,
+        'exit_code': exit_code,
+    }
+    Path(FIRST_STEP_FILE_NAME).write_text(json.dumps(record, indent=2), encoding='utf-8')
+    if cache_path:
+        with (cache_path / FIRST_STEP_HISTORY_NAME).open('a', encoding='utf-8') as file:
+            fcntl.flock(file, fcntl.LOCK_EX)
+            file.write(json.dumps(record) + '\n')
+    print(f'Time to first step: {record["time_to_first_step"]} s, {record["cache"]} compile cache, '
+          f'{record["new_cache_files"]} new cache files')
+    return exit_code
+
+def report(cache_path: Path) -> None:
+    """
+    Print the median time to the first step of the runs with a cold and a warm cache.
+    """
+    with (cache_path / FIRST_STEP_HISTORY_NAME).open('r', encoding='utf-8') as file:
+        records: list[dict] = [json.loads(line) for line in file if line.strip()]
+    for state in ['cold', 'warm']:
+        times: list[float] = [r['time_to_first_step'] for r in records
+                              if r['cache'] == state and r['time_to_first_step'] is not None]
+        if times:
+            print(f'{state} cache: {len(times)} runs, median time to first step '
+                  f'{statistics.median(times):.1f} s, min {min(times):.1f} s, max {max(times):.1f} s')
+        else:
+            print(f'{state} cache: no runs')
+
+def parse_args() -> Namespace:
+    """
+    Parse the command line arguments.
+    """
+    parser: ArgumentParser = ArgumentParser(description='Time a training command to its first step.')
+    parser.add_argument('--pattern', type=str, help='Regular expression of the first progress line')
+    parser.add_argument('--epochs', type=str,
+                        help='Regular expression of the progress lines, with the epoch number as its group')
+    parser.add_argument('--cache', type=str, help='Path to the compile cache')
+    parser.add_argument('--report', type=str, help='Summarise the records of a compile cache')
+    parser.add_argument('command', nargs=REMAINDER, help='Training command, after --')
+    return parser.parse_args()
+
+if __name__ == '__main__':
+    args: Namespace = parse_args()
+    if args.report:
+        report(Path(args.report))
+        sys.exit(0)
+    cmd: list[str] = args.command[1:] if args.command[:1] == ['--'] else args.command
+    sys.exit(run(' '.join(cmd), re.compile(args.pattern), Path(args.cache) if args.cache else None,
+                 re.compile(args.epochs) if args.epochs else None))
@@ -0,0 +1,32 @@
+#!/bin/bash
+#------------------------------
+# Thread/rank layout of the experiment jobs.
+# Source this file from a job script with the file holding the tuned layouts:
+#   source layout.sh <file>
+# A layout is a line of the file as:
+#   # layout <partition>: LAYOUT_NTASKS=<n> LAYOUT_THREADS=<t> OMP_PROC_BIND=<bind> OMP_PLACES=<places>
+# The layout tuned for the partition of the job is applied if it fits in the allocation:
+# LAYOUT_NTASKS and LAYOUT_THREADS are set for the job command and the binding is exported.
+# Otherwise the layout of the allocation is kept.
+#------------------------------
+
+layout_line=$(sed -n "s/^# layout ${SLURM_JOB_PARTITION}: //p" "$1" 2>/dev/null | tail -n 1)
+unset LAYOUT_NTASKS LAYOUT_THREADS
+
+layout_value () {
+    tr ' ' '\n' <<< "${layout_line}" | sed -n "s/^$1=//p"
+}
+
+if [ -n "${layout_line}" ]; then
+    LAYOUT_NTASKS=$(layout_value LAYOUT_NTASKS)
+    LAYOUT_THREADS=$(layout_value LAYOUT_THREADS)
+    if [ $((LAYOUT_NTASKS * LAYOUT_THREADS)) -le $((${SLURM_NTASKS:-1} * ${SLURM_CPUS_PER_TASK:-1})) ]; then
+        echo "Using the tuned layout: ${layout_line}"
+        export OMP_PROC_BIND=$(layout_value OMP_PROC_BIND)
+        export OMP_PLACES=$(layout_value OMP_PLACES)
+        export SRUN_CPUS_PER_TASK=${LAYOUT_THREADS}
+    else
+        echo "The tuned layout does not fit in the allocation, ignored: ${layout_line}"
+        unset LAYOUT_NTASKS LAYOUT_THREADS
+    fi
+fi
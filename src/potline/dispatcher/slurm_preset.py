@@ -22,6 +22,7 @@ class JobType(Enum):
     DEEP = 'deep'
     WATCH_DEEP = 'w_deep'
     CONV = 'conv'
+    EVAL = 'eval'
     EXP = 'exp'
     WATCH_EXP = 'w_exp'
 
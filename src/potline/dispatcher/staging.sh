@@ -0,0 +1,144 @@
+#!/bin/bash
+#------------------------------
+# Node-local staging of the array jobs.
+# Source this file from a job script, in the directory of the array task:
+#   source staging.sh <sync interval in seconds>
+# The directory is copied to ${TMPDIR} and the job continues from the copy.
+# The inputs referenced with an absolute path in its yaml and LAMMPS input files
+# (datasets, models) are copied to ${TMPDIR} too, with sbcast on every node of multi-node jobs,
+# and the staged files are rewritten to use the local copies.
+# The paths relative to the parent directories (../) in its yaml, LAMMPS input and shell files,
+# e.g. the results of other experiments, are rewritten to point to the original directory.
+# The results are copied back every <sync interval> seconds while the job runs,
+# by stage_out, and when the job exits or is terminated.
+# The rewritten files are never copied back.
+# The job runs its commands in the background and waits for them with stage_wait,
+# so that the termination signals are handled while they run.
+#------------------------------
+
+STAGE_INTERVAL=${1:-600}
+STAGE_SOURCE=$(pwd)
+STAGE_ROOT=${TMPDIR:-/tmp}/potline_${SLURM_JOB_ID:-$$}
+STAGE_RUN=${STAGE_ROOT}/run
+STAGE_INPUTS=${STAGE_ROOT}/inputs
+stage_rewritten=()
+
+# copy a file or directory to the same path on every node of the job
+stage_broadcast () {
+    local source=$1
+    local dest=$2
+    if [ "${SLURM_JOB_NUM_NODES:-1}" -le 1 ]; then
+        cp -a "${source}" "${dest}"
+    elif [ -f "${source}" ]; then
+        sbcast -f "${source}" "${dest}"
+    else
+        srun --nodes="${SLURM_JOB_NUM_NODES}" --ntasks-per-node=1 --overlap cp -a "${source}" "${dest}"
+    fi
+}
+
+# escape a literal string for the pattern or the replacement of a sed s#...#...# command
+stage_escape_pattern () {
+    printf '%s' "$1" | sed 's/[][\\.*^$#]/\\&/g'
+}
+
+stage_escape_replacement () {
+    printf '%s' "$1" | sed 's/[\\&#]/\\&/g'
+}
+
+stage_out () {
+    if command -v rsync > /dev/null; then
+        rsync -a "${stage_rewritten[@]/#/--exclude=/}" "${STAGE_RUN}/" "${STAGE_SOURCE}/"
+        return
+    fi
+    # without rsync, the updated files are copied
+    local entry
+    for entry in "${STAGE_RUN}"/* "${STAGE_RUN}"/.[!.]*; do
+        [ -e "${entry}" ] || continue
+        [[ " ${stage_rewritten[*]} " == *" $(basename "${entry}") "* ]] && continue
+        cp -a -u "${entry}" "${STAGE_SOURCE}/"
+    done
+}
+
+stage_finish () {
+    trap - EXIT
+    kill ${stage_sync_pid} 2>/dev/null
+    stage_out
+    cd "${STAGE_SOURCE}"
+    rm -rf "${STAGE_ROOT}"
+}
+
+if [ "${SLURM_JOB_NUM_NODES:-1}" -gt 1 ]; then
+    srun --nodes="${SLURM_JOB_NUM_NODES}" --ntasks-per-node=1 --overlap mkdir -p "${STAGE_INPUTS}"
+fi
+mkdir -p "${STAGE_RUN}" "${STAGE_INPUTS}"
+cp -a . "${STAGE_RUN}/"
+
+declare -A stage_copies
+for staged in "${STAGE_RUN}"/*.yaml "${STAGE_RUN}"/*.in "${STAGE_RUN}"/*.sh; do
+    [ -f "${staged}" ] || continue
+    rewritten=0
+    # the parent directories of the copy are not the ones of the original directory
+    if grep -qE "(^|[[:space:]\"'=:,[(])\.\./" "${staged}"; then
+        sed -i -E "s#(^|[[:space:]\"'=:,[(])\.\./#\1$(stage_escape_replacement "${STAGE_SOURCE}")/../#g" \
+            "${staged}"
+        rewritten=1
+    fi
+    inputs=""
+    # the shell scripts reference tools and modules by absolute path, only the data files are staged
+    [[ "${staged}" == *.sh ]] || \
+        inputs=$(grep -oE "(^|[[:space:]\"'=:,[])/[^[:space:]\"',]*" "${staged}" | sed 's#^[^/]##' | sort -u)
+    for input in ${inputs}; do
+        # only the existing inputs outside the staged directory
+        [ -e "${input}" ] || continue
+        case "${input}" in
+            "${STAGE_SOURCE}"|"${STAGE_SOURCE}"/*) continue ;;
+        esac
+        if [ -z "${stage_copies[${input}]}" ]; then
+            stage_copies[${input}]=${STAGE_INPUTS}/${#stage_copies[@]}_$(basename "${input}")
+            echo "Staging ${input} to ${stage_copies[${input}]}"
+            stage_broadcast "${input}" "${stage_copies[${input}]}"
+        fi
+        sed -i "s#$(stage_escape_pattern "${input}")\([[:space:]\"',]\|$\)#$(stage_escape_replacement \
+            "${stage_copies[${input}]}")\1#g" "${staged}"
+        rewritten=1
+    done
+    if [ ${rewritten} -eq 1 ]; then
+        stage_rewritten+=("$(basename "${staged}")")
+    fi
+done
+
+cd "${STAGE_RUN}"
+echo "Running from ${STAGE_RUN}"
+
+while sleep "${STAGE_INTERVAL}"; do
+    stage_out
+done &
+stage_sync_pid=$!
+trap stage_finish EXIT
+
+# stop the commands of the job, giving them up to 30 s to write their last results
+stage_stop () {
+    [ -n "${stage_job_pid}" ] || return
+    local children
+    children=$(pgrep -P "${stage_job_pid}")
+    kill -TERM "${stage_job_pid}" ${children} 2>/dev/null
+    wait "${stage_job_pid}"
+    local child
+    local waited=0
+    for child in ${children}; do
+        while kill -0 "${child}" 2>/dev/null && [ ${waited} -lt 30 ]; do
+            sleep 1
+            waited=$((waited + 1))
+        done
+    done
+}
+
+# a terminated job stops its commands and exits through the EXIT trap,
+# bash only runs the trap once the foreground command is done, hence the commands in the background
+trap 'stage_stop; exit 143' TERM USR1
+
+# wait for the commands of the job run in the background, and return their status
+stage_wait () {
+    stage_job_pid=$1
+    wait "${stage_job_pid}"
+}
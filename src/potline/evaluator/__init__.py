@@ -0,0 +1,13 @@
+"""
+Evaluation of the models on a common test set.
+"""
+
+from .evaluator import (
+    ModelEvaluator,
+    TestSet,
+    EVAL_DIR_NAME,
+    EVAL_SUMMARY_NAME,
+    EVAL_FAILURES_NAME,
+    get_errors_path,
+    )
+from .analytics import ErrorAnalytics, ANALYTICS_DIR_NAME
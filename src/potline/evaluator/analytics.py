@@ -0,0 +1,158 @@
+"""
+Streaming analytics of the per-structure errors of many models.
+"""
+
+import csv
+from pathlib import Path
+
+import numpy as np
+
+from ..model import StructureErrors
+
+ANALYTICS_DIR_NAME: str = 'error_analytics'
+# log-spaced bins of the absolute errors, in eV/atom for the energies and eV/A for the forces
+HIST_EDGES: np.ndarray = np.logspace(-6, 2, 161)
+QUANTILES: list[float] = [0.5, 0.9, 0.99]
+# per-structure metrics and the per-atom force error
+STRUCTURE_METRICS: list[str] = ['energy_error', 'force_rmse', 'force_max']
+METRICS: list[str] = STRUCTURE_METRICS + ['atom_force_error']
+TYPE_FIELDS: list[str] = ['model', 'config_type', 'structures', 'mae_epa', 'rmse_epa', 'rmse_f_comp']
+
+class ErrorAnalytics():
+    """
+    Error distributions, worst structures and errors by configuration type of many models,
+    updated one model at a time, so that only the errors of the current model are in memory.
+    The distributions are histograms on fixed bins, their quantiles are resolved to a bin,
+    and the statistics by configuration type are running sums.
+
+    Args:
+        - top_n: the number of worst structures kept for each per-structure metric.
+    """
+    def __init__(self, top_n: int = 20):
+        self._top_n: int = top_n
+        self._counts: dict[str, dict[str, np.ndarray]] = {}
+        self._max: dict[str, dict[str, float]] = {}
+        self._worst: dict[str, list[tuple[float, str, int, str]]] = {
+            metric: [] for metric in STRUCTURE_METRICS}
+        # structures, sum of |energy error|, sum of squared energy errors,
+        # sum of squared force errors and number of force components, per model and configuration type
+        self._type_sums: dict[tuple[str, str], np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return len(self._counts)
+
+    def add(self, label: str, errors: StructureErrors) -> None:
+        """
+        Add the errors of a model.
+
+        Args:
+            - label: the name of the model.
+            - errors: the per-structure errors of the model.
+        """
+        values: dict[str, np.ndarray] = {
+            metric: np.abs(errors.columns[metric]) for metric in STRUCTURE_METRICS}
+        values['atom_force_error'] = errors.atom_force_error
+        self._counts[label] = {metric: np.histogram(np.clip(value, HIST_EDGES[0], HIST_EDGES[-1]),
+                                                    HIST_EDGES)[0] for metric, value in values.items()}
+        self._max[label] = {metric: float(value.max()) for metric, value in values.items()}
+
+        for metric in STRUCTURE_METRICS:
+            n: int = min(self._top_n, len(errors))
+            top: np.ndarray = np.argpartition(values[metric], -n)[-n:]
+            self._worst[metric] = sorted(self._worst[metric] + [
+                (float(values[metric][i]), label, int(errors.columns['structure'][i]),
+                 str(errors.columns['config_type'][i])) for i in top], reverse=True)[:self._top_n]
+
+        types, inverse = np.unique(errors.columns['config_type'], return_inverse=True)
+        components: np.ndarray = 3 * errors.columns['n_atoms']
+        sums: np.ndarray = np.stack([
+            np.bincount(inverse, minlength=len(types)),
+            np.bincount(inverse, values['energy_error'], len(types)),
+            np.bincount(inverse, values['energy_error'] ** 2, len(types)),
+            np.bincount(inverse, errors.columns['force_rmse'] ** 2 * components, len(types)),
+            np.bincount(inverse, components, len(types)),
+        ], axis=1)
+        for config_type, type_sums in zip(types, sums):
+            self._type_sums[(label, str(config_type))] = type_sums
+
+    def add_file(self, label: str, errors_path: Path) -> None:
+        """
+        Add the errors of a model from a file written by StructureErrors.save.
+        """
+        self.add(label, StructureErrors.load(errors_path))
+
+    def _get_counts(self, metric: str, label: str | None = None) -> np.ndarray:
+        """
+        Get the histogram of the absolute errors of a model, or the sum over all the models if label is None.
+        """
+        labels: list[str] = [label] if label is not None else list(self._counts)
+        return sum((self._counts[name][metric] for name in labels),
+                   start=np.zeros(len(HIST_EDGES) - 1, dtype=int))
+
+    def get_quantiles(self, metric: str, label: str | None = None) -> list[float]:
+        """
+        Get the QUANTILES of the absolute errors, as the upper edge of the bin holding them.
+
+        Args:
+            - metric: one of METRICS.
+            - label: the name of the model, all the models if None.
+
+        Returns:
+            list[float]: the quantiles.
+        """
+        cumulative: np.ndarray = np.cumsum(self._get_counts(metric, label))
+        bins: np.ndarray = np.searchsorted(cumulative, np.array(QUANTILES) * cumulative[-1])
+        return [float(HIST_EDGES[b + 1]) for b in bins]
+
+    def write(self, out_path: Path) -> None:
+        """
+        Write the quantiles of every model and of all the models, the histograms of all the models,
+        the worst structures and the errors by configuration type.
+
+        Args:
+            - out_path: the output directory.
+        """
+        out_path.mkdir(parents=True, exist_ok=True)
+        quantile_fields: list[str] = [f'p{round(q * 100)}' for q in QUANTILES]
+        with (out_path / 'error_quantiles.csv').open('w', encoding='utf-8', newline='') as file:
+            quantile_writer = csv.writer(file)
+            quantile_writer.writerow(['model', 'metric', 'count'] + quantile_fields + ['max'])
+            for label in list(self._counts) + [None]:
+                for metric in METRICS:
+                    max_error: float = self._max[label][metric] if label is not None \
+                        else max(m[metric] for m in self._max.values())
+                    count: int = int(self._get_counts(metric, label).sum())
+                    quantile_writer.writerow([label or 'all', metric, count]
+                                             + self.get_quantiles(metric, label) + [max_error])
+
+        with (out_path / 'error_histograms.csv').open('w', encoding='utf-8', newline='') as file:
+            histogram_writer = csv.writer(file)
+            histogram_writer.writerow(['bin_low', 'bin_high'] + METRICS)
+            totals: list[np.ndarray] = [self._get_counts(metric) for metric in METRICS]
+            for i in range(len(HIST_EDGES) - 1):
+                histogram_writer.writerow([HIST_EDGES[i], HIST_EDGES[i + 1]]
+                                          + [int(total[i]) for total in totals])
+
+        with (out_path / 'worst_structures.csv').open('w', encoding='utf-8', newline='') as file:
+            worst_writer = csv.writer(file)
+            worst_writer.writerow(['metric', 'rank', 'model', 'structure', 'config_type', 'error'])
+            for metric, worst in self._worst.items():
+                for rank, (value, label, structure, config_type) in enumerate(worst, 1):
+                    worst_writer.writerow([metric, rank, label, structure, config_type, value])
+
+        with (out_path / 'errors_by_config_type.csv').open('w', encoding='utf-8', newline='') as file:
+            type_writer = csv.DictWriter(file, TYPE_FIELDS)
+            type_writer.writeheader()
+            type_sums: dict[tuple[str, str], np.ndarray] = dict(self._type_sums)
+            for (_, config_type), sums in self._type_sums.items():
+                type_sums[('all', config_type)] = \
+                    type_sums.get(('all', config_type), np.zeros_like(sums)) + sums
+            for (label, config_type), sums in sorted(type_sums.items()):
+                type_writer.writerow({
+                    'model': label,
+                    'config_type': config_type,
+                    'structures': int(sums[0]),
+                    'mae_epa': sums[1] / sums[0],
+                    'rmse_epa': np.sqrt(sums[2] / sums[0]),
+                    'rmse_f_comp': np.sqrt(sums[3] / sums[4]),
+                })
@@ -0,0 +1,244 @@
+"""
+Evaluation of all the candidate models of a sweep on a common held-out test set.
+"""
+
+from __future__ import annotations
+
+import csv
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from ase import Atoms
+from ase.calculators.calculator import Calculator
+from xpot import maths # type: ignore
+
+from ..config_reader import ConfigReader, MainSectionKW
+from ..dispatcher import DispatcherManager, JobType
+from ..model import StructureErrors
+from ..loss_logger import ModelTracker
+from ..hyper_searcher import PotOptimizer, OPTIM_DIR_NAME
+from ..deep_trainer import DeepTrainer, DEEP_TRAIN_DIR_NAME
+from ..dataset_io import read_dataset, is_xyz, read_xyz, get_xyz_energies
+
+EVAL_DIR_NAME: str = 'evaluation'
+EVAL_SUMMARY_NAME: str = 'eval_summary.csv'
+EVAL_FAILURES_NAME: str = 'eval_failures.csv'
+SUMMARY_FIELDS: list[str] = ['stage', 'iteration', 'subiteration', 'structures', 'rmse_epa', 'mae_epa',
+                             'rmse_f_comp', 'mae_f_comp', 'max_f', 'loss']
+FAILURE_FIELDS: list[str] = ['stage', 'iteration', 'subiteration', 'step', 'error']
+
+def get_errors_path(eval_path: Path, stage: str, iteration: int, subiter: int) -> Path:
+    """
+    Get the path of the per-structure errors of a model.
+
+    Args:
+        - eval_path: the evaluation directory of the sweep.
+        - stage: 'hyper', 'deep' or 'pretrained'.
+        - iteration: the iteration of the model.
+        - subiter: the subiteration of the model.
+
+    Returns:
+        Path: the path of the errors file.
+    """
+    return eval_path / f'errors_{stage}_{iteration}_{subiter}.npz'
+
+class TestSet():
+    """
+    Held-out test set, loaded once and shared by the evaluation of every model.
+    The reference forces of all the structures are stored in a single array,
+    the atoms of structure i being the rows offsets[i] to offsets[i+1].
+
+    Args:
+        - structures: the structures.
+        - energies: the reference energy of each structure, in eV.
+        - forces: the reference forces of each structure, in eV/A.
+        - config_types: the configuration type of each structure.
+    """
+    def __init__(self, structures: list[Atoms], energies: list[float],
+                 forces: list[np.ndarray], config_types: list[str]):
+        self.structures: list[Atoms] = structures
+        self.n_atoms: np.ndarray = np.array([len(atoms) for atoms in structures])
+        self.offsets: np.ndarray = np.concatenate([[0], np.cumsum(self.n_atoms)])
+        self.energies: np.ndarray = np.array(energies, dtype=float) / self.n_atoms
+        self.forces: np.ndarray = np.concatenate([np.reshape(f, (-1, 3)) for f in forces]).astype(float)
+        self.config_types: np.ndarray = np.array(config_types, dtype=str)
+
+    def __len__(self) -> int:
+        return len(self.structures)
+
+    @staticmethod
+    def load(data_path: Path, energy_key: str = 'energy', forces_key: str = 'forces') -> TestSet:
+        """
+        Load a test set in the pacemaker/gracemaker format (a pickled DataFrame with an ase_atoms column)
+        or the MACE format (an extended xyz file).
+        The total energies are used, the energies corrected by the reference energies of pacemaker
+        only when the total ones are missing.
+
+        Args:
+            - data_path: the path to the test set.
+            - energy_key: the key of the energy in the xyz info.
+            - forces_key: the key of the forces in the xyz arrays.
+
+        Returns:
+            TestSet: the test set.
+        """
+        if is_xyz(data_path):
+            structures: list[Atoms] = read_xyz(data_path)
+            energies: list[float] = get_xyz_energies(structures, energy_key)
+            forces: list[np.ndarray] = [atoms.arrays[forces_key] if forces_key in atoms.arrays
+                                        else atoms.get_forces() for atoms in structures]
+            config_types: list[str] = [str(atoms.info.get('config_type', '')) for atoms in structures]
+            return TestSet(structures, energies, forces, config_types)
+
+        frame: pd.DataFrame = read_dataset(data_path)
+        energy_column: str = 'energy' if 'energy' in frame else 'energy_corrected'
+        type_column: str | None = next((c for c in ['config_type', 'name'] if c in frame), None)
+        return TestSet(list(frame['ase_atoms']), list(frame[energy_column]), list(frame['forces']),
+                       [str(t) for t in frame[type_column]] if type_column else [''] * len(frame))
+
+    def evaluate(self, calculator: Calculator, batch_size: int = 64) -> StructureErrors:
+        """
+        Evaluate a model on the test set, one batch of structures at a time.
+        The predicted forces of a batch are reduced to per-structure errors at once,
+        and only the errors are kept.
+
+        Args:
+            - calculator: the ASE calculator of the model.
+            - batch_size: the number of structures per batch.
+
+        Returns:
+            StructureErrors: the per-structure errors.
+        """
+        parts: list[StructureErrors] = []
+        for start in range(0, len(self), batch_size):
+            stop: int = min(start + batch_size, len(self))
+            energy_pred: np.ndarray = np.empty(stop - start)
+            batch_forces: np.ndarray = np.empty((self.offsets[stop] - self.offsets[start], 3))
+            for i in range(start, stop):
+                atoms: Atoms = self.structures[i].copy()
+                atoms.calc = calculator
+                energy_pred[i-start] = atoms.get_potential_energy() / self.n_atoms[i]
+                batch_forces[self.offsets[i]-self.offsets[start]:self.offsets[i+1]-self.offsets[start]] = \
+                    atoms.get_forces()
+
+            parts.append(StructureErrors.from_predictions(
+                self.n_atoms[start:stop], self.energies[start:stop], energy_pred,
+                batch_forces - self.forces[self.offsets[start]:self.offsets[stop]],
+                self.config_types[start:stop], start))
+            print(f'Evaluated {stop}/{len(self)} structures')
+        return StructureErrors.concatenate(parts)
+
+class ModelEvaluator():
+    """
+    Evaluation of every candidate model of a sweep, the hyperparameter search trials,
+    the deep trained models and the pretrained model, on the same held-out test set,
+    so that they are ranked on the same structures whatever the trainer.
+
+    Args:
+        - config_path: the path to the configuration file.
+    """
+    def __init__(self, config_path: Path):
+        self._config_path: Path = config_path
+        self._config = ConfigReader(config_path).get_eval_config()
+        self._gen_config = ConfigReader(config_path).get_general_config()
+        self._eval_path: Path = self._config.sweep_path / EVAL_DIR_NAME
+        # placeholder without hyperparameter search, as for the conversion
+        self._energy_weight: float = 0.5
+        if MainSectionKW.HYPER_SEARCH.value in ConfigReader(config_path).config_data:
+            self._energy_weight = ConfigReader(config_path).get_optimizer_config().energy_weight
+
+    def get_candidates(self) -> list[tuple[str, ModelTracker]]:
+        """
+        Get the candidate models of the sweep.
+
+        Returns:
+            list[tuple[str, ModelTracker]]: the stage and the tracker of each model.
+        """
+        candidates: list[tuple[str, ModelTracker]] = []
+        if (self._config.sweep_path / OPTIM_DIR_NAME).exists():
+            candidates += [('hyper', tracker) for tracker in
+                           PotOptimizer.get_model_trackers(self._config.sweep_path, self._config.model_name)]
+        if (self._config.sweep_path / DEEP_TRAIN_DIR_NAME).exists():
+            candidates += [('deep', tracker) for tracker in
+                           DeepTrainer.get_model_trackers(self._config.sweep_path, self._config.model_name)]
+        if self._gen_config.pretrained_path:
+            candidates.append(('pretrained', ModelTracker.from_path(
+                self._config.model_name, self._gen_config.pretrained_path, pretrained=True)))
+        return sorted(candidates, key=lambda c: (c[0], c[1].iteration, c[1].subiter))
+
+    def evaluate(self) -> list[dict]:
+        """
+        Evaluate the candidate models, writing the per-structure errors of each model,
+        the summary of the sweep, sorted by loss, and the models that could not be loaded or evaluated
+        in the evaluation directory.
+
+        Returns:
+            list[dict]: the summary of each model, with the SUMMARY_FIELDS keys.
+        """
+        self._eval_path.mkdir(exist_ok=True)
+        test_set = TestSet.load(self._config.test_path, self._config.energy_key, self._config.forces_key)
+        print(f'Loaded {len(test_set)} test structures from {self._config.test_path}')
+
+        rows: list[dict] = []
+        failures: list[dict] = []
+        for stage, tracker in self.get_candidates():
+            name: str = f'{stage} model {tracker.iteration}-{tracker.subiter}'
+            model_id: dict = {'stage': stage, 'iteration': tracker.iteration, 'subiteration': tracker.subiter}
+            try:
+                calculator: Calculator = tracker.model.get_calculator()
+            except (FileNotFoundError, NotImplementedError, ValueError) as e:
+                print(f'Skipping {name}: {e}')
+                failures.append({**model_id, 'step': 'load', 'error': str(e)})
+                continue
+            print(f'Evaluating {name}')
+            # a failing model, e.g. out of memory, must not stop the evaluation of the others
+            try:
+                errors: StructureErrors = test_set.evaluate(calculator, self._config.batch_size)
+            except (RuntimeError, ValueError, MemoryError) as e:
+                print(f'Failed to evaluate {name}: {e}')
+                failures.append({**model_id, 'step': 'evaluate', 'error': str(e)})
+                continue
+            errors.save(get_errors_path(self._eval_path, stage, tracker.iteration, tracker.subiter))
+
+            summary: dict[str, float] = errors.summarize()
+            rows.append({
+                **model_id,
+                **summary,
+                'loss': maths.calculate_loss(summary['rmse_epa'], summary['rmse_f_comp'],
+                                             self._energy_weight),
+            })
+
+        rows.sort(key=lambda row: row['loss'])
+        with (self._eval_path / EVAL_SUMMARY_NAME).open('w', encoding='utf-8', newline='') as file:
+            writer = csv.DictWriter(file, SUMMARY_FIELDS)
+            writer.writeheader()
+            writer.writerows(rows)
+        with (self._eval_path / EVAL_FAILURES_NAME).open('w', encoding='utf-8', newline='') as file:
+            writer = csv.DictWriter(file, FAILURE_FIELDS)
+            writer.writeheader()
+            writer.writerows(failures)
+        return rows
+
+    @staticmethod
+    def run_eval(config_path: Path, dependency: int | None = None) -> int:
+        """
+        Run the evaluation of the candidate models, in a single job.
+
+        Args:
+            - config_path: the path to the configuration file.
+            - dependency: the job dependency.
+
+        Returns:
+            int: The id of the evaluation job.
+        """
+        eval_config = ConfigReader(config_path).get_eval_config()
+        gen_config = ConfigReader(config_path).get_general_config()
+        cli_path: Path = gen_config.repo_path / 'src' / 'run_eval.py'
+        out_path: Path = eval_config.sweep_path / EVAL_DIR_NAME
+        out_path.mkdir(exist_ok=True)
+        eval_cmd: str = f'{gen_config.python_bin} {cli_path} --config {config_path}'
+        eval_manager = DispatcherManager(JobType.EVAL.value, eval_config.model_name,
+                                         eval_config.job_config.cluster)
+        eval_manager.set_job([eval_cmd], out_path, eval_config.job_config, dependency=dependency)
+        return eval_manager.dispatch_job()
@@ -3,8 +3,13 @@ LAMMPS experiment module.
 """
 
 from .experiment import Experiment
+from .result_store import ResultStore, RESULT_KEY_NAME
+from .history import BenchHistory, HISTORY_FILE_NAME
 from .properties_simulator import PropertiesSimulator
 from .inference_bencher import InferenceBencher
 from .hard_split_screw import HardSplitter
 from .dislocations import Dislocator
 from .cracks import Cracker
+from .screening import Screener, SCREENING_DIR_NAME
+from .pair_tuner import PairTuner, PAIR_TUNING_DIR_NAME
+from .layout_tuner import LayoutTuner, LAYOUT_TUNING_DIR_NAME
@@ -28,13 +28,14 @@ class Cracker():
         self._config = ConfigReader(config_path).get_experiment_config(MainSectionKW.CRACKS.value)
         self._out_path = self._config.sweep_path / CRACKS_DIR_NAME
 
-    def run_sim(self, dependency: int | None = None) -> list[int]:
+    def run_sim(self, dependency: int | None = None, screened: bool = False) -> list[int]:
         """
         Run properties simulation.
 
         Args:
             - config_path: the path to the configuration file.
             - dependency: the job dependency.
+            - screened: whether to skip the models that failed the screening.
 
         Returns:
             int: The id of the last watcher job.
@@ -46,7 +47,8 @@ class Cracker():
         setup_id: int = Experiment.run_exp(self._config_path, self._out_path / self.EXP_LIST[0],
                                            CRACKS_TEMPLATE_PATH / self.EXP_LIST[0],
                                            coeff_cmd, self._config.best_n_models,
-                                           self._config.job_config, self._config.model_name, dependency)
+                                           self._config.job_config, self._config.model_name, dependency,
+                                           screened)
 
         cracks_cmd: str = ' '.join([str(cmd) for cmd in [
             'bash', SUBMIT_SCRIPT_NAME,
@@ -58,6 +60,7 @@ class Cracker():
             out_ids.append(Experiment.run_exp(self._config_path, self._out_path / exp,
                                               CRACKS_TEMPLATE_PATH / exp,
                                               cracks_cmd, self._config.best_n_models,
-                                              self._config.job_config, self._config.model_name, setup_id))
+                                              self._config.job_config, self._config.model_name, setup_id,
+                                              screened))
 
         return out_ids
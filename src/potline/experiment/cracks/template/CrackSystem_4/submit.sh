@@ -11,6 +11,8 @@ export OMP_NUM_THREADS=${cpus_per_task}
 results_path=../../../properties_bench/${SLURM_ARRAY_TASK_ID}/data/results.txt
 coeff_path=../../coeff/${SLURM_ARRAY_TASK_ID}/lefm_coeffs/lefm_paras.CrackSystem_4
 
+source ./steps.sh
+
 # get the equilibrium constants
 a0=$(grep 'a0 =' ${results_path} | awk '{print $3}')
 mass=95.95
@@ -20,8 +22,13 @@ Kstart=`printf "%.0f" $(bc <<< "$KI*100-10")`
 Kstop=`printf "%.0f" $(bc <<< "$Kstart+100")`
 
 cp ${coeff_path} .
-sed -i '/Fe$/ s/$/ Fe/' ./potential.in
+# idempotent, the script can be resubmitted on the same folder
+sed -i '/Fe Fe$/! s/Fe$/Fe Fe/' ./potential.in
 
-eval srun -N 1 -n ${ntasks} ${LMMP} -in in.cracksystem_4 -v a0 ${a0} -v m ${mass} -v CrkSys 4 -v Kstart ${Kstart} -v Kstop ${Kstop}
-zip cs4_result.zip *dump*
-rm *dump*
+crack_step () {
+    rm -f cs4_result.zip
+    eval srun -N 1 -n ${ntasks} ${LMMP} -in in.cracksystem_4 -v a0 ${a0} -v m ${mass} -v CrkSys 4 -v Kstart ${Kstart} -v Kstop ${Kstop} &&
+    zip cs4_result.zip *dump* &&
+    rm *dump*
+}
+run_step crack "cs4_result.zip" "./potential.in in.cracksystem_4 lefm_paras.CrackSystem_4" crack_step
@@ -5,5 +5,11 @@ ntasks=$2
 export MKL_NUM_THREADS=${cpus_per_task}
 export OMP_NUM_THREADS=${cpus_per_task}
 
+source ./steps.sh
+
+results_path=../../../properties_bench/${SLURM_ARRAY_TASK_ID}/data/results.txt
+
 # first, solve the coeffs. 
-python Solve_aniso_coeff.py --resultspath ../../../properties_bench/${SLURM_ARRAY_TASK_ID}/data/results.txt
+run_step coeff \
+    "$(echo lefm_coeffs/lefm_paras.CrackSystem_{1..4})" "${results_path} Solve_aniso_coeff.py" \
+    python Solve_aniso_coeff.py --resultspath ${results_path}
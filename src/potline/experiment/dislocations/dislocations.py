@@ -29,13 +29,14 @@ class Dislocator():
         self._config = ConfigReader(config_path).get_experiment_config(MainSectionKW.DISCLOCATIONS.value)
         self._out_path = self._config.sweep_path / DISLOCATIONS_DIR_NAME
 
-    def run_sim(self, dependency: int | None = None) -> list[int]:
+    def run_sim(self, dependency: int | None = None, screened: bool = False) -> list[int]:
         """
         Run properties simulation.
 
         Args:
             - config_path: the path to the configuration file.
             - dependency: the job dependency.
+            - screened: whether to skip the models that failed the screening.
 
         Returns:
             int: The id of the last watcher job.
@@ -51,6 +52,7 @@ class Dislocator():
             out_ids.append(Experiment.run_exp(self._config_path, self._out_path / exp,
                                               DISLOCATIONS_TEMPLATE_PATH / exp,
                                               dsl_cmd, self._config.best_n_models,
-                                              self._config.job_config, self._config.model_name, dependency))
+                                              self._config.job_config, self._config.model_name, dependency,
+                                              screened))
 
         return out_ids
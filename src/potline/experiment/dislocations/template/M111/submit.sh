@@ -8,6 +8,12 @@ ntasks=$3
 export MKL_NUM_THREADS=${cpus_per_task}
 export OMP_NUM_THREADS=${cpus_per_task}
 
-eval srun -n ${ntasks} ${LMMP} -in input_BCC_init
-zip m111_result.zip *dump*
-rm *dump*
+source ./steps.sh
+
+dislocation_step () {
+    rm -f m111_result.zip
+    eval srun -n ${ntasks} ${LMMP} -in input_BCC_init &&
+    zip m111_result.zip *dump* &&
+    rm *dump*
+}
+run_step M111 "m111_result.zip" "./potential.in input_BCC_init" dislocation_step
@@ -8,6 +8,12 @@ ntasks=$3
 export MKL_NUM_THREADS=${cpus_per_task}
 export OMP_NUM_THREADS=${cpus_per_task}
 
-eval srun -n ${ntasks} ${LMMP} -in input_BCC_init
-zip e_011_111_result.zip *dump*
-rm *dump*
+source ./steps.sh
+
+dislocation_step () {
+    rm -f e_011_111_result.zip
+    eval srun -n ${ntasks} ${LMMP} -in input_BCC_init &&
+    zip e_011_111_result.zip *dump* &&
+    rm *dump*
+}
+run_step edge_011_111 "e_011_111_result.zip" "./potential.in input_BCC_init" dislocation_step
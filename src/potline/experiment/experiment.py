@@ -3,46 +3,124 @@ LAMMPS experiment module.
 """
 
 from pathlib import Path
+import copy
 import shutil
+import shlex
+
+import yaml
 
 from ..config_reader import ConfigReader
 from ..dispatcher import DispatcherManager, JobType
-from ..loss_logger import ModelTracker
+from ..loss_logger import ModelTracker, INFO_FILENAME
+from ..model import POTENTIAL_NAME
 from ..config_reader import JobConfig
+from ..file_linker import LinkMode, link_file, link_tree
+from .result_store import ResultStore, RESULT_KEY_NAME
+
+STEPS_SCRIPT_NAME: str = 'steps.sh'
+STEPS_SCRIPT_PATH: Path = Path(__file__).parent / 'template' / STEPS_SCRIPT_NAME
 
 class Experiment():
     """
     Class for running the LAMMPS experiments.
     """
     @staticmethod
-    def prep_exp(out_path: Path, copy_dir: Path, tracker_list: list[ModelTracker]) -> None:
+    def prep_exp(out_path: Path, copy_dir: Path, tracker_list: list[ModelTracker],
+                 store: ResultStore | None = None, command: str = '',
+                 link_mode: str = LinkMode.COPY.value) -> list[int]:
         """
         Prepare the experiment directories.
+        The step markers script is copied along with the experiment scripts,
+        so that a resubmitted experiment skips the steps already completed.
+        If a result store is used, the results already stored for a model are linked
+        in its directory instead of preparing the experiment.
+        The experiment scripts are read-only and are placed according to the link mode,
+        the potential file is always copied since some experiments modify it.
 
         Args:
             - out_path: the path to the output directory.
             - copy_dir: the path to the directory to copy, it should contain the experiment scripts.
             - tracker_list: the list of model trackers to use in the experiments.
+            - store: the result store.
+            - command: the command running the experiment, part of the result key.
+            - link_mode: how the experiment scripts are placed in the directories.
+
+        Returns:
+            list[int]: the array ids of the models that need to run the experiment.
         """
+        run_ids: list[int] = []
         for i, tracker in enumerate(tracker_list):
             iter_path = out_path / str(i+1)
             iter_path.mkdir(exist_ok=True)
             shutil.copy(tracker.model.get_pot_path(), iter_path)
             tracker.save_info(iter_path)
+
+            if store is not None:
+                key: str = store.get_key(tracker.model.get_pot_path(), copy_dir, command)
+                (iter_path / RESULT_KEY_NAME).write_text(key, encoding='utf-8')
+                if store.has_result(key):
+                    print(f'Results found in the store for model {i+1}: {key}')
+                    store.link_result(key, iter_path)
+                    continue
+
+            link_file(STEPS_SCRIPT_PATH, iter_path / STEPS_SCRIPT_NAME, link_mode)
             for file in copy_dir.iterdir():
                 if file.is_file():
-                    shutil.copy(file, iter_path)
+                    link_file(file, iter_path / file.name, link_mode)
                 elif file.is_dir():
-                    shutil.copytree(file, iter_path / file.name, dirs_exist_ok=True)
+                    link_tree(file, iter_path / file.name, link_mode)
                 else:
                     raise ValueError(f'Unknown file type: {file}')
+            run_ids.append(i+1)
+        return run_ids
+
+    @staticmethod
+    def read_run_info(run_path: Path) -> tuple[int, int]:
+        """
+        Read the iteration and subiteration of the model of an experiment directory.
+
+        Args:
+            - run_path: the experiment directory of the model.
+
+        Returns:
+            tuple[int, int]: the iteration and subiteration of the model.
+        """
+        with (run_path / INFO_FILENAME).open('r', encoding='utf-8') as file:
+            info: dict = yaml.safe_load(file)
+        return int(info['iteration']), int(info['subiteration'])
+
+    @staticmethod
+    def release_runs(run_id: int, run_ids: list[int], n_models: int) -> None:
+        """
+        Release the held experiment jobs that need to run, cancel the others.
+
+        Args:
+            - run_id: the id of the held array job.
+            - run_ids: the array ids to release.
+            - n_models: the number of models in the array job.
+        """
+        for array_id in range(1, n_models+1):
+            if array_id in run_ids:
+                DispatcherManager.release_id(run_id, array_id=array_id)
+            else:
+                DispatcherManager.cancel_id(run_id, array_id=array_id)
 
     @staticmethod
     def run_exp(config_path: Path, out_path: Path, copy_dir: Path, command: str,
                 n_models: int, job_config: JobConfig,
-                model: str, dependency: int | None = None,) -> int:
+                model: str, dependency: int | None = None, screened: bool = False,
+                paired: bool = False, use_store: bool = True, tuned_layout: bool = True) -> int:
         """
         Run the experiment.
+        With a result store or a screening, the experiment jobs are held
+        until the init job releases the models that need to run.
+        A paired experiment runs all the models in a single job, from the output directory,
+        and does not use the result store.
+        Experiments with side effects outside their directory should not use the result store.
+        The experiment jobs run with the thread/rank layout tuned for their partition, if any,
+        read from the potential file of each model.
+        With a history path, the timings of every run are appended to the history,
+        except for paired experiments.
 
         Args:
             - config_path: the path to the configuration file.
@@ -54,6 +132,10 @@ class Experiment():
             - job_type_prefix: prefix for slurm jobs.
             - model: the model name.
             - dependency: the job dependency.
+            - screened: whether to skip the models that failed the screening.
+            - paired: whether to run all the models in a single job.
+            - use_store: whether to use the result store, if one is configured.
+            - tuned_layout: whether to use the tuned layout instead of the one of the allocation.
 
         Returns:
             int: The id of experiments jobs.
@@ -64,17 +146,76 @@ class Experiment():
         prep_manager = DispatcherManager(JobType.WATCH_EXP.value, model, job_config.cluster)
         run_manager = DispatcherManager(JobType.EXP.value, model, job_config.cluster)
         cli_path: Path = gen_config.repo_path / 'src' / 'run_exp.py'
+        run_cmd: str = command + f' {job_config.cpus_per_task} {job_config.ntasks}'
+        layout: str = f'{job_config.ntasks}x{job_config.cpus_per_task}'
+        layout_file: str | None = None
+        if tuned_layout and not paired:
+            # the layout variables are set by the job script, from the layout file
+            run_cmd = command + f' ${{LAYOUT_THREADS:-{job_config.cpus_per_task}}}' + \
+                                f' ${{LAYOUT_NTASKS:-{job_config.ntasks}}}'
+            layout = f'${{LAYOUT_NTASKS:-{job_config.ntasks}}}' + \
+                     f'x${{LAYOUT_THREADS:-{job_config.cpus_per_task}}}'
+            layout_file = POTENTIAL_NAME
+        array_ids: list[int] = list(range(1, n_models+1))
 
         # init job
         init_cmd: str = f'{gen_config.python_bin} {cli_path}' + \
                         f' --config {config_path}' + \
                         f' --copydir {copy_dir}' + \
                         f' --outpath {out_path}'
-        prep_manager.set_job([init_cmd], out_path, job_config, dependency=dependency)
-        init_id = prep_manager.dispatch_job()
 
-        # run jobs
-        run_manager.set_job([command + f' {job_config.cpus_per_task} {job_config.ntasks}'],
-                            out_path, job_config,
-                            dependency=init_id, array_ids=list(range(1, n_models+1)))
-        return run_manager.dispatch_job()
+        store_enabled: bool = gen_config.result_store_path is not None and use_store and not paired
+        if not store_enabled:
+            init_cmd += ' --nostore'
+
+        if paired:
+            prep_manager.set_job([init_cmd], out_path, job_config, dependency=dependency)
+            init_id = prep_manager.dispatch_job()
+
+            # single run job, moved back to the output directory where all the models are:
+            # it is not staged, a staged copy of its array folder would be left by the cd
+            paired_config: JobConfig = copy.copy(job_config)
+            paired_config.staging = False
+            run_manager.set_job([f'cd {out_path}', run_cmd], out_path, paired_config,
+                                dependency=init_id, array_ids=[1])
+            return run_manager.dispatch_job()
+
+        job_cmd: str = run_cmd
+        if job_config.staging:
+            # the results are copied back before being stored or recorded
+            job_cmd = f'{job_cmd} && stage_out'
+        if store_enabled:
+            store_cmd: str = f'{gen_config.python_bin} {cli_path}' + \
+                             f' --config {config_path}' + \
+                             f' --outpath {out_path}/$SLURM_ARRAY_TASK_ID' + \
+                             ' --store'
+            job_cmd = f'{job_cmd} && {store_cmd}'
+        if gen_config.history_path is not None:
+            history_cmd: str = f'{gen_config.python_bin} {cli_path}' + \
+                               f' --config {config_path}' + \
+                               f' --outpath {out_path}/$SLURM_ARRAY_TASK_ID' + \
+                               ' --history --elapsed $(( $(date +%s) - history_start ))' + \
+                               f' --layout {layout}'
+            job_cmd = f'history_start=$(date +%s) && {job_cmd} && {history_cmd}'
+
+        if not store_enabled and not screened:
+            prep_manager.set_job([init_cmd], out_path, job_config, dependency=dependency)
+            init_id = prep_manager.dispatch_job()
+
+            # run jobs
+            run_manager.set_job([job_cmd], out_path, job_config,
+                                dependency=init_id, array_ids=array_ids, layout_file=layout_file)
+            return run_manager.dispatch_job()
+
+        # run jobs, held until the init job releases the models to run
+        run_manager.set_job([job_cmd], out_path, job_config,
+                            array_ids=array_ids, hold=True, layout_file=layout_file)
+        run_id = run_manager.dispatch_job()
+
+        # init job
+        init_cmd += f' --command {shlex.quote(run_cmd)} --runid {run_id}'
+        if screened:
+            init_cmd += ' --screened'
+        prep_manager.set_job([init_cmd], out_path, job_config, dependency=dependency)
+        prep_manager.dispatch_job()
+        return run_id
@@ -29,13 +29,14 @@ class HardSplitter():
         self._config = ConfigReader(config_path).get_experiment_config(MainSectionKW.HARD_SPLIT_SCREW.value)
         self._out_path = self._config.sweep_path / HSS_DIR_NAME
 
-    def run_sim(self, dependency: int | None = None) -> int:
+    def run_sim(self, dependency: int | None = None, screened: bool = False) -> int:
         """
         Run properties simulation.
 
         Args:
             - config_path: the path to the configuration file.
             - dependency: the job dependency.
+            - screened: whether to skip the models that failed the screening.
 
         Returns:
             int: The id of the last watcher job.
@@ -48,4 +49,5 @@ class HardSplitter():
 
         return Experiment.run_exp(self._config_path, self._out_path, HSS_TEMPLATE_PATH,
                                   hss_cmd, self._config.best_n_models,
-                                  self._config.job_config, self._config.model_name, dependency)
+                                  self._config.job_config, self._config.model_name, dependency,
+                                  screened)
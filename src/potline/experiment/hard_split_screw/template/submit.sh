@@ -9,14 +9,17 @@ ntasks=$4
 export MKL_NUM_THREADS=${cpus_per_task}
 export OMP_NUM_THREADS=${cpus_per_task}
 
-rm energy.dat
+# Step markers, energy.dat is appended by every configuration
+STEP_JOURNALS=energy.dat
+source ./steps.sh
 
 for((i=0;i<=306;i=i+1))
 do
 lmpdata=${db_path}/lmp.screw_DB_$i
 
 #sed -i 's/2 atom types/1 atom types/' $lmpdata
-eval srun -n ${ntasks} ${LMMP} -in lmp.in -v lmpdata $lmpdata
+run_step screw_DB_$i "energy.dat" "./potential.in lmp.in $lmpdata" \
+    eval srun -n ${ntasks} ${LMMP} -in lmp.in -v lmpdata $lmpdata
 
 echo $i ' is done!'
 done
@@ -0,0 +1,190 @@
+"""
+Append-only history of the experiment timings, shared between sweeps.
+"""
+
+from pathlib import Path
+from datetime import datetime
+from statistics import median
+import csv
+import json
+import fcntl
+import socket
+import hashlib
+import os
+
+from ..model import POTENTIAL_NAME
+from .experiment import Experiment
+from .result_store import ResultStore, update_hash
+
+HISTORY_FILE_NAME: str = 'history.jsonl'
+# timings files of the inference benchmark, the metrics are recorded when a run has them
+BENCH_TIMINGS_FILE_NAME: str = 'bench_timings.csv'
+BENCH_REFERENCE_FILE_NAME: str = 'bench_reference.csv'
+BENCH_WORKLOADS_FILE_NAME: str = 'bench_workloads.csv'
+
+class BenchHistory():
+    """
+    Append-only history of the experiment timings, one JSON record per run.
+    A record is keyed by the hash of the model files, the hash of the LAMMPS binary,
+    the cluster and the layout of the run, and holds throughput metrics (higher is better):
+    the wall time of the run as runs per hour and, for the inference benchmark,
+    the timesteps/s of the model and of the reference potential and the katom-step/s of the workloads.
+
+    Args:
+        - history_path: the path to the history directory.
+    """
+    KEY_FIELDS: list[str] = ['experiment', 'model_hash', 'potential_hash', 'cluster', 'partition',
+                             'layout', 'proc_bind', 'places']
+    VERSION_FIELDS: dict[str, str] = {'build': 'lammps_hash', 'sweep': 'sweep'}
+
+    def __init__(self, history_path: Path):
+        history_path.mkdir(parents=True, exist_ok=True)
+        self._file: Path = history_path / HISTORY_FILE_NAME
+
+    def record(self, run_path: Path, sweep_path: Path, cluster: str, lammps_bin: Path, layout: str,
+               elapsed: float) -> dict:
+        """
+        Append the timings of an experiment run to the history.
+        The file is locked while writing, since the runs of an experiment finish concurrently.
+
+        Args:
+            - run_path: the path to the run directory, inside the experiment directory of a sweep.
+            - sweep_path: the path to the sweep, the experiments of the cracks and dislocations
+              being one level deeper than the other ones.
+            - cluster: the cluster name.
+            - lammps_bin: the path to the LAMMPS binary.
+            - layout: the layout of the run, as 'NxT' for N MPI tasks and T threads.
+            - elapsed: the wall time of the run, in seconds.
+
+        Returns:
+            dict: the record.
+        """
+        iteration, subiteration = Experiment.read_run_info(run_path)
+        pot_path: Path = run_path / POTENTIAL_NAME
+        record: dict = {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'sweep': str(sweep_path.resolve()),
+            'experiment': str(run_path.resolve().parent.relative_to(sweep_path.resolve())),
+            'iteration': iteration,
+            'subiteration': subiteration,
+            'model_hash': self._model_hash(pot_path),
+            'potential_hash': self._file_hash(pot_path),
+            'lammps_hash': self._file_hash(lammps_bin),
+            'lammps_bin': str(lammps_bin),
+            'cluster': cluster,
+            'partition': os.environ.get('SLURM_JOB_PARTITION', ''),
+            'node': socket.gethostname(),
+            'layout': layout,
+            'proc_bind': os.environ.get('OMP_PROC_BIND', ''),
+            'places': os.environ.get('OMP_PLACES', ''),
+            'metrics': self._get_metrics(run_path, elapsed),
+        }
+        with self._file.open('a', encoding='utf-8') as file:
+            fcntl.flock(file, fcntl.LOCK_EX)
+            file.write(json.dumps(record) + '\n')
+            file.flush()
+            fcntl.flock(file, fcntl.LOCK_UN)
+        return record
+
+    def load(self) -> list[dict]:
+        """
+        Load all the records of the history, in the order they were recorded.
+        """
+        if not self._file.exists():
+            return []
+        with self._file.open('r', encoding='utf-8') as file:
+            return [json.loads(line) for line in file if line.strip()]
+
+    def find_regressions(self, by: str = 'build', threshold: float = 0.05) -> list[dict]:
+        """
+        Find the throughput regressions between consecutive LAMMPS builds or sweeps.
+        The records are grouped by their key and, for the sweeps, by their LAMMPS build,
+        so that only runs of the same model, cluster and layout are compared.
+        Within a group, the versions are ordered by their first record
+        and the median of each metric is compared with the one of the previous version.
+
+        Args:
+            - by: the version compared, 'build' for the LAMMPS binary or 'sweep'.
+            - threshold: the relative slowdown above which a metric is flagged.
+
+        Returns:
+            list[dict]: the key, the metric, the versions, the medians and the relative change
+            of every flagged metric.
+        """
+        if by not in self.VERSION_FIELDS:
+            raise ValueError(f'Unknown version {by}, choose from {list(self.VERSION_FIELDS)}.')
+        version_field: str = self.VERSION_FIELDS[by]
+        key_fields: list[str] = self.KEY_FIELDS + (['lammps_hash'] if by == 'sweep' else [])
+
+        # group -> version -> metric -> values, dicts keep the order of the first record
+        groups: dict[tuple, dict[str, dict[str, list[float]]]] = {}
+        for record in self.load():
+            key: tuple = tuple(record.get(field, '') for field in key_fields)
+            metrics = groups.setdefault(key, {}).setdefault(record[version_field], {})
+            for name, value in record['metrics'].items():
+                metrics.setdefault(name, []).append(float(value))
+
+        regressions: list[dict] = []
+        for key, versions in groups.items():
+            names: list[str] = list(versions)
+            for old, new in zip(names, names[1:]):
+                for metric in versions[new].keys() & versions[old].keys():
+                    old_value: float = median(versions[old][metric])
+                    new_value: float = median(versions[new][metric])
+                    change: float = new_value / old_value - 1
+                    if change < -threshold:
+                        regressions.append({
+                            **dict(zip(key_fields, key)),
+                            'metric': metric,
+                            'old': old,
+                            'new': new,
+                            'old_value': old_value,
+                            'new_value': new_value,
+                            'change': change,
+                        })
+        return regressions
+
+    @staticmethod
+    def _model_hash(pot_path: Path) -> str:
+        """
+        Hash the model files referenced in the potential file,
+        the pair style and the LAMMPS flags are part of the potential hash instead.
+        """
+        digest = hashlib.sha256()
+        for path in ResultStore.path_tokens(pot_path.read_text(encoding='utf-8')):
+            digest.update(path.name.encode('utf-8'))
+            update_hash(digest, path)
+        return digest.hexdigest()
+
+    @staticmethod
+    def _file_hash(path: Path) -> str:
+        """
+        Hash a file or a directory.
+        """
+        digest = hashlib.sha256()
+        update_hash(digest, path)
+        return digest.hexdigest()
+
+    @staticmethod
+    def _get_metrics(run_path: Path, elapsed: float) -> dict[str, float]:
+        """
+        Get the throughput metrics of a run, from its wall time and its benchmark timings.
+        """
+        metrics: dict[str, float] = {'runs_per_hour': 3600 / elapsed} if elapsed > 0 else {}
+        for name, file_name in [('timesteps_per_s', BENCH_TIMINGS_FILE_NAME),
+                                ('reference_timesteps_per_s', BENCH_REFERENCE_FILE_NAME)]:
+            if not (run_path / file_name).exists():
+                continue
+            with (run_path / file_name).open('r', encoding='utf-8') as file:
+                speeds: list[float] = [int(row['steps']) / float(row['loop_time'])
+                                       for row in csv.DictReader(file)
+                                       if row['warmup'] == '0' and row['loop_time']]
+            if speeds:
+                metrics[name] = sum(speeds) / len(speeds)
+        if (run_path / BENCH_WORKLOADS_FILE_NAME).exists():
+            with (run_path / BENCH_WORKLOADS_FILE_NAME).open('r', encoding='utf-8') as file:
+                for row in csv.DictReader(file):
+                    if row['loop_time']:
+                        metrics[f'{row["workload"]}_katom_step_per_s'] = \
+                            int(row['atoms']) * int(row['steps']) / float(row['loop_time']) / 1000
+        return metrics
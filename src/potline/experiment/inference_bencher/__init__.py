@@ -2,4 +2,5 @@
 This module contains the functions to run LAMMPS benchmarks.
 """
 
-from .lammps_runner import InferenceBencher, INFERENCE_BENCH_DIR_NAME, BENCH_SCRIPT_NAME
+from .lammps_runner import (InferenceBencher, INFERENCE_BENCH_DIR_NAME, BENCH_SCRIPT_NAME,
+                            PAIRED_RESULTS_FILE_NAME, LAMMPS_IN_PATH, TIMINGS_SCRIPT_PATH)
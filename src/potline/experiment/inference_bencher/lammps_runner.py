@@ -13,7 +13,13 @@ LAMMPS_IN_NAME: str = 'bench.in'
 BENCH_SCRIPT_NAME: str = 'run.sh'
 INF_BENCH_TEMPLATE_PATH: Path = Path(__file__).parent / 'template'
 LAMMPS_IN_PATH: Path =  INF_BENCH_TEMPLATE_PATH / LAMMPS_IN_NAME
+WORKLOADS_PATH: Path = INF_BENCH_TEMPLATE_PATH / 'workloads'
 BENCH_SCRIPT_TEMPLATE_PATH: Path = INF_BENCH_TEMPLATE_PATH / BENCH_SCRIPT_NAME
+TIMINGS_SCRIPT_PATH: Path = INF_BENCH_TEMPLATE_PATH / 'timings.sh'
+PAIRED_SCRIPT_PATH: Path = Path(__file__).parent / 'paired.sh'
+PAIRED_RESULTS_FILE_NAME: str = 'bench_paired.csv'
+# EAM potential of Mendelev et al. (2003) distributed with LAMMPS, the default reference potential
+REFERENCE_POTENTIAL_NAME: str = 'Fe_mm.eam.fs'
 
 class InferenceBencher():
     """
@@ -27,9 +33,38 @@ class InferenceBencher():
         self._config = ConfigReader(config_path).get_bench_config()
         self._out_path = self._config.experiment_config.sweep_path / INFERENCE_BENCH_DIR_NAME
 
+    @staticmethod
+    def get_workloads() -> list[str]:
+        """
+        Get the names of the workloads of the catalogue.
+        """
+        return sorted(p.name.removeprefix('in.') for p in WORKLOADS_PATH.glob('in.*'))
+
+    def get_reference_potential(self) -> str:
+        """
+        Get the reference potential timed along with the models, as '<pair style> <potential file>'.
+        By default, the iron EAM potential of the potentials directory of the LAMMPS sources
+        the binary was built from.
+
+        Returns:
+            str: the reference potential, empty if none is found.
+        """
+        pot_path: Path | None = self._config.reference_potential
+        if pot_path is None:
+            lammps_path: Path = self._config.experiment_config.lammps_bin_path.resolve()
+            candidates: list[Path] = [parent / 'potentials' / REFERENCE_POTENTIAL_NAME
+                                      for parent in lammps_path.parents[:4]]
+            pot_path = next((path for path in candidates if path.exists()), None)
+        if pot_path is None:
+            print('No reference potential found, the inference times are not normalised.')
+            return ''
+        return f'{self._config.reference_pair_style} {pot_path}'
+
     def run_inf(self, dependency: int | None = None) -> int:
         """
         Run inference benchmark.
+        In paired mode, all the models are benchmarked in turn in a single job,
+        in a random order at every repetition.
 
         Args:
             - config_path: the path to the configuration file.
@@ -38,11 +73,37 @@ class InferenceBencher():
         Returns:
             int: The id of the last watcher job.
         """
+        lammps_cmd: str = f'"{self._config.experiment_config.lammps_bin_path} ' + \
+                          f'{get_lammps_params(self._config.experiment_config.model_name)}"'
+        if self._config.paired:
+            paired_cmd: str = ' '.join([str(cmd) for cmd in [
+                'bash', PAIRED_SCRIPT_PATH, lammps_cmd,
+                self._config.prerun_steps, self._config.max_steps,
+                self._config.repetitions, self._config.warmup_repetitions,
+                self._config.experiment_config.best_n_models,
+                f'"{self.get_reference_potential()}"',
+            ]])
+            return Experiment.run_exp(self._config_path, self._out_path, INF_BENCH_TEMPLATE_PATH, paired_cmd,
+                                      self._config.experiment_config.best_n_models,
+                                      self._config.experiment_config.job_config,
+                                      self._config.experiment_config.model_name, dependency, paired=True)
+
+        unknown: list[str] = [w for w in self._config.workloads if w not in self.get_workloads()]
+        if unknown:
+            raise ValueError(f'Unknown workloads: {unknown}, available: {self.get_workloads()}')
+
+        # scaling sizes (x, y, z replications) and layouts (MPI tasks, threads) as 'AxBxC' words
+        sizes: str = ' '.join('x'.join(str(n) for n in size) for size in self._config.scaling_sizes)
+        layouts: str = ' '.join('x'.join(str(n) for n in layout) for layout in self._config.scaling_layouts)
+        memory_sizes: str = ' '.join('x'.join(str(n) for n in size) for size in self._config.memory_sizes)
         bench_cmd: str = ' '.join([str(cmd) for cmd in [
-            'bash', BENCH_SCRIPT_NAME,
-            self._config.experiment_config.lammps_bin_path,
-            get_lammps_params(self._config.experiment_config.model_name),
+            'bash', BENCH_SCRIPT_NAME, lammps_cmd,
             self._config.prerun_steps, self._config.max_steps,
+            f'"{sizes}"', f'"{layouts}"',
+            self._config.repetitions, self._config.warmup_repetitions,
+            f'"{memory_sizes}"', self._config.memory_steps,
+            f'"{" ".join(self._config.workloads)}"',
+            f'"{self.get_reference_potential()}"',
         ]])
 
         return Experiment.run_exp(self._config_path, self._out_path, INF_BENCH_TEMPLATE_PATH, bench_cmd,
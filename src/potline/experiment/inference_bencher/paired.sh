@@ -0,0 +1,90 @@
+#!/bin/bash
+#------------------------------
+# Paired inference benchmark: all the models are benchmarked in the same allocation,
+# run from the inference benchmark folder containing one prepared folder per model.
+# Every round runs each model once, in a random order, so that the drift of the
+# node performance is spread over all the models.
+# Each model folder gets its own bench_timings.csv, bench_paired.csv collects all the runs.
+# The reference potential, if any, runs once per round in the same random order as the models,
+# its timings are written in bench_reference.csv and in the bench_reference.csv of every model.
+#------------------------------
+
+# Collect arguments
+lammps_bin_path=$1
+prerun_steps=$2
+max_steps=$3
+repetitions=$4
+warmup_repetitions=$5
+n_models=$6
+reference_potential=$7
+cpus_per_task=$8
+ntasks=$9
+
+export MKL_NUM_THREADS=${cpus_per_task}
+export OMP_NUM_THREADS=${cpus_per_task}
+
+# LAMMPS log parsing
+source "$(dirname "$0")/template/timings.sh"
+
+timed_steps=$((max_steps-prerun_steps))
+timings_file="bench_timings.csv"
+paired_file="bench_paired.csv"
+reference_file="bench_reference.csv"
+
+models=()
+for ((model=1; model<=n_models; model++)); do
+    if [ ! -f ${model}/bench.in ]; then
+        echo "Skipping model ${model}, not prepared"
+        continue
+    fi
+    models+=(${model})
+    rm -f ${model}/${timings_file}
+    echo "prerun_steps,max_steps,cpus_per_task,ntasks,repetition,warmup,${timings_fields}" > ${model}/${timings_file}
+done
+echo "model,round,position,warmup,${timings_fields}" > ${paired_file}
+
+# Reference potential ("<pair style> <potential file>"), on the benchmark system of the models
+runs=("${models[@]}")
+if [ -n "${reference_potential}" ] && [ ${#models[@]} -gt 0 ]; then
+    read reference_style reference_path <<< "${reference_potential}"
+    mkdir -p reference
+    cp ${models[0]}/bench.in reference/
+    {
+        echo "pair_style ${reference_style}"
+        echo "pair_coeff * * ${reference_path} Fe"
+    } > reference/potential.in
+    echo "prerun_steps,max_steps,cpus_per_task,ntasks,repetition,warmup,${timings_fields}" > ${reference_file}
+    for model in "${models[@]}"; do
+        cp ${reference_file} ${model}/${reference_file}
+    done
+    runs+=(reference)
+fi
+
+echo "start"
+for ((round=1; round<=warmup_repetitions+repetitions; round++)); do
+    warmup=$(( round <= warmup_repetitions ? 1 : 0 ))
+    position=0
+    for model in $(shuf -e "${runs[@]}"); do
+        position=$((position+1))
+        echo "Round ${round}, position ${position}: model ${model}"
+        (
+            cd ${model}
+            eval srun -n ${ntasks} ${lammps_bin_path} -in "bench.in" -log log.paired.${round} \
+                -v prerun ${prerun_steps} -v steps ${timed_steps}
+        )
+        timings=$(parse_log ${model}/log.paired.${round})
+        row="${prerun_steps},${max_steps},${cpus_per_task},${ntasks},${round},${warmup},${timings}"
+        if [ "${model}" = reference ]; then
+            echo "${row}" >> ${reference_file}
+            for paired_model in "${models[@]}"; do
+                echo "${row}" >> ${paired_model}/${reference_file}
+            done
+            continue
+        fi
+        echo "${model},${round},${position},${warmup},${timings}" >> ${paired_file}
+        echo "${row}" >> ${model}/${timings_file}
+    done
+done
+echo "finished"
+
+exit 0
@@ -0,0 +1,25 @@
+#!/bin/bash
+#------------------------------
+# Run a command and record the peak resident memory (VmHWM) of its process, sampled from /proc.
+# Launched by srun for every MPI task, each task writes its peak in kB to its own file:
+#   memory.sh <output prefix> <command> [args]
+# The high water mark never decreases, only its growth in the last sampling interval is missed.
+#------------------------------
+
+out_prefix=$1
+shift
+
+"$@" &
+pid=$!
+peak_kb=0
+while kill -0 ${pid} 2>/dev/null; do
+    hwm_kb=$(awk '/^VmHWM:/ { print $2 }' /proc/${pid}/status 2>/dev/null)
+    if [ -n "${hwm_kb}" ]; then
+        peak_kb=${hwm_kb}
+    fi
+    sleep 0.2
+done
+wait ${pid}
+status=$?
+echo "${peak_kb}" > ${out_prefix}.${SLURM_PROCID:-0}
+exit ${status}
@@ -4,28 +4,139 @@
 lammps_bin_path=$1
 prerun_steps=$2
 max_steps=$3
-cpus_per_task=$4
-ntasks=$5
+scaling_sizes=$4
+scaling_layouts=$5
+repetitions=$6
+warmup_repetitions=$7
+memory_sizes=$8
+memory_steps=$9
+workloads=${10}
+reference_potential=${11}
+cpus_per_task=${12}
+ntasks=${13}
 
 export MKL_NUM_THREADS=${cpus_per_task}
 export OMP_NUM_THREADS=${cpus_per_task}
 
+# LAMMPS log parsing
+source ./timings.sh
+
+# The warm-up steps run in the same LAMMPS instance before the timed run,
+# the timings only cover the loop of the timed run
+timed_steps=$((max_steps-prerun_steps))
+
+# Reference potential ("<pair style> <potential file>"), timed after every repetition of the model
+# on the same node and layout, to normalise the speed of the models benchmarked on different clusters
+reference_file="bench_reference.csv"
+if [ -n "${reference_potential}" ]; then
+    read reference_style reference_path <<< "${reference_potential}"
+    mkdir -p reference
+    cp bench.in reference/
+    {
+        echo "pair_style ${reference_style}"
+        echo "pair_coeff * * ${reference_path} Fe"
+    } > reference/potential.in
+    echo "prerun_steps,max_steps,cpus_per_task,ntasks,repetition,warmup,${timings_fields}" > $reference_file
+fi
+
+# Repeated measurements, the first warmup_repetitions ones are marked as warm-up
+# (file system caches, CPU frequency) and are discarded by the metrics
+timings_file="bench_timings.csv"
+echo "prerun_steps,max_steps,cpus_per_task,ntasks,repetition,warmup,${timings_fields}" > $timings_file
 echo "start"
-start_time=`date +%s`
-eval srun -n ${ntasks} ${lammps_bin_path} -in "bench.in" -v steps ${prerun_steps}
-echo "prerun done"
-mid_time=`date +%s`
-eval srun -n ${ntasks} ${lammps_bin_path} -in "bench.in" -v steps ${max_steps}
-end_time=`date +%s`
+for ((rep=1; rep<=warmup_repetitions+repetitions; rep++)); do
+    warmup=$(( rep <= warmup_repetitions ? 1 : 0 ))
+    eval srun -n ${ntasks} ${lammps_bin_path} -in "bench.in" -log log.bench.${rep} \
+        -v prerun ${prerun_steps} -v steps ${timed_steps}
+    echo "${prerun_steps},${max_steps},${cpus_per_task},${ntasks},${rep},${warmup},$(parse_log log.bench.${rep})" \
+        >> $timings_file
+    if [ -n "${reference_potential}" ]; then
+        (cd reference && eval srun -n ${ntasks} ${lammps_bin_path} -in "bench.in" -log log.reference.${rep} \
+            -v prerun ${prerun_steps} -v steps ${timed_steps})
+        echo "${prerun_steps},${max_steps},${cpus_per_task},${ntasks},${rep},${warmup},$(parse_log reference/log.reference.${rep})" \
+            >> $reference_file
+    fi
+done
 echo "finished"
 
-runtime1=$((mid_time-start_time))
-runtime2=$((end_time-mid_time))
-runtime3=$((runtime2-runtime1))
+# Scaling sweep: every system size (x, y, z replications of the cell) with every
+# layout (MPI tasks x threads) that fits in the allocation, one after the other
+if [ -n "${scaling_sizes}${scaling_layouts}" ]; then
+    scaling_sizes=${scaling_sizes:-1x1x1}
+    scaling_layouts=${scaling_layouts:-${ntasks}x${cpus_per_task}}
+    scaling_file="bench_scaling.csv"
+    echo "x,y,z,ntasks,threads,${timings_fields}" > $scaling_file
+    mkdir -p scaling
+    for layout in ${scaling_layouts}; do
+        layout_tasks=${layout%x*}
+        layout_threads=${layout#*x}
+        if [ $((layout_tasks*layout_threads)) -gt $((ntasks*cpus_per_task)) ]; then
+            echo "Skipping layout ${layout}, larger than the allocation"
+            continue
+        fi
+        for size in ${scaling_sizes}; do
+            IFS=x read size_x size_y size_z <<< "${size}"
+            scaling_log=./scaling/log.${size}_${layout}
+            echo "Scaling run: size ${size}, layout ${layout}"
+            if ! OMP_NUM_THREADS=${layout_threads} MKL_NUM_THREADS=${layout_threads} \
+                eval srun --exact -n ${layout_tasks} -c ${layout_threads} ${lammps_bin_path} -in "bench.in" \
+                -log ${scaling_log} -v x ${size_x} -v y ${size_y} -v z ${size_z} \
+                -v prerun ${prerun_steps} -v steps ${timed_steps}; then
+                echo "Scaling run failed: size ${size}, layout ${layout}"
+                continue
+            fi
+            echo "${size_x},${size_y},${size_z},${layout_tasks},${layout_threads},$(parse_log ${scaling_log})" \
+                >> $scaling_file
+        done
+    done
+fi
 
-# Write timings to a file
-timings_file="bench_timings.csv"
-echo "start_time,mid_time,end_time,prerun_steps,max_steps,cpus_per_task,ntasks,time_diff" > $timings_file
-echo "$start_time,$mid_time,$end_time,${prerun_steps},${max_steps},${cpus_per_task},${ntasks},$runtime3" >> $timings_file
+# Workload catalogue: every workload of ./workloads runs once with the layout of the allocation,
+# with the same warm-up and timed steps as the main benchmark (iterations for the minimizations)
+if [ -n "${workloads}" ]; then
+    workloads_file="bench_workloads.csv"
+    echo "workload,${timings_fields}" > $workloads_file
+    for workload in ${workloads}; do
+        workload_log=./workloads/log.${workload}
+        echo "Workload run: ${workload}"
+        if ! eval srun -n ${ntasks} ${lammps_bin_path} -in ./workloads/in.${workload} -log ${workload_log} \
+            -v prerun ${prerun_steps} -v steps ${timed_steps}; then
+            echo "Workload run failed: ${workload}"
+            continue
+        fi
+        echo "${workload},$(parse_log ${workload_log})" >> $workloads_file
+    done
+fi
+
+# Memory sweep: peak resident memory of every MPI task for every system size,
+# with the layout of the allocation and a few steps, the memory does not grow with the steps.
+# The runs going out of memory are kept, with their peak before failing and no timings.
+if [ -n "${memory_sizes}" ]; then
+    memory_file="bench_memory.csv"
+    echo "x,y,z,system_atoms,ntasks,threads,completed,peak_rss_max_kb,peak_rss_sum_kb,${timings_fields}" \
+        > $memory_file
+    mkdir -p memory
+    for size in ${memory_sizes}; do
+        IFS=x read size_x size_y size_z <<< "${size}"
+        memory_log=./memory/log.${size}
+        rm -f ./memory/rss.${size}.*
+        echo "Memory run: size ${size}"
+        completed=1
+        if ! eval srun -n ${ntasks} bash ./memory.sh ./memory/rss.${size} ${lammps_bin_path} -in "bench.in" \
+            -log ${memory_log} -v x ${size_x} -v y ${size_y} -v z ${size_z} \
+            -v prerun 0 -v steps ${memory_steps}; then
+            echo "Memory run failed: size ${size}"
+            completed=0
+        fi
+        system_atoms=$(awk '/^Created [0-9]+ atoms/ { print $2 }' ${memory_log} 2>/dev/null)
+        rss=$(cat ./memory/rss.${size}.* 2>/dev/null | awk '{ s += $1; if ($1 > m) m = $1 } END { print m+0 "," s+0 }')
+        timings=$(parse_log ${memory_log} 2>/dev/null)
+        if [ ${completed} -eq 0 ]; then
+            timings=$(sed 's/[^,]//g' <<< "${timings_fields}")
+        fi
+        echo "${size_x},${size_y},${size_z},${system_atoms},${ntasks},${cpus_per_task},${completed},${rss},${timings}" \
+            >> $memory_file
+    done
+fi
 
 exit 0
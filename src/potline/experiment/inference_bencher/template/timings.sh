@@ -0,0 +1,34 @@
+#!/bin/bash
+#------------------------------
+# Timings of the inference benchmark, read from the LAMMPS logs.
+#------------------------------
+
+# CSV fields printed by parse_log
+timings_fields="loop_time,procs,steps,atoms,timesteps_per_s,katom_step_per_s,pair_time,neigh_time,comm_time,output_time,modify_time,other_time,lammps_mem_mb"
+
+# Print the timings of the last run in a LAMMPS log as CSV fields:
+# loop time, procs, steps, atoms, performance, the average MPI task timing breakdown
+# and the largest memory allocated by LAMMPS on a MPI task, in Mbytes
+# (LAMMPS data structures only, not the memory of the machine learning libraries)
+# usage: parse_log <log file>
+parse_log () {
+    awk '
+        /^Loop time of/ { loop=$4; procs=$6; steps=$9; atoms=$12 }
+        /^Per MPI rank memory allocation/ { mem=$12 }
+        /^Memory usage per processor/ { mem=$5 }
+        /^Performance:/ {
+            for (i = 2; i <= NF; i++) {
+                if ($i ~ /^timesteps\/s/) tps=$(i-1)
+                if ($i ~ /^katom-step\/s/) kas=$(i-1)
+            }
+        }
+        /^MPI task timing breakdown/ { mpi=1 }
+        /^Section *\|/ && mpi { in_section=1; delete t; next }
+        in_section && /^[A-Za-z]+ *\|/ { split($0, f, "|"); name=f[1]; gsub(/ /, "", name); t[name]=f[3]+0 }
+        in_section && /^ *$/ { in_section=0; mpi=0 }
+        END {
+            printf "%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s\n", loop, procs, steps, atoms, tps, kas,
+                t["Pair"], t["Neigh"], t["Comm"], t["Output"], t["Modify"], t["Other"], mem
+        }
+    ' $1
+}
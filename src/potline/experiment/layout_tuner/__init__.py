@@ -0,0 +1,5 @@
+"""
+Tuning of the thread/rank layout of the experiments.
+"""
+
+from .layout_tuner import LayoutTuner, LAYOUT_TUNING_DIR_NAME
@@ -0,0 +1,103 @@
+"""
+Thread/rank layout tuning.
+"""
+
+from pathlib import Path
+
+from ..experiment import Experiment
+from ..inference_bencher import LAMMPS_IN_PATH, TIMINGS_SCRIPT_PATH
+
+from ...config_reader import ConfigReader
+from ...dispatcher import LAYOUT_PREFIX
+from ...loss_logger import ModelTracker
+from ...model import get_lammps_params
+
+LAYOUT_TUNING_DIR_NAME: str = 'layout_tuning'
+TUNE_SCRIPT_NAME: str = 'tune_layout.sh'
+LAYOUT_TUNER_TEMPLATE_PATH: Path = Path(__file__).parent / 'template'
+TUNED_LAYOUT_NAME: str = 'tuned_layout.txt'
+
+class LayoutTuner():
+    """
+    Class for tuning the thread/rank layout of the experiments:
+    every MPI tasks x OpenMP threads layout is benchmarked with every OpenMP binding policy,
+    on the inference benchmark system.
+    The fastest layout is written in the potential file of the model for the partition of the tuning jobs,
+    the following experiment jobs on that partition use it when it fits in their allocation.
+
+    Args:
+        - config_path: the path to the configuration file.
+    """
+    def __init__(self, config_path: Path):
+        self._config_path = config_path
+        self._tune_config = ConfigReader(config_path).get_layout_tune_config()
+        self._config = self._tune_config.experiment_config
+        self._out_path = self._config.sweep_path / LAYOUT_TUNING_DIR_NAME
+
+    def get_layouts(self) -> list[str]:
+        """
+        Get the layouts to benchmark, as 'NxT' for N MPI tasks and T threads.
+        By default, all the layouts using all the cores of the allocation.
+
+        Returns:
+            list[str]: the layouts.
+        """
+        if self._tune_config.layouts:
+            return self._tune_config.layouts
+        job_config = self._config.job_config
+        cores: int = job_config.ntasks * job_config.cpus_per_task
+        return [f'{cores // threads}x{threads}' for threads in range(1, cores+1) if cores % threads == 0]
+
+    def run_tune(self, dependency: int | None = None) -> int:
+        """
+        Run the tuning benchmarks.
+        The result store is not used, the tuning modifies the potential files,
+        and the tuning jobs do not use a previously tuned layout.
+
+        Args:
+            - dependency: the job dependency.
+
+        Returns:
+            int: The id of the tuning jobs.
+        """
+        gen_config = ConfigReader(self._config_path).get_general_config()
+        cli_path: Path = gen_config.repo_path / 'src' / 'run_tune.py'
+        tune_cmd: str = ' '.join([str(cmd) for cmd in [
+            'bash', TUNE_SCRIPT_NAME,
+            f'"{self._config.lammps_bin_path} {get_lammps_params(self._config.model_name)}"',
+            LAMMPS_IN_PATH,
+            TIMINGS_SCRIPT_PATH,
+            f'"{gen_config.python_bin} {cli_path} --config {self._config_path}"',
+            self._tune_config.prerun_steps,
+            self._tune_config.steps,
+            f'"{" ".join(self.get_layouts())}"',
+            f'"{" ".join(self._tune_config.bindings)}"',
+        ]])
+
+        return Experiment.run_exp(self._config_path, self._out_path, LAYOUT_TUNER_TEMPLATE_PATH,
+                                  tune_cmd, self._config.best_n_models,
+                                  self._config.job_config, self._config.model_name, dependency,
+                                  use_store=False, tuned_layout=False)
+
+    @staticmethod
+    def apply(run_path: Path, tracker: ModelTracker, partition: str) -> None:
+        """
+        Write the tuned layout in the potential file of the model,
+        replacing the layout previously tuned for the partition.
+
+        Args:
+            - run_path: the tuning directory of the model.
+            - tracker: the tracker of the model.
+            - partition: the partition the layout was tuned on.
+        """
+        tuned_path: Path = run_path / TUNED_LAYOUT_NAME
+        if not tuned_path.exists():
+            raise FileNotFoundError(f'No tuned layout found in {run_path}')
+        layout: str = tuned_path.read_text(encoding='utf-8').strip()
+
+        pot_path: Path = tracker.model.get_pot_path()
+        prefix: str = f'{LAYOUT_PREFIX}{partition}:'
+        lines: list[str] = [line for line in pot_path.read_text(encoding='utf-8').splitlines()
+                            if not line.startswith(prefix)]
+        pot_path.write_text('\n'.join([f'{prefix} {layout}'] + lines) + '\n', encoding='utf-8')
+        print(f'Tuned layout for {partition} written to {pot_path}')
@@ -0,0 +1,76 @@
+#!/bin/bash
+#------------------------------
+# Layout tuning: benchmarks every MPI tasks x OpenMP threads layout with every
+# binding policy, then writes the fastest layout in tuned_layout.txt and in the
+# potential file of the model, for the partition of the job.
+#------------------------------
+
+# Collect arguments
+LMMP=$1
+bench_in=$2
+timings_sh=$3
+tune_cli=$4
+prerun_steps=$5
+steps=$6
+layouts=$7
+bindings=$8
+cpus_per_task=$9
+ntasks=${10}
+
+export MKL_NUM_THREADS=1
+
+# LAMMPS log parsing
+source ${timings_sh}
+
+results_file="layout_tuning.csv"
+tuned_file="tuned_layout.txt"
+
+rm -f ${tuned_file}
+echo "variant,layout,bind,places,${timings_fields}" > ${results_file}
+best_speed=0
+best_layout=""
+variant=0
+for layout in ${layouts}; do
+    n_tasks=${layout%x*}
+    n_threads=${layout#*x}
+    for binding in ${bindings}; do
+        variant=$((variant+1))
+        variant_dir=layout_${variant}
+        rm -rf ${variant_dir}
+        mkdir ${variant_dir}
+        cp ${bench_in} ./potential.in ${variant_dir}
+
+        bind=${binding%/*}
+        places=${binding#*/}
+        echo "Variant ${variant}: ${n_tasks} tasks x ${n_threads} threads, ${bind}/${places}"
+        if ! (cd ${variant_dir} &&
+              export OMP_NUM_THREADS=${n_threads} OMP_PROC_BIND=${bind} OMP_PLACES=${places} &&
+              eval srun --exact -n ${n_tasks} -c ${n_threads} ${LMMP} -in bench.in -log log.layout \
+                  -v prerun ${prerun_steps} -v steps ${steps}); then
+            echo "Variant ${variant} failed"
+            continue
+        fi
+        timings=$(parse_log ${variant_dir}/log.layout)
+        echo "${variant},${layout},${bind},${places},${timings}" >> ${results_file}
+
+        # timesteps/s from the loop time and the steps
+        speed=$(awk -F, '{ print ($1 > 0) ? $3 / $1 : 0 }' <<< "${timings}")
+        if awk -v a=${speed} -v b=${best_speed} 'BEGIN { exit !(a > b) }'; then
+            best_speed=${speed}
+            best_layout="LAYOUT_NTASKS=${n_tasks} LAYOUT_THREADS=${n_threads} OMP_PROC_BIND=${bind} OMP_PLACES=${places}"
+        fi
+
+        # the binding does not matter for a single thread
+        if [ ${n_threads} -eq 1 ]; then
+            break
+        fi
+    done
+done
+
+if [ -z "${best_layout}" ]; then
+    echo "No layout ran, the potential is not modified"
+    exit 1
+fi
+echo "Fastest layout: ${best_layout}, ${best_speed} timesteps/s"
+echo "${best_layout}" > ${tuned_file}
+eval ${tune_cli} --outpath ${PWD} --layout --partition ${SLURM_JOB_PARTITION}
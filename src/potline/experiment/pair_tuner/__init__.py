@@ -0,0 +1,5 @@
+"""
+Tuning of the LAMMPS pair style and flags of the potentials.
+"""
+
+from .pair_tuner import PairTuner, PAIR_TUNING_DIR_NAME
@@ -0,0 +1,104 @@
+"""
+Pair style and LAMMPS flags tuning.
+"""
+
+from pathlib import Path
+import re
+
+from ..experiment import Experiment
+from ..inference_bencher import LAMMPS_IN_PATH, TIMINGS_SCRIPT_PATH
+
+from ...config_reader import ConfigReader
+from ...dispatcher import LAYOUT_PREFIX
+from ...loss_logger import ModelTracker
+from ...model import get_lammps_params, POTENTIAL_NAME
+
+PAIR_TUNING_DIR_NAME: str = 'pair_tuning'
+TUNE_SCRIPT_NAME: str = 'tune.sh'
+PAIR_TUNER_TEMPLATE_PATH: Path = Path(__file__).parent / 'template'
+VARIANTS_FILE_NAME: str = 'pair_variants.tsv'
+TUNED_POTENTIAL_NAME: str = 'tuned_potential.in'
+
+class PairTuner():
+    """
+    Class for tuning the LAMMPS settings of the potentials:
+    every pair style variant of the model is benchmarked with every neighbor skin,
+    with and without the OPENMP acceleration flags, on the inference benchmark system.
+    The fastest settings are written in the potential file of the model,
+    so that all the following experiments use them.
+
+    Args:
+        - config_path: the path to the configuration file.
+    """
+    PAIR_COEFF_PATTERN: re.Pattern = re.compile(r'^\s*pair_coeff\s+\S+\s+\S+\s+(\S+)', re.MULTILINE)
+
+    def __init__(self, config_path: Path):
+        self._config_path = config_path
+        self._tune_config = ConfigReader(config_path).get_pair_tune_config()
+        self._config = self._tune_config.experiment_config
+        self._out_path = self._config.sweep_path / PAIR_TUNING_DIR_NAME
+
+    def run_tune(self, dependency: int | None = None) -> int:
+        """
+        Run the tuning benchmarks.
+        The result store is not used, the tuning modifies the potential files.
+
+        Args:
+            - dependency: the job dependency.
+
+        Returns:
+            int: The id of the tuning jobs.
+        """
+        gen_config = ConfigReader(self._config_path).get_general_config()
+        cli_path: Path = gen_config.repo_path / 'src' / 'run_tune.py'
+        tune_cmd: str = ' '.join([str(cmd) for cmd in [
+            'bash', TUNE_SCRIPT_NAME,
+            f'"{self._config.lammps_bin_path} {get_lammps_params(self._config.model_name)}"',
+            LAMMPS_IN_PATH,
+            TIMINGS_SCRIPT_PATH,
+            f'"{gen_config.python_bin} {cli_path} --config {self._config_path}"',
+            self._tune_config.prerun_steps,
+            self._tune_config.steps,
+            f'"{" ".join(str(skin) for skin in self._tune_config.skins)}"',
+            int(self._tune_config.omp),
+        ]])
+
+        return Experiment.run_exp(self._config_path, self._out_path, PAIR_TUNER_TEMPLATE_PATH,
+                                  tune_cmd, self._config.best_n_models,
+                                  self._config.job_config, self._config.model_name, dependency,
+                                  use_store=False)
+
+    def write_variants(self, run_path: Path, tracker: ModelTracker) -> None:
+        """
+        Write the pair styles to benchmark and the model files they use in the tuning directory.
+
+        Args:
+            - run_path: the tuning directory of the model.
+            - tracker: the tracker of the model.
+        """
+        match = self.PAIR_COEFF_PATTERN.search((run_path / POTENTIAL_NAME).read_text(encoding='utf-8'))
+        if match is None:
+            raise ValueError(f'No pair_coeff found in {run_path / POTENTIAL_NAME}')
+        variants: list[tuple[str, str]] = tracker.model.get_pair_variants(match.group(1))
+        with (run_path / VARIANTS_FILE_NAME).open('w', encoding='utf-8') as file:
+            for style, coeff_path in variants:
+                file.write(f'{style}\t{coeff_path}\n')
+
+    def apply(self, run_path: Path, tracker: ModelTracker) -> None:
+        """
+        Replace the potential file of the model with the tuned one,
+        keeping the thread/rank layouts tuned for the model.
+
+        Args:
+            - run_path: the tuning directory of the model.
+            - tracker: the tracker of the model.
+        """
+        tuned_path: Path = run_path / TUNED_POTENTIAL_NAME
+        if not tuned_path.exists():
+            raise FileNotFoundError(f'No tuned potential found in {run_path}')
+        pot_path: Path = tracker.model.get_pot_path()
+        layouts: list[str] = [line for line in pot_path.read_text(encoding='utf-8').splitlines()
+                              if line.startswith(LAYOUT_PREFIX)]
+        tuned: list[str] = tuned_path.read_text(encoding='utf-8').splitlines()
+        pot_path.write_text('\n'.join(layouts + tuned) + '\n', encoding='utf-8')
+        print(f'Tuned potential written to {pot_path}')
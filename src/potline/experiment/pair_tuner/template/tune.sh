@@ -0,0 +1,89 @@
+#!/bin/bash
+#------------------------------
+# Pair style tuning: benchmarks every pair style variant of the model with every
+# neighbor skin and with/without the OPENMP acceleration flags, then writes the
+# fastest settings in tuned_potential.in and in the potential file of the model.
+#------------------------------
+
+# Collect arguments
+LMMP=$1
+bench_in=$2
+timings_sh=$3
+tune_cli=$4
+prerun_steps=$5
+steps=$6
+skins=$7
+omp=$8
+cpus_per_task=$9
+ntasks=${10}
+
+export MKL_NUM_THREADS=${cpus_per_task}
+export OMP_NUM_THREADS=${cpus_per_task}
+
+# LAMMPS log parsing
+source ${timings_sh}
+
+# prefix of the LAMMPS flags in the potential file, read by the experiments
+flags_prefix="# lammps_flags: "
+variants_file="pair_variants.tsv"
+results_file="tuning.csv"
+tuned_file="tuned_potential.in"
+
+# pair styles of the model and the model files they use
+eval ${tune_cli} --outpath ${PWD} --variants || exit 1
+
+# the OPENMP threads follow OMP_NUM_THREADS, so that the flags hold for any tuned layout
+flag_options=("")
+if [ ${omp} -eq 1 ] && [ ${cpus_per_task} -gt 1 ]; then
+    flag_options+=("-sf omp -pk omp 0")
+fi
+
+rm -f ${tuned_file}
+echo "variant,pair_style,model_file,skin,flags,${timings_fields}" > ${results_file}
+best_speed=0
+best_dir=""
+variant=0
+while IFS=$'\t' read -r -u 3 style model_file; do
+    for skin in ${skins}; do
+        for flags in "${flag_options[@]}"; do
+            variant=$((variant+1))
+            variant_dir=tune_${variant}
+            rm -rf ${variant_dir}
+            mkdir ${variant_dir}
+            cp ${bench_in} ${variant_dir}
+            {
+                echo "${flags_prefix}${flags}"
+                echo "# Define the interatomic potential"
+                echo "neighbor ${skin} bin"
+                echo "neigh_modify every 1 delay 0 check yes"
+                echo "pair_style ${style}"
+                echo "pair_coeff * * ${model_file} Fe"
+            } > ${variant_dir}/potential.in
+
+            echo "Variant ${variant}: ${style}, skin ${skin}, flags '${flags}'"
+            if ! (cd ${variant_dir} && eval srun -n ${ntasks} ${LMMP} -in bench.in -log log.tune \
+                    -v prerun ${prerun_steps} -v steps ${steps}); then
+                echo "Variant ${variant} failed"
+                continue
+            fi
+            timings=$(parse_log ${variant_dir}/log.tune)
+            echo "${variant},\"${style}\",${model_file},${skin},\"${flags}\",${timings}" >> ${results_file}
+
+            # timesteps/s from the loop time and the steps
+            speed=$(awk -F, '{ print ($1 > 0) ? $3 / $1 : 0 }' <<< "${timings}")
+            if awk -v a=${speed} -v b=${best_speed} 'BEGIN { exit !(a > b) }'; then
+                best_speed=${speed}
+                best_dir=${variant_dir}
+            fi
+        done
+    done
+done 3< ${variants_file}
+
+if [ -z "${best_dir}" ]; then
+    echo "No variant ran, the potential is not modified"
+    exit 1
+fi
+echo "Fastest variant: ${best_dir}, ${best_speed} timesteps/s"
+cp ${best_dir}/potential.in ${tuned_file}
+cp ${tuned_file} ./potential.in
+eval ${tune_cli} --outpath ${PWD} --apply
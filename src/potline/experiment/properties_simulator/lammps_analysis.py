@@ -6,7 +6,7 @@ from pathlib import Path
 
 from ..experiment import Experiment
 
-from ...config_reader import ConfigReader, MainSectionKW
+from ...config_reader import ConfigReader
 from ...model import get_lammps_params
 
 PROPERTIES_BENCH_DIR_NAME: str = 'properties_bench'
@@ -28,7 +28,8 @@ class PropertiesSimulator():
 
     def __init__(self, config_path: Path):
         self._config_path = config_path
-        self._config = ConfigReader(config_path).get_experiment_config(MainSectionKW.PROP_SIM.value)
+        self._sim_config = ConfigReader(config_path).get_prop_sim_config()
+        self._config = self._sim_config.experiment_config
         self._out_path = self._config.sweep_path / PROPERTIES_BENCH_DIR_NAME
 
     def run_sim(self, dependency: int | None = None) -> int:
@@ -48,6 +49,7 @@ class PropertiesSimulator():
             PropertiesSimulator.LAMMPS_INPS_PATH,
             PropertiesSimulator.PPS_PYTHON_PATH,
             PropertiesSimulator.REF_DATA_PATH,
+            self._sim_config.scan_chunks,
         ]])
 
         return Experiment.run_exp(self._config_path, self._out_path, PROP_BENCH_TEMPLATE_PATH,
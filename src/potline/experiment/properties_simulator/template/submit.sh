@@ -26,26 +26,97 @@ LMMP=$1
 lmp_inps=$2
 pps_python=$3
 ref_data_path=$4
-cpus_per_task=$5
-ntasks=$6
+scan_chunks=$5
+cpus_per_task=$6
+ntasks=$7
 
 export MKL_NUM_THREADS=${cpus_per_task}
 export OMP_NUM_THREADS=${cpus_per_task}
 
-# clear caches
-rm dump*
-rm *.csv
-rm sfe*
-rm -r ./data
-rm -r ./plots
-rm in.*
-rm *.mod
-rm *.py
-rm results.txt
-rm *.log
+# Step markers, results.txt is appended by several steps
+STEP_JOURNALS=./data/results.txt
+source ./steps.sh
+
+# clear caches, only when not resuming a previous run
+if step_fresh_start; then
+    rm dump*
+    rm *.csv
+    rm sfe*
+    rm -r ./data
+    rm -r ./plots
+    rm -r ./scan_*
+    rm in.*
+    rm *.mod
+    rm *.py
+    rm results.txt
+    rm *.log
+fi
 
 # create a data folder
-mkdir data
+mkdir -p data
+
+#**********************************
+# Scan runner
+#**********************************
+# Run a scan-type input (one LAMMPS point per loop iteration) split into
+# scan_chunks independent point ranges that run concurrently, each in its own
+# scan_* folder, then merge the per-chunk outputs in point order.
+# usage: run_scan <input> <output file> <first point> <last point> [lammps args]
+run_scan () {
+    local inp=$1
+    local out=$2
+    local first=$3
+    local last=$4
+    shift 4
+
+    local n_points=$((last-first+1))
+    local n_chunks=$(( scan_chunks < n_points ? scan_chunks : n_points ))
+    if [ ${n_chunks} -le 1 ]; then
+        eval srun -n ${ntasks} ${LMMP} -in ${inp} "$@"
+        return
+    fi
+
+    # share the allocation between the chunks: ranks first, then threads
+    local chunk_tasks=$(( ntasks / n_chunks ))
+    local chunk_cpus=${cpus_per_task}
+    if [ ${chunk_tasks} -lt 1 ]; then
+        chunk_tasks=1
+        chunk_cpus=$(( ntasks * cpus_per_task / n_chunks ))
+        chunk_cpus=$(( chunk_cpus < 1 ? 1 : chunk_cpus ))
+    fi
+
+    local chunk_size=$(( (n_points + n_chunks - 1) / n_chunks ))
+    local chunk_dirs=()
+    local pids=()
+    local lo hi chunk_dir
+    for ((lo=first; lo<=last; lo=lo+chunk_size)); do
+        hi=$(( lo + chunk_size - 1 < last ? lo + chunk_size - 1 : last ))
+        chunk_dir=scan_${inp#in.}_${lo}_${hi}
+        rm -rf ${chunk_dir}
+        mkdir ${chunk_dir}
+        cp ${inp} ./potential.in ${chunk_dir}
+        (
+            cd ${chunk_dir}
+            export MKL_NUM_THREADS=${chunk_cpus}
+            export OMP_NUM_THREADS=${chunk_cpus}
+            eval srun --exact -n ${chunk_tasks} -c ${chunk_cpus} ${LMMP} -in ${inp} \
+                -v first ${lo} -v last ${hi} "$@"
+        ) &
+        chunk_dirs+=(${chunk_dir})
+        pids+=($!)
+    done
+
+    local status=0
+    for pid in "${pids[@]}"; do
+        wait ${pid} || status=1
+    done
+
+    rm -f ${out}
+    for chunk_dir in "${chunk_dirs[@]}"; do
+        cat ${chunk_dir}/${out} >> ${out} || status=1
+    done
+    return ${status}
+}
 
 #**********************************
 # Get the information 
@@ -54,84 +125,114 @@ mkdir data
 fullpath=${PWD}
 potential_name=`echo $(basename $fullpath)`
 # Grep the potential version and echo to results file
-echo '#**********************************' | tee -a  ./data/results.txt
-echo 'Potential basis set:' ${potential_name} | tee -a ./data/results.txt
-awk '/^pair_style*/' ./potential.in | tee -a ./data/results.txt
-awk '/^pair_coeff*/' ./potential.in | tee -a ./data/results.txt
-echo '#**********************************' | tee -a ./data/results.txt
+info_step () {
+    echo '#**********************************' | tee -a  ./data/results.txt
+    echo 'Potential basis set:' ${potential_name} | tee -a ./data/results.txt
+    awk '/^pair_style*/' ./potential.in | tee -a ./data/results.txt
+    awk '/^pair_coeff*/' ./potential.in | tee -a ./data/results.txt
+    echo '#**********************************' | tee -a ./data/results.txt
+}
+run_step info "./data/results.txt" "./potential.in" info_step
 
 #**********************************
 # Calculation section
 #**********************************
 # E-V curve 
 cp ${lmp_inps}/in.eos .
-eval srun -n ${ntasks} ${LMMP} -in in.eos -v folder ${potential_name}
-# fit EOS
 cp ${pps_python}/eos-fit.py .
-conda run python eos-fit.py
-cp volume.dat ./data/eos_mlip.csv
+eos_step () {
+    rm -f volume.dat
+    run_scan in.eos volume.dat 1 30 -v folder ${potential_name} &&
+    # fit EOS
+    conda run python eos-fit.py &&
+    cp volume.dat ./data/eos_mlip.csv
+}
+run_step eos "./data/eos_mlip.csv" "./potential.in in.eos eos-fit.py" eos_step
 # Get lattice parameter
 a0=$(grep 'a0 =' ./data/results.txt | awk '{print $3}')
 
 # Vacancy formation energy
 cp ${lmp_inps}/in.vac .
-eval srun -n ${ntasks} ${LMMP} -in in.vac -v lat ${a0}
+run_step vac "./data/results.txt" "./potential.in in.vac" \
+    eval srun -n ${ntasks} ${LMMP} -in in.vac -v lat ${a0}
 
 # Calculation of elastic constants.--------------------------------
 cp ${lmp_inps}/in.elastic .
 cp ${lmp_inps}/*.mod .
-eval srun -n ${ntasks} ${LMMP} -in in.elastic -v lat ${a0}
+run_step elastic "./data/results.txt" "./potential.in in.elastic $(ls *.mod)" \
+    eval srun -n ${ntasks} ${LMMP} -in in.elastic -v lat ${a0}
 
 # Calculation of surface energies.---------------------------------
 cp ${lmp_inps}/in.surf* .
 # (100) plane
-eval srun -n ${ntasks} ${LMMP} -in in.surf1 -v lat ${a0}
+run_step surf1 "./data/results.txt" "./potential.in in.surf1" \
+    eval srun -n ${ntasks} ${LMMP} -in in.surf1 -v lat ${a0}
 # (110) plane
-eval srun -n ${ntasks} ${LMMP} -in in.surf2 -v lat ${a0}
+run_step surf2 "./data/results.txt" "./potential.in in.surf2" \
+    eval srun -n ${ntasks} ${LMMP} -in in.surf2 -v lat ${a0}
 # (111) plane
-eval srun -n ${ntasks} ${LMMP} -in in.surf3 -v lat ${a0}
+run_step surf3 "./data/results.txt" "./potential.in in.surf3" \
+    eval srun -n ${ntasks} ${LMMP} -in in.surf3 -v lat ${a0}
 # (112) plane
-eval srun -n ${ntasks} ${LMMP} -in in.surf4 -v lat ${a0}
+run_step surf4 "./data/results.txt" "./potential.in in.surf4" \
+    eval srun -n ${ntasks} ${LMMP} -in in.surf4 -v lat ${a0}
 
 # Bain path calculation.------------------------------------------
 cp ${lmp_inps}/in.bain_path .
-eval srun -n ${ntasks} ${LMMP} -in in.bain_path -v lat ${a0}
-cp bain_path.csv ./data
+bain_step () {
+    rm -f bain_path.csv
+    run_scan in.bain_path bain_path.csv 1 65 -v lat ${a0} &&
+    cp bain_path.csv ./data
+}
+run_step bain_path "./data/bain_path.csv" "./potential.in in.bain_path" bain_step
 
 # Stacking fault energy---------------------------------------------
 cp ${lmp_inps}/in.sfe_* .
-eval srun -n ${ntasks} ${LMMP} -in in.sfe_110 -v lat ${a0}
-eval srun -n ${ntasks} ${LMMP} -in in.sfe_112 -v lat ${a0}
-cp ./sfe_110.csv ./data
-cp ./sfe_112.csv ./data
+# usage: sfe_step <plane>
+sfe_step () {
+    rm -f sfe_$1.csv
+    eval srun -n ${ntasks} ${LMMP} -in in.sfe_$1 -v lat ${a0} &&
+    cp ./sfe_$1.csv ./data
+}
+run_step sfe_110 "./data/sfe_110.csv" "./potential.in in.sfe_110" sfe_step 110
+run_step sfe_112 "./data/sfe_112.csv" "./potential.in in.sfe_112" sfe_step 112
 
 # Traction-separatio curve------------------------------------------
 cp ${lmp_inps}/in.ts_* .
-eval srun -n ${ntasks} ${LMMP} -in in.ts_100 -v lat ${a0}
-eval srun -n ${ntasks} ${LMMP} -in in.ts_110 -v lat ${a0}
-cp ./ts_100.csv ./data
-cp ./ts_110.csv ./data
+# usage: ts_step <plane>
+ts_step () {
+    run_scan in.ts_$1 ts_$1.csv 0 100 -v lat ${a0} &&
+    cp ./ts_$1.csv ./data
+}
+run_step ts_100 "./data/ts_100.csv" "./potential.in in.ts_100" ts_step 100
+run_step ts_110 "./data/ts_110.csv" "./potential.in in.ts_110" ts_step 110
 
 #**********************************
 # Plotting section
 #**********************************
 # Execute python script to do the plots.py------------------------------
 # Plot E-V curve and Bain path
-cp -r ${ref_data_path} . 
-mkdir plots
-cd plots
-cp ${pps_python}/eos_bain.py .
-cp ${pps_python}/sfe.py .
-cp ${pps_python}/ts.py .
-conda run python eos_bain.py
-conda run python sfe.py
-conda run python ts.py
-rm *.py
+plots_step () {
+    cp -r ${ref_data_path} . 
+    mkdir -p plots
+    (
+        cd plots &&
+        cp ${pps_python}/eos_bain.py . &&
+        cp ${pps_python}/sfe.py . &&
+        cp ${pps_python}/ts.py . &&
+        conda run python eos_bain.py &&
+        conda run python sfe.py &&
+        conda run python ts.py &&
+        rm *.py
+    )
+}
+run_step plots "./plots/eos_bp.png ./plots/sfe.png ./plots/ts.png" \
+    "./data/eos_mlip.csv ./data/bain_path.csv ./data/sfe_110.csv ./data/sfe_112.csv ./data/ts_100.csv ./data/ts_110.csv" \
+    plots_step
 
 echo "Finish plotting results!"
 
 # delete all lammps inputs
-cd ..
 rm in.*
 rm *.mod
 
@@ -0,0 +1,146 @@
+"""
+Content-addressed store for the experiment results.
+"""
+
+from pathlib import Path
+import hashlib
+import shlex
+import shutil
+
+import yaml
+
+from ..loss_logger import INFO_FILENAME, INFO_PARM_FILENAME
+from ..model import POTENTIAL_NAME
+
+RESULT_KEY_NAME: str = 'result_key'
+STORE_INFO_NAME: str = 'store_info.yaml'
+HASH_CHUNK_SIZE: int = 1 << 20
+
+def update_hash(digest, path: Path) -> None:
+    """
+    Update a digest with the content of a file or of a whole directory tree.
+
+    Args:
+        - digest: the hashlib object to update.
+        - path: the path to the file or directory.
+    """
+    if path.is_dir():
+        for sub_path in sorted(p for p in path.rglob('*') if p.is_file()):
+            digest.update(str(sub_path.relative_to(path)).encode('utf-8'))
+            update_hash(digest, sub_path)
+        return
+    with path.open('rb') as file:
+        while chunk := file.read(HASH_CHUNK_SIZE):
+            digest.update(chunk)
+
+class ResultStore():
+    """
+    Content-addressed store for the experiment results.
+    A result is identified by the hash of the potential (potential.in and the model files it references),
+    of the experiment template and of the experiment command, including the LAMMPS binary
+    and any other file or directory passed to it.
+
+    Args:
+        - store_path: the path to the store directory.
+    """
+    EXCLUDED_NAMES: list[str] = [INFO_FILENAME, INFO_PARM_FILENAME, RESULT_KEY_NAME, POTENTIAL_NAME]
+
+    def __init__(self, store_path: Path):
+        self._store_path = store_path
+        self._store_path.mkdir(parents=True, exist_ok=True)
+        self._path_hashes: dict[Path, str] = {}
+
+    def get_key(self, pot_path: Path, copy_dir: Path, command: str) -> str:
+        """
+        Get the key of the results of an experiment.
+
+        Args:
+            - pot_path: the path to the potential file.
+            - copy_dir: the path to the experiment template directory.
+            - command: the command running the experiment.
+
+        Returns:
+            str: the key of the results.
+        """
+        digest = hashlib.sha256()
+        digest.update(self._potential_hash(pot_path).encode('utf-8'))
+        digest.update(self._path_hash(copy_dir).encode('utf-8'))
+        digest.update(command.encode('utf-8'))
+        for token in self.path_tokens(command):
+            digest.update(self._path_hash(token).encode('utf-8'))
+        return digest.hexdigest()
+
+    def has_result(self, key: str) -> bool:
+        """
+        Check if the store contains the results for a key.
+        """
+        return (self._store_path / key / STORE_INFO_NAME).exists()
+
+    def link_result(self, key: str, out_path: Path) -> None:
+        """
+        Link the stored results into an experiment directory.
+        Files already present in the experiment directory are kept.
+
+        Args:
+            - key: the key of the results.
+            - out_path: the experiment directory.
+        """
+        result_path: Path = self._store_path / key
+        for file in result_path.iterdir():
+            dest: Path = out_path / file.name
+            if file.name == STORE_INFO_NAME or dest.exists() or dest.is_symlink():
+                continue
+            dest.symlink_to(file)
+
+    def save_result(self, out_path: Path) -> None:
+        """
+        Copy the results of an experiment directory into the store,
+        using the key written in the directory by the preparation step.
+
+        Args:
+            - out_path: the experiment directory.
+        """
+        key: str = (out_path / RESULT_KEY_NAME).read_text(encoding='utf-8').strip()
+        if self.has_result(key):
+            return
+
+        # copy to a temporary directory first, so that partial results are never used
+        result_path: Path = self._store_path / key
+        tmp_path: Path = self._store_path / f'.{key}.tmp'
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        shutil.copytree(out_path, tmp_path, symlinks=True,
+                        ignore=lambda _, names: [n for n in names if n in self.EXCLUDED_NAMES])
+        with (tmp_path / STORE_INFO_NAME).open('w', encoding='utf-8') as file:
+            yaml.safe_dump({'key': key, 'source': str(out_path.resolve())}, file)
+        shutil.rmtree(result_path, ignore_errors=True)
+        tmp_path.rename(result_path)
+
+    def _potential_hash(self, pot_path: Path) -> str:
+        """
+        Hash the potential file and the model files referenced in it.
+        """
+        digest = hashlib.sha256()
+        update_hash(digest, pot_path)
+        content: str = pot_path.read_text(encoding='utf-8')
+        for token in self.path_tokens(content):
+            digest.update(self._path_hash(token).encode('utf-8'))
+        return digest.hexdigest()
+
+    def _path_hash(self, path: Path) -> str:
+        """
+        Hash a file or a directory, the result is cached for the lifetime of the store.
+        """
+        path = path.resolve()
+        if path not in self._path_hashes:
+            digest = hashlib.sha256()
+            update_hash(digest, path)
+            self._path_hashes[path] = digest.hexdigest()
+        return self._path_hashes[path]
+
+    @staticmethod
+    def path_tokens(text: str) -> list[Path]:
+        """
+        Get the tokens of a command or of a LAMMPS input that are existing absolute paths.
+        """
+        tokens: list[str] = [t for token in shlex.split(text, comments=True) for t in token.split()]
+        return [Path(t) for t in tokens if t.startswith('/') and Path(t).exists()]
@@ -0,0 +1,5 @@
+"""
+Cheap screening of the potentials before the expensive experiments.
+"""
+
+from .screening import Screener, SCREENING_DIR_NAME
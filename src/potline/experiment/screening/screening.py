@@ -0,0 +1,143 @@
+"""
+Screening simulation.
+"""
+
+from pathlib import Path
+import re
+
+import yaml
+import numpy as np
+
+from ..experiment import Experiment
+from ..properties_simulator import PropertiesSimulator
+
+from ...config_reader import ConfigReader
+from ...model import get_lammps_params
+
+SCREENING_DIR_NAME: str = 'screening'
+SUBMIT_SCRIPT_NAME: str = 'submit.sh'
+SCREENING_TEMPLATE_PATH: Path = Path(__file__).parent / 'template'
+SUBMIT_TEMPLATE_PATH: Path = SCREENING_TEMPLATE_PATH / SUBMIT_SCRIPT_NAME
+SCREENING_RESULTS_NAME: str = 'screening.yaml'
+# the reference values of the q-factor, shared with the metrics builder
+REF_VALUES_PATH: Path = Path(__file__).parents[2] / 'metrics_builder' / 'ref_data' / 'q_factor.yaml'
+
+class Screener():
+    """
+    Class for running the cheap screening simulations:
+    a smoke test, the lattice parameter, the elastic constants and the energy drift of a short NVE run.
+    The models failing the screening are skipped by the screened experiments.
+
+    Args:
+        - config_path: the path to the configuration file.
+    """
+    RESULTS_PATTERNS: dict[str, re.Pattern] = {
+        'a0': re.compile(r'^a0 = ([-+.\deE]+)', re.MULTILINE),
+        'c11': re.compile(r'^Elastic Constant C11all = ([-+.\deE]+)', re.MULTILINE),
+        'c12': re.compile(r'^Elastic Constant C12all = ([-+.\deE]+)', re.MULTILINE),
+        'c44': re.compile(r'^Elastic Constant C44all = ([-+.\deE]+)', re.MULTILINE),
+    }
+
+    def __init__(self, config_path: Path):
+        self._config_path = config_path
+        self._screen_config = ConfigReader(config_path).get_screening_config()
+        self._config = self._screen_config.experiment_config
+        self._out_path = self._config.sweep_path / SCREENING_DIR_NAME
+
+    def run_sim(self, dependency: int | None = None) -> int:
+        """
+        Run the screening simulation.
+
+        Args:
+            - dependency: the job dependency.
+
+        Returns:
+            int: The id of the screening jobs.
+        """
+        screen_cmd: str = ' '.join([str(cmd) for cmd in [
+            'bash', SUBMIT_SCRIPT_NAME,
+            f'"{self._config.lammps_bin_path} {get_lammps_params(self._config.model_name)}"',
+            PropertiesSimulator.LAMMPS_INPS_PATH,
+            PropertiesSimulator.PPS_PYTHON_PATH,
+            self._screen_config.nve_steps,
+        ]])
+
+        return Experiment.run_exp(self._config_path, self._out_path, SCREENING_TEMPLATE_PATH,
+                                  screen_cmd, self._config.best_n_models,
+                                  self._config.job_config, self._config.model_name, dependency)
+
+    def get_passed_ids(self) -> list[int]:
+        """
+        Check the screening results of all the models.
+        The outcome of the checks is written in each screening directory.
+
+        Returns:
+            list[int]: the ids of the models that passed the screening.
+        """
+        with REF_VALUES_PATH.open('r', encoding='utf-8') as file:
+            ref_values: dict = yaml.safe_load(file)
+
+        passed_ids: list[int] = []
+        for run_id in range(1, self._config.best_n_models+1):
+            run_path: Path = self._out_path / str(run_id)
+            checks: dict[str, str] = self._check_run(run_path, ref_values)
+            passed: bool = all(check == 'passed' for check in checks.values())
+            if passed:
+                passed_ids.append(run_id)
+            else:
+                print(f'Model {run_id} failed the screening: {checks}')
+            if run_path.exists():
+                with (run_path / SCREENING_RESULTS_NAME).open('w', encoding='utf-8') as file:
+                    yaml.safe_dump({'passed': passed, 'checks': checks}, file)
+        return passed_ids
+
+    def _check_run(self, run_path: Path, ref_values: dict) -> dict[str, str]:
+        """
+        Check the screening results of a model.
+
+        Args:
+            - run_path: the screening directory of the model.
+            - ref_values: the reference values of the properties.
+
+        Returns:
+            dict[str, str]: the outcome of each check.
+        """
+        data_path: Path = run_path / 'data'
+        if not (data_path / 'smoke.dat').exists():
+            return {'smoke': 'no result'}
+        checks: dict[str, str] = {'smoke': 'passed'}
+
+        results: str = ''
+        if (data_path / 'results.txt').exists():
+            results = (data_path / 'results.txt').read_text(encoding='utf-8')
+        for prop, pattern in Screener.RESULTS_PATTERNS.items():
+            tolerance: float = self._screen_config.a0_tolerance if prop == 'a0' \
+                               else self._screen_config.elastic_tolerance
+            match = pattern.search(results)
+            if match is None:
+                checks[prop] = 'no result'
+                continue
+            rel_error: float = abs(float(match.group(1)) - ref_values[prop]) / abs(ref_values[prop])
+            checks[prop] = 'passed' if rel_error <= tolerance else f'relative error {rel_error:.3g}'
+
+        drift: float | None = self._energy_drift(data_path / 'nve.dat')
+        if drift is None:
+            checks['drift'] = 'no result'
+        else:
+            checks['drift'] = 'passed' if drift <= self._screen_config.max_energy_drift \
+                              else f'drift {drift:.3g} eV/atom/ps'
+        return checks
+
+    @staticmethod
+    def _energy_drift(nve_path: Path) -> float | None:
+        """
+        Get the drift of the total energy per atom of the NVE run, in eV/atom/ps,
+        as the slope of a linear fit of the energy over time.
+        """
+        if not nve_path.exists():
+            return None
+        data: np.ndarray = np.loadtxt(nve_path, comments='#', ndmin=2)
+        if data.shape[0] < 2 or not np.all(np.isfinite(data)):
+            return None
+        slope: float = np.polyfit(data[:, 0], data[:, 1], 1)[0]
+        return abs(float(slope))
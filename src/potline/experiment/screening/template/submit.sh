@@ -0,0 +1,55 @@
+#!/bin/bash
+#------------------------------
+# Cheap screening of a potential before the expensive experiments:
+# - 1-step smoke test
+# - equation of state (lattice parameter)
+# - elastic constants
+# - short NVE run for the energy drift
+# The results are checked by the preparation job of the following experiments.
+#------------------------------
+
+# Collect the input parameters
+LMMP=$1
+lmp_inps=$2
+pps_python=$3
+nve_steps=$4
+cpus_per_task=$5
+ntasks=$6
+
+export MKL_NUM_THREADS=${cpus_per_task}
+export OMP_NUM_THREADS=${cpus_per_task}
+
+# Step markers, results.txt is appended by several steps
+# a failed step stops the screening, the model is then rejected
+STEP_JOURNALS=./data/results.txt
+source ./steps.sh
+
+mkdir -p data
+
+# Smoke test
+run_step smoke "./data/smoke.dat" "./potential.in in.smoke" \
+    eval srun -n ${ntasks} ${LMMP} -in in.smoke || exit 1
+
+# E-V curve
+cp ${lmp_inps}/in.eos .
+cp ${pps_python}/eos-fit.py .
+eos_step () {
+    rm -f volume.dat
+    eval srun -n ${ntasks} ${LMMP} -in in.eos &&
+    conda run python eos-fit.py
+}
+run_step eos "./data/results.txt" "./potential.in in.eos eos-fit.py" eos_step || exit 1
+a0=$(grep 'a0 =' ./data/results.txt | awk '{print $3}')
+
+# Elastic constants
+cp ${lmp_inps}/in.elastic .
+cp ${lmp_inps}/*.mod .
+run_step elastic "./data/results.txt" "./potential.in in.elastic $(ls *.mod)" \
+    eval srun -n ${ntasks} ${LMMP} -in in.elastic -v lat ${a0} || exit 1
+
+# Energy drift
+nve_step () {
+    rm -f ./data/nve.dat
+    eval srun -n ${ntasks} ${LMMP} -in in.nve -v lat ${a0} -v steps ${nve_steps}
+}
+run_step nve "./data/nve.dat" "./potential.in in.nve" nve_step || exit 1
@@ -0,0 +1,108 @@
+#!/bin/bash
+#------------------------------
+# Step markers for the experiment scripts.
+# Source this file from a submit script and wrap every step as:
+#   run_step <name> "<output files>" "<input files>" <command> [args]
+# A step is skipped when its marker in ${STEP_DIR} matches the hash of its
+# command line and input files and all its outputs exist and are not empty,
+# so a resubmitted job continues from the first incomplete step.
+# Once a step runs, all the following steps run again.
+# A failed step returns a non-zero status and its marker is not written,
+# the caller decides whether to stop (run_step ... || exit 1) or to continue.
+#------------------------------
+# Files listed in STEP_JOURNALS are appended by several steps (e.g. results.txt):
+# the size of each journal is saved after every step, and before a step runs
+# the journals are truncated to the size saved by the previous completed step.
+# A step is not skipped if a journal is shorter than the size saved by the step.
+#------------------------------
+
+STEP_DIR=./.steps
+STEP_JOURNALS=${STEP_JOURNALS:-}
+
+mkdir -p ${STEP_DIR}
+step_resuming=1
+step_previous=""
+
+# true if no step has been completed in this folder yet
+step_fresh_start () {
+    [ -z "$(ls -A ${STEP_DIR})" ]
+}
+
+step_outputs_valid () {
+    local output
+    for output in "$@"; do
+        [ -s "${output}" ] || return 1
+    done
+}
+
+step_journal_offset () {
+    echo "${STEP_DIR}/$1.${2//\//_}.offset"
+}
+
+# true if the journals still hold what a step had written
+step_journals_valid () {
+    local name=$1
+    local journal offset
+    for journal in ${STEP_JOURNALS}; do
+        offset=$(step_journal_offset "${name}" "${journal}")
+        [ -f "${offset}" ] || continue
+        [ -f "${journal}" ] && [ "$(stat -c %s "${journal}")" -ge "$(cat "${offset}")" ] || return 1
+    done
+}
+
+step_restore_journals () {
+    local journal offset
+    for journal in ${STEP_JOURNALS}; do
+        offset=$(step_journal_offset "${step_previous}" "${journal}")
+        if [ -n "${step_previous}" ] && [ -f "${offset}" ] && [ -f "${journal}" ]; then
+            truncate -s "$(cat "${offset}")" "${journal}"
+        else
+            rm -f "${journal}"
+        fi
+    done
+}
+
+step_save_journals () {
+    local name=$1
+    local journal
+    for journal in ${STEP_JOURNALS}; do
+        if [ -f "${journal}" ]; then
+            stat -c %s "${journal}" > "$(step_journal_offset "${name}" "${journal}")"
+        fi
+    done
+}
+
+run_step () {
+    local name=$1
+    local outputs=$2
+    local inputs=$3
+    shift 3
+
+    local marker=${STEP_DIR}/${name}
+    local hash
+    hash=$( { echo "$*"; cat ${inputs}; } | sha256sum | cut -d' ' -f1 )
+
+    if [ ${step_resuming} -eq 1 ] && [ -f "${marker}" ] \
+        && [ "$(cat "${marker}")" = "${hash}" ] && step_outputs_valid ${outputs} \
+        && step_journals_valid "${name}"; then
+        echo "Step ${name} already completed, skipping"
+        step_previous=${name}
+        return 0
+    fi
+
+    step_resuming=0
+    rm -f "${marker}"
+    step_restore_journals
+    echo "Running step ${name}"
+    if ! "$@"; then
+        echo "Step ${name} failed"
+        return 1
+    fi
+    if ! step_outputs_valid ${outputs}; then
+        echo "Step ${name} did not produce its outputs: ${outputs}"
+        return 1
+    fi
+    step_save_journals ${name}
+    echo "${hash}" > "${marker}"
+    step_previous=${name}
+}
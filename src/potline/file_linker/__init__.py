@@ -0,0 +1,5 @@
+"""
+File linker module.
+"""
+
+from .file_linker import LinkMode, link_file, link_tree
@@ -0,0 +1,72 @@
+"""
+Link or copy files when preparing the run directories.
+"""
+
+from pathlib import Path
+from enum import Enum
+from typing import Callable
+import os
+import shutil
+import subprocess
+
+class LinkMode(Enum):
+    """
+    Supported modes for placing files in the run directories.
+    """
+    COPY = 'copy'
+    SYMLINK = 'symlink'
+    HARDLINK = 'hardlink'
+    REFLINK = 'reflink'
+
+def link_file(src: Path, dest: Path, link_mode: str = LinkMode.COPY.value, mutable: bool = False) -> None:
+    """
+    Place a file at the destination path according to the link mode.
+    Read-only files are symlinked, hardlinked or reflinked,
+    mutable files are reflinked (copy-on-write) or copied.
+    Hardlinks and reflinks fall back to a copy when the filesystem does not support them.
+
+    Args:
+        - src: the source file.
+        - dest: the destination file, replaced if it exists.
+        - link_mode: the link mode.
+        - mutable: whether the file is modified in the destination.
+    """
+    if link_mode not in LinkMode._value2member_map_: # pylint: disable=protected-access
+        raise ValueError(f"Link mode {link_mode} is not supported.")
+
+    if dest.is_symlink() or dest.exists():
+        dest.unlink()
+
+    if link_mode == LinkMode.REFLINK.value:
+        subprocess.run(['cp', '--reflink=auto', str(src), str(dest)], check=True)
+    elif mutable or link_mode == LinkMode.COPY.value:
+        shutil.copy(src, dest)
+    elif link_mode == LinkMode.SYMLINK.value:
+        dest.symlink_to(src.resolve())
+    else:
+        try:
+            os.link(src, dest)
+        except OSError:
+            shutil.copy(src, dest)
+
+def link_tree(src: Path, dest: Path, link_mode: str = LinkMode.COPY.value, mutable: bool = False,
+              ignore: Callable[[Path], bool] | None = None) -> None:
+    """
+    Place a directory tree at the destination path according to the link mode,
+    directories are always created, files are placed with link_file.
+
+    Args:
+        - src: the source directory.
+        - dest: the destination directory, existing files are replaced.
+        - link_mode: the link mode.
+        - mutable: whether the files are modified in the destination.
+        - ignore: function returning True for the source paths to skip.
+    """
+    dest.mkdir(parents=True, exist_ok=True)
+    for file in src.iterdir():
+        if ignore is not None and ignore(file):
+            continue
+        if file.is_dir():
+            link_tree(file, dest / file.name, link_mode, mutable, ignore)
+        else:
+            link_file(file, dest / file.name, link_mode, mutable)
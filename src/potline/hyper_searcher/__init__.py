@@ -3,3 +3,5 @@ Optimizer module.
 """
 
 from .pot_optimizer import PotOptimizer, OPTIM_DIR_NAME
+from .data_preparer import use_prepared_data, PREPARED_DATA_DIR_NAME
+from .throughput_tuner import ThroughputTuner, THROUGHPUT_DIR_NAME
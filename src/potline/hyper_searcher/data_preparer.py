@@ -0,0 +1,52 @@
+"""
+Dataset preprocessing shared by the training jobs of a sweep.
+"""
+
+from pathlib import Path
+import json
+import shutil
+import hashlib
+
+import yaml
+
+from ..model import get_model_class
+
+PREPARED_DATA_DIR_NAME: str = 'prepared_data'
+DATA_PARAMS_NAME: str = 'data_params.yaml'
+
+def use_prepared_data(model_name: str, config: dict, sweep_path: Path) -> dict:
+    """
+    Point a training configuration at the preprocessed dataset of the sweep,
+    preprocessing it first if no configuration with the same data parameters
+    (dataset files, cutoff, split) has been prepared yet.
+    The dataset is prepared once per sweep and per value of the data parameters,
+    in the native cached format of the trainer.
+
+    Args:
+        - model_name: the name of the model.
+        - config: the training configuration, it is not modified.
+        - sweep_path: the path to the sweep.
+
+    Returns:
+        dict: the training configuration using the preprocessed dataset.
+    """
+    model_class = get_model_class(model_name)
+    data_params: dict = model_class.get_data_params(config)
+    key: str = hashlib.sha256(
+        json.dumps(data_params, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+    prep_root: Path = sweep_path / PREPARED_DATA_DIR_NAME
+    prep_path: Path = prep_root / key[:16]
+
+    if not (prep_path / DATA_PARAMS_NAME).exists():
+        print(f'Preparing the dataset in {prep_path}')
+        # prepare in a temporary directory first, so that partial datasets are never used
+        tmp_path: Path = prep_root / f'.{key[:16]}.tmp'
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        tmp_path.mkdir(parents=True)
+        model_class.prepare_data(config, tmp_path)
+        with (tmp_path / DATA_PARAMS_NAME).open('w', encoding='utf-8') as file:
+            yaml.safe_dump(json.loads(json.dumps(data_params, default=str)), file)
+        shutil.rmtree(prep_path, ignore_errors=True)
+        tmp_path.rename(prep_path)
+
+    return model_class.use_prepared_data(config, prep_path)
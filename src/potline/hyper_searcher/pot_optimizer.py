@@ -16,6 +16,8 @@ from ..config_reader import ConfigReader
 from ..model import create_model, CONFIG_NAME, Losses, get_fit_cmd
 from ..loss_logger import LossLogger, ModelTracker
 from ..dispatcher import DispatcherManager, JobType
+from .data_preparer import use_prepared_data
+from .throughput_tuner import ThroughputTuner
 
 OPTIM_DIR_NAME: str = "hyper_search"
 
@@ -110,6 +112,7 @@ class PotOptimizer():
                     raise e
             finally:
                 self._loss_logger.write_error_file(fit_tr)
+                ThroughputTuner.log_throughput(self._config.sweep_path, fit_tr, 'hyper')
                 fit_tr.save_info(fit_tr.model.get_out_path())
 
         # Tell the optimizer the results
@@ -136,6 +139,8 @@ class PotOptimizer():
     ) -> Path:
         """
         Prepare hyperparameters for the model fitting.
+        With the dataset preparation, the configuration points at the preprocessed dataset of the sweep.
+        With the throughput tuning, the fastest runtime settings are used.
 
         Args:
             - opt_values: dictionary of hyperparameters.
@@ -150,9 +155,14 @@ class PotOptimizer():
         self._mlp_total = load.trim_empty_values(self._mlp_total)  # type: ignore
         self._mlp_total = load.convert_numpy_types(self._mlp_total)
 
+        config: dict = dict(self._mlp_total)
+        if self._config.prepare_data:
+            config = use_prepared_data(self._config.model_name, config, self._config.sweep_path)
+        config = ThroughputTuner.apply(config, self._config.sweep_path)
+
         out_filepath: Path = self._iter_path / CONFIG_NAME
         with out_filepath.open("w+", encoding='utf-8') as f:
-            yaml.safe_dump(dict(self._mlp_total), f)
+            yaml.safe_dump(config, f)
         return out_filepath
 
     def _ask(self) -> list[dict]:
@@ -228,14 +238,16 @@ class PotOptimizer():
         return models
 
     @staticmethod
-    def run_hyp(config_path: Path, start_iter: int) -> int:
+    def run_hyp(config_path: Path, start_iter: int, dependency: int | None = None) -> int:
         """
         Run hyperparameter search.
+        With the throughput tuning, the fit jobs use the fastest environment settings and are timed.
 
         Args:
             - config_path: the path to the configuration file.
             - start_iter: the starting iteration.
                 If > 1, assusmes that iteration i-1 has already been registered.
+            - dependency: the job dependency.
 
         Returns:
             int: The id of the last watcher job.
@@ -253,14 +265,20 @@ class PotOptimizer():
 
         # init job
         init_cmd: str = f'{gen_config.python_bin} {cli_path} --config {config_path} --iteration {start_iter}'
-        watch_manager.set_job([init_cmd], out_path / str(start_iter), hyp_config.job_config)
+        watch_manager.set_job([init_cmd], out_path / str(start_iter), hyp_config.job_config,
+                              dependency=dependency)
         (out_path / str(start_iter)).mkdir(exist_ok=True)
         watch_id = watch_manager.dispatch_job()
 
         # run jobs
-        fit_cmd: str = get_fit_cmd(hyp_config.model_name, deep=False)
+        tuned: bool = ThroughputTuner.is_enabled(config_path)
+        fit_cmds: list[str] = [get_fit_cmd(hyp_config.model_name, deep=False,
+                                           compile_cache_path=hyp_config.job_config.compile_cache_path,
+                                           timed=tuned)]
+        if tuned:
+            fit_cmds.insert(0, ThroughputTuner.get_env_cmd(hyp_config.sweep_path))
         for i in range(start_iter, hyp_config.max_iter+1):
-            fit_manager.set_job([fit_cmd], out_path / str(i), hyp_config.job_config, dependency=watch_id,
+            fit_manager.set_job(fit_cmds, out_path / str(i), hyp_config.job_config, dependency=watch_id,
                                 array_ids=list(range(1,hyp_config.n_points+1)))
             fit_id = fit_manager.dispatch_job()
             cmd: str = \
@@ -0,0 +1,345 @@
+"""
+Tuning of the runtime settings of the trainers for the training throughput.
+"""
+
+from __future__ import annotations
+
+import csv
+import copy
+import json
+from statistics import mean
+from pathlib import Path
+
+import yaml
+from skopt import Optimizer # type: ignore
+import xpot.loaders as load # type: ignore
+
+from ..config_reader import ConfigReader, MainSectionKW
+from ..dispatcher import DispatcherManager, JobType, FIRST_STEP_FILE_NAME
+from ..loss_logger import ModelTracker
+from ..model import CONFIG_NAME, create_model, get_model_class, get_fit_cmd
+from .data_preparer import use_prepared_data
+
+THROUGHPUT_DIR_NAME: str = 'throughput_tuning'
+CANDIDATE_INFO_NAME: str = 'candidate.yaml'
+TUNING_INFO_NAME: str = 'tuning_info.yaml'
+TUNING_RESULTS_NAME: str = 'throughput_tuning.csv'
+BEST_SETTINGS_NAME: str = 'best_settings.yaml'
+RUNTIME_ENV_NAME: str = 'runtime.env'
+THROUGHPUT_LOG_NAME: str = 'throughput.jsonl'
+# the device of the training jobs, and the CPU only with the GPUs hidden
+DEVICES: list[str] = ['device', 'cpu']
+RESULT_FIELDS: list[str] = ['candidate', 'device', 'knob', 'value', 'repeat', 'samples_per_s', 's_per_epoch',
+                            'epochs', 'time_to_first_step', 'elapsed', 'exit_code']
+
+def is_env_knob(knob: str) -> bool:
+    """
+    Check if a setting is an environment variable, written in upper case,
+    instead of a dotted path in the training configuration.
+    """
+    return knob.isupper()
+
+def apply_settings(config: dict, settings: dict) -> dict:
+    """
+    Set the dotted paths of a training configuration, the environment variables are ignored.
+
+    Args:
+        - config: the training configuration, it is not modified.
+        - settings: the values of the settings.
+
+    Returns:
+        dict: the training configuration with the settings.
+    """
+    config = copy.deepcopy(config)
+    for knob, value in settings.items():
+        if is_env_knob(knob):
+            continue
+        *parents, key = knob.split('.')
+        section: dict = config
+        for parent in parents:
+            section = section.setdefault(parent, {})
+        section[key] = value
+    return config
+
+def write_env(env_path: Path, settings: dict) -> None:
+    """
+    Write the environment variables of the settings as a script to source.
+    """
+    with env_path.open('w', encoding='utf-8') as file:
+        for knob, value in settings.items():
+            if is_env_knob(knob):
+                file.write(f'export {knob}={value}\n')
+
+def get_throughput(run_path: Path, train_size: int, epochs: int) -> dict | None:
+    """
+    Get the training throughput of a timed run, excluding the time to its first step
+    (loading of the data, building and compilation of the model).
+    The iterations, or epochs, trained after the first step are counted from the output of the trainer,
+    a run resumed from a checkpoint training less than the maximum of its configuration.
+
+    Args:
+        - run_path: the directory of the run.
+        - train_size: the number of training structures.
+        - epochs: the number of iterations, or epochs, of the run, for a record without a count.
+
+    Returns:
+        dict | None: the throughput and the timings of the run, None if the run was not timed.
+    """
+    if not (run_path / FIRST_STEP_FILE_NAME).exists():
+        return None
+    with (run_path / FIRST_STEP_FILE_NAME).open('r', encoding='utf-8') as file:
+        record: dict = json.load(file)
+    first_step: float | None = record['time_to_first_step']
+    training_time: float = record['elapsed'] - first_step if first_step is not None else 0
+    trained: int = record['epochs'] if record.get('epochs') is not None else epochs
+    valid: bool = record['exit_code'] == 0 and training_time > 0 and trained > 0
+    return {
+        'samples_per_s': train_size * trained / training_time if valid else 0.0,
+        's_per_epoch': training_time / trained if valid else None,
+        'epochs': trained,
+        'time_to_first_step': first_step,
+        'elapsed': record['elapsed'],
+        'exit_code': record['exit_code'],
+    }
+
+class ThroughputTuner():
+    """
+    Short calibration of the runtime settings of the trainer before the hyperparameter search,
+    such as the data loading, the batch sizes and the threads, which do not change the model.
+    Each setting is tried in turn from the baseline, with the others kept to their baseline value,
+    on the device of the training jobs and on the CPU only, every run being repeated.
+    The fastest value of each setting on the device is used in every trial of the search
+    and in the deep training, if it is faster than the baseline by more than the noise of the runs.
+
+    Args:
+        - config_path: the path to the configuration file.
+    """
+    def __init__(self, config_path: Path):
+        self._config_path: Path = config_path
+        self._tune_config = ConfigReader(config_path).get_throughput_tune_config()
+        self._hyp_config = ConfigReader(config_path).get_optimizer_config()
+        self._out_path: Path = self._hyp_config.sweep_path / THROUGHPUT_DIR_NAME
+        self._model_class = get_model_class(self._hyp_config.model_name)
+        self._base_config: dict = self._get_base_config()
+
+    def _get_base_config(self) -> dict:
+        """
+        Get the training configuration of the calibration runs,
+        with the first hyperparameters asked to the optimizer of the search.
+        """
+        mlp_total = load.merge_hypers({}, self._hyp_config.optimizer_params)
+        optimizable_params = load.get_optimisable_params(mlp_total)
+        if optimizable_params:
+            values: list = Optimizer(dimensions=list(optimizable_params.values()), random_state=42,
+                                     n_initial_points=self._hyp_config.n_initial_points).ask()
+            mlp_total = load.reconstitute_lists(mlp_total, dict(zip(optimizable_params.keys(), values)))
+        mlp_total = load.prep_dict_for_dump(mlp_total)
+        mlp_total = load.trim_empty_values(mlp_total)  # type: ignore
+        return dict(load.convert_numpy_types(mlp_total))
+
+    def get_knobs(self) -> dict[str, list]:
+        """
+        Get the settings to tune with their values, the first one being the baseline,
+        from the configuration or the defaults of the model.
+
+        Returns:
+            dict[str, list]: the values of each setting with at least two values.
+        """
+        knobs: dict[str, list] = self._tune_config.knobs or self._model_class.get_runtime_knobs(
+            self._base_config, self._tune_config.job_config.cpus_per_task)
+        unique: dict[str, list] = {knob: [v for i, v in enumerate(values) if v not in values[:i]]
+                                   for knob, values in knobs.items()}
+        return {knob: values for knob, values in unique.items() if len(values) > 1}
+
+    def get_candidates(self) -> list[dict]:
+        """
+        Get the calibration runs: the repeats of the baseline and of every other value of each setting,
+        on each device.
+
+        Returns:
+            list[dict]: the device, the setting, its value, the repeat and all the settings of each run.
+        """
+        knobs: dict[str, list] = self.get_knobs()
+        baseline: dict = {knob: values[0] for knob, values in knobs.items()}
+        variants: list[tuple[str, object]] = [('baseline', None)] + \
+            [(knob, value) for knob, values in knobs.items() for value in values[1:]]
+        devices: list[str] = DEVICES if self._tune_config.cpu else DEVICES[:1]
+        return [{'device': device, 'knob': knob, 'value': value, 'repeat': repeat,
+                 'settings': {**baseline, **({knob: value} if knob != 'baseline' else {})}}
+                for device in devices for knob, value in variants
+                for repeat in range(self._tune_config.repeats)]
+
+    def prepare(self) -> None:
+        """
+        Write the training configuration of each calibration run, with a short training.
+        """
+        self._out_path.mkdir(exist_ok=True)
+        config: dict = self._base_config
+        train_size: int = self._model_class.get_train_size(config)
+        if self._hyp_config.prepare_data:
+            config = use_prepared_data(self._hyp_config.model_name, config, self._hyp_config.sweep_path)
+        with (self._out_path / TUNING_INFO_NAME).open('w', encoding='utf-8') as file:
+            yaml.safe_dump({'train_size': train_size, 'maxiter': self._tune_config.maxiter}, file)
+
+        for i, candidate in enumerate(self.get_candidates()):
+            run_path: Path = self._out_path / str(i+1)
+            run_path.mkdir(exist_ok=True)
+            settings: dict = candidate['settings']
+            if candidate['device'] == 'cpu':
+                settings = {**settings, **self._model_class.get_cpu_settings(), 'CUDA_VISIBLE_DEVICES': '""'}
+            with (run_path / CONFIG_NAME).open('w', encoding='utf-8') as file:
+                yaml.safe_dump(apply_settings(config, settings), file)
+            create_model(self._hyp_config.model_name, run_path).set_config_maxiter(self._tune_config.maxiter)
+            write_env(run_path / RUNTIME_ENV_NAME, settings)
+            with (run_path / CANDIDATE_INFO_NAME).open('w', encoding='utf-8') as file:
+                yaml.safe_dump(candidate, file)
+
+    def collect(self) -> dict:
+        """
+        Collect the throughput of the calibration runs and write the fastest settings on the device.
+        The settings of the environment are written to a script sourced by the training jobs.
+
+        Returns:
+            dict: the fastest settings.
+        """
+        with (self._out_path / TUNING_INFO_NAME).open('r', encoding='utf-8') as file:
+            info: dict = yaml.safe_load(file)
+
+        rows: list[dict] = []
+        for i, candidate in enumerate(self.get_candidates()):
+            throughput: dict | None = get_throughput(self._out_path / str(i+1), info['train_size'],
+                                                     info['maxiter'])
+            if throughput is None:
+                print(f'Calibration run {i+1} was not timed, skipping it.')
+                continue
+            rows.append({'candidate': i+1, 'device': candidate['device'], 'knob': candidate['knob'],
+                         'value': candidate['value'], 'repeat': candidate['repeat'], **throughput})
+            print(f"{candidate['device']} {candidate['knob']}={candidate['value']} "
+                  f"(repeat {candidate['repeat']+1}): {throughput['samples_per_s']:.4g} samples/s")
+        with (self._out_path / TUNING_RESULTS_NAME).open('w', encoding='utf-8', newline='') as file:
+            writer = csv.DictWriter(file, RESULT_FIELDS)
+            writer.writeheader()
+            writer.writerows(rows)
+
+        # the baseline is kept for the settings without a value faster than the noise of the runs
+        device_rows: list[dict] = [row for row in rows if row['device'] == DEVICES[0]]
+        baseline: list[float] = [row['samples_per_s'] for row in device_rows if row['knob'] == 'baseline']
+        baseline_speed: float = mean(baseline) if baseline else 0.0
+        # the spread of the baseline repeats measures the run-to-run noise
+        spread: float = (max(baseline) - min(baseline)) / baseline_speed if baseline_speed > 0 else 0.0
+        threshold: float = baseline_speed * (1 + max(self._tune_config.noise_margin, spread))
+        knobs: dict[str, list] = self.get_knobs()
+        best: dict = {knob: values[0] for knob, values in knobs.items()}
+        for knob, values in knobs.items():
+            speeds: dict[int, float] = {}
+            for i, value in enumerate(values[1:]):
+                value_rows: list[float] = [row['samples_per_s'] for row in device_rows
+                                           if row['knob'] == knob and row['value'] == value]
+                if value_rows:
+                    speeds[i+1] = mean(value_rows)
+            fastest: int | None = max(speeds, key=lambda i: speeds[i], default=None)
+            if fastest is not None and speeds[fastest] > threshold:
+                best[knob] = values[fastest]
+
+        with (self._out_path / BEST_SETTINGS_NAME).open('w', encoding='utf-8') as file:
+            yaml.safe_dump(best, file)
+        write_env(self._out_path / RUNTIME_ENV_NAME, best)
+        print(f'Fastest settings: {best}')
+        return best
+
+    @staticmethod
+    def is_enabled(config_path: Path) -> bool:
+        """
+        Check if the throughput tuning is configured.
+        """
+        return MainSectionKW.THROUGHPUT_TUNING.value in ConfigReader(config_path).config_data
+
+    @staticmethod
+    def apply(config: dict, sweep_path: Path) -> dict:
+        """
+        Set the fastest settings in a training configuration, if the tuning has been run.
+
+        Args:
+            - config: the training configuration, it is not modified.
+            - sweep_path: the path to the sweep.
+
+        Returns:
+            dict: the training configuration with the fastest settings.
+        """
+        best_path: Path = sweep_path / THROUGHPUT_DIR_NAME / BEST_SETTINGS_NAME
+        if not best_path.exists():
+            return config
+        with best_path.open('r', encoding='utf-8') as file:
+            return apply_settings(config, yaml.safe_load(file) or {})
+
+    @staticmethod
+    def get_env_cmd(sweep_path: Path) -> str:
+        """
+        Get the command sourcing the fastest environment settings in the training jobs, if they exist.
+        """
+        env_path: Path = sweep_path / THROUGHPUT_DIR_NAME / RUNTIME_ENV_NAME
+        return f'[ ! -f {env_path} ] || source {env_path}'
+
+    @staticmethod
+    def log_throughput(sweep_path: Path, tracker: ModelTracker, stage: str) -> None:
+        """
+        Append the training throughput of a timed model to the throughput log of the sweep,
+        to compare the following runs.
+
+        Args:
+            - sweep_path: the path to the sweep.
+            - tracker: the tracker of the trained model.
+            - stage: 'hyper' or 'deep'.
+        """
+        tuning_path: Path = sweep_path / THROUGHPUT_DIR_NAME
+        if not (tuning_path / TUNING_INFO_NAME).exists():
+            return
+        with (tuning_path / TUNING_INFO_NAME).open('r', encoding='utf-8') as file:
+            info: dict = yaml.safe_load(file)
+        throughput: dict | None = get_throughput(tracker.model.get_out_path(), info['train_size'],
+                                                 tracker.model.get_config_maxiter())
+        if throughput is None:
+            return
+        record: dict = {'stage': stage, 'iteration': tracker.iteration, 'subiteration': tracker.subiter,
+                        **throughput}
+        with (tuning_path / THROUGHPUT_LOG_NAME).open('a', encoding='utf-8') as file:
+            file.write(json.dumps(record) + '\n')
+
+    @staticmethod
+    def run_tune(config_path: Path, dependency: int | None = None) -> int:
+        """
+        Run the calibration: a job preparing the runs, the short training runs and a job collecting them.
+
+        Args:
+            - config_path: the path to the configuration file.
+            - dependency: the job dependency.
+
+        Returns:
+            int: The id of the collection job.
+        """
+        tuner = ThroughputTuner(config_path)
+        gen_config = ConfigReader(config_path).get_general_config()
+        job_config = tuner._tune_config.job_config # pylint: disable=protected-access
+        model_name: str = tuner._hyp_config.model_name # pylint: disable=protected-access
+        cli_path: Path = gen_config.repo_path / 'src' / 'run_throughput.py'
+        out_path: Path = tuner._out_path # pylint: disable=protected-access
+        out_path.mkdir(exist_ok=True)
+        fit_manager = DispatcherManager(JobType.FIT.value, model_name, job_config.cluster)
+        watch_manager = DispatcherManager(JobType.WATCH_FIT.value, model_name, job_config.cluster)
+
+        # init job
+        init_cmd: str = f'{gen_config.python_bin} {cli_path} --config {config_path}'
+        watch_manager.set_job([init_cmd], out_path, job_config, dependency=dependency)
+        init_id = watch_manager.dispatch_job()
+
+        # calibration runs, timed to their first step
+        fit_cmd: str = get_fit_cmd(model_name, deep=False,
+                                   compile_cache_path=job_config.compile_cache_path, timed=True)
+        fit_manager.set_job([f'source {RUNTIME_ENV_NAME}', fit_cmd], out_path, job_config,
+                            dependency=init_id, array_ids=list(range(1, len(tuner.get_candidates())+1)))
+        fit_id = fit_manager.dispatch_job()
+
+        # collect job
+        coll_cmd: str = f'{gen_config.python_bin} {cli_path} --config {config_path} --collect'
+        watch_manager.set_job([coll_cmd], out_path, job_config, dependency=fit_id)
+        return watch_manager.dispatch_job()
@@ -2,4 +2,4 @@
 Loss logger
 """
 
-from .loss_logger import LossLogger, ModelTracker, INFO_FILENAME
+from .loss_logger import LossLogger, ModelTracker, INFO_FILENAME, INFO_PARM_FILENAME
@@ -3,3 +3,4 @@ Module for metrics calculation and reporting.
 """
 
 from .calculator import MetricsCalculator, METRICS_DIR_NAME
+from .q_predictor import QFactorPredictor
@@ -14,8 +14,11 @@ import matplotlib.pyplot as plt
 from sklearn.metrics import mean_squared_error, mean_absolute_error # type: ignore
 
 from ..loss_logger import INFO_FILENAME
+from .scaling import fit_strong_scaling, fit_weak_scaling
+from .memory import fit_memory
+from .statistics import bootstrap_ci
 from ..experiment.properties_simulator import PROPERTIES_BENCH_DIR_NAME
-from ..experiment.inference_bencher import INFERENCE_BENCH_DIR_NAME
+from ..experiment.inference_bencher import INFERENCE_BENCH_DIR_NAME, PAIRED_RESULTS_FILE_NAME
 from ..experiment.hard_split_screw import HSS_DIR_NAME
 
 METRICS_DIR_NAME: str = 'metrics'
@@ -24,6 +27,12 @@ HSS_REF_VALUES_NAME: str = 'Meng_screw_dis.xyz'
 SIM_RESULTS_DIR_NAME: str = 'data'
 SIM_RESULTS_FILE_NAME: str = 'results.txt'
 BENCH_RESULTS_FILE_NAME: str = 'bench_timings.csv'
+BENCH_SCALING_FILE_NAME: str = 'bench_scaling.csv'
+BENCH_MEMORY_FILE_NAME: str = 'bench_memory.csv'
+BENCH_WORKLOADS_FILE_NAME: str = 'bench_workloads.csv'
+BENCH_REFERENCE_FILE_NAME: str = 'bench_reference.csv'
+BENCH_TIMING_FIELDS: list[str] = ['loop_time', 'timesteps_per_s', 'katom_step_per_s', 'pair_time',
+                                  'neigh_time', 'comm_time', 'output_time', 'modify_time', 'other_time']
 REF_DATA_PATH: Path = Path(__file__).parent / 'ref_data'
 Q_FACTOR_PATH: Path = REF_DATA_PATH / Q_FACTOR_REF_VALUES_NAME
 HSS_REF_PATH: Path = REF_DATA_PATH / HSS_REF_VALUES_NAME
@@ -99,7 +108,8 @@ class MetricsCalculator():
 
     def calculate_inference_time(self, run_nums: list[int] | None = None) -> dict[Tuple[int,int], float]:
         """
-        Calculate the inference time for the simulations.
+        Calculate the inference time for the simulations, in seconds per timestep,
+        from the loop time of the timed LAMMPS runs, averaged over the repetitions.
 
         Args:
             run_nums: The list of run numbers to calculate the inference times for.
@@ -110,10 +120,163 @@ class MetricsCalculator():
             Uses a tuple of the iteration and subiteration as the key.
             (from the hyperparameter optimization step)
         """
-        # List of inference times, each simulations is identified by a tuple of the iteration and subiteration
-        inference_times: dict[Tuple[int,int], float] = {}
+        return {key: float(np.mean([self._get_step_time(row) for row in rows]))
+                for key, rows in self._load_bench_rows(run_nums).items()}
 
-        inf_paths: list[Path] = [p for p in self._inf_path.iterdir() if p.is_dir()]
+    def calculate_inference_ci(self, run_nums: list[int] | None = None, confidence: float = 0.95,
+                               n_resamples: int = 10000) -> dict[Tuple[int,int], dict[str, Any]]:
+        """
+        Calculate the bootstrap confidence intervals of the mean timesteps/s over the benchmark repetitions.
+        Models whose intervals overlap cannot be ranked by speed, they are flagged as indistinguishable.
+
+        Args:
+            run_nums: The list of run numbers to calculate the confidence intervals for.
+            If None, all the simulations are used.
+            confidence: The confidence level of the intervals.
+            n_resamples: The number of bootstrap resamples.
+
+        Returns:
+            A dictionary with the mean timesteps/s, its confidence interval, the number of repetitions
+            and the list of the indistinguishable simulations for each simulation.
+            Uses a tuple of the iteration and subiteration as the key.
+            (from the hyperparameter optimization step)
+        """
+        intervals: dict[Tuple[int,int], dict[str, Any]] = {}
+        for key, rows in self._load_bench_rows(run_nums).items():
+            speeds = np.array([1 / self._get_step_time(row) for row in rows])
+            ci_low, ci_high = bootstrap_ci(speeds, confidence, n_resamples)
+            intervals[key] = {
+                'timesteps_per_s': float(speeds.mean()),
+                'ci_low': ci_low,
+                'ci_high': ci_high,
+                'repetitions': len(speeds),
+            }
+
+        for key, interval in intervals.items():
+            interval['indistinguishable'] = [
+                other for other, other_interval in intervals.items() if other != key
+                and interval['ci_low'] <= other_interval['ci_high']
+                and other_interval['ci_low'] <= interval['ci_high']]
+
+        return intervals
+
+    def calculate_normalised_speed(
+            self, run_nums: list[int] | None = None) -> dict[Tuple[int,int], dict[str, float]]:
+        """
+        Calculate the speed of the models relative to the reference potential timed on the same node,
+        so that models benchmarked on different clusters can be compared.
+
+        Args:
+            run_nums: The list of run numbers to calculate the normalised speed for.
+            If None, all the simulations timed with a reference potential are used.
+
+        Returns:
+            A dictionary with the mean timesteps/s of the model and of the reference potential
+            and their ratio, the normalised speed, for each simulation.
+            Uses a tuple of the iteration and subiteration as the key.
+            (from the hyperparameter optimization step)
+        """
+        model_rows = self._load_bench_rows(run_nums)
+        speeds: dict[Tuple[int,int], dict[str, float]] = {}
+        for key, rows in self._load_bench_rows(run_nums, BENCH_REFERENCE_FILE_NAME).items():
+            if not rows or not model_rows.get(key):
+                continue
+            model_speed = float(np.mean([1 / self._get_step_time(row) for row in model_rows[key]]))
+            reference_speed = float(np.mean([1 / self._get_step_time(row) for row in rows]))
+            speeds[key] = {
+                'timesteps_per_s': model_speed,
+                'reference_timesteps_per_s': reference_speed,
+                'normalised_speed': model_speed / reference_speed,
+            }
+        return speeds
+
+    @staticmethod
+    def rank_normalised_speed(sweep_paths: list[Path]) -> list[dict[str, Any]]:
+        """
+        Rank the models of several sweeps, possibly benchmarked on different clusters,
+        by their speed relative to the reference potential.
+
+        Args:
+            sweep_paths: The paths to the sweeps.
+
+        Returns:
+            The list of the models, fastest first, with their sweep, iteration and subiteration
+            and their normalised speed.
+        """
+        ranking: list[dict[str, Any]] = []
+        for sweep_path in sweep_paths:
+            for (iteration, subiteration), speed in \
+                    MetricsCalculator(sweep_path).calculate_normalised_speed().items():
+                ranking.append({'sweep': str(sweep_path), 'iteration': iteration,
+                                'subiteration': subiteration, **speed})
+        return sorted(ranking, key=lambda model: model['normalised_speed'], reverse=True)
+
+    def get_inference_breakdown(self,
+                                run_nums: list[int] | None = None) -> dict[Tuple[int,int], dict[str, float]]:
+        """
+        Get the LAMMPS timings of the inference benchmarks, averaged over the repetitions:
+        the performance and the average MPI task timing breakdown.
+
+        Args:
+            run_nums: The list of run numbers to get the timings for.
+            If None, all the simulations are used.
+
+        Returns:
+            A dictionary with the timings for each simulation.
+            Uses a tuple of the iteration and subiteration as the key.
+            (from the hyperparameter optimization step)
+        """
+        return {key: {field: float(np.mean([float(row[field]) for row in rows]))
+                      for field in BENCH_TIMING_FIELDS if all(row.get(field) for row in rows)}
+                for key, rows in self._load_bench_rows(run_nums).items()}
+
+    def get_paired_table(self) -> list[dict[str, Any]]:
+        """
+        Get the timings of a paired inference benchmark, where all the models ran in turn in the same job,
+        without the warm-up rounds.
+
+        Returns:
+            The list of the runs, in execution order, with the iteration and subiteration of the model,
+            the round, the position in the round, the time per step and the LAMMPS timings.
+        """
+        with (self._inf_path / PAIRED_RESULTS_FILE_NAME).open('r') as file:
+            rows = [row for row in csv.DictReader(file) if row['warmup'] == '0' and row['loop_time']]
+
+        table: list[dict[str, Any]] = []
+        for row in rows:
+            with (self._inf_path / row['model'] / INFO_FILENAME).open('r') as file:
+                data = yaml.safe_load(file)
+            table.append({
+                'iteration': int(data['iteration']),
+                'subiteration': int(data['subiteration']),
+                'round': int(row['round']),
+                'position': int(row['position']),
+                'step_time': self._get_step_time(row),
+                **{key: float(row[key]) for key in BENCH_TIMING_FIELDS if row.get(key)},
+            })
+
+        return table
+
+    def _load_bench_rows(
+            self, run_nums: list[int] | None = None,
+            file_name: str = BENCH_RESULTS_FILE_NAME) -> dict[Tuple[int,int], list[dict[str, str]]]:
+        """
+        Load the rows of the inference benchmark timings, without the warm-up repetitions
+        and the failed runs.
+
+        Args:
+            run_nums: The list of run numbers to load.
+            If None, all the simulations are used.
+            file_name: The name of the timings file, the simulations without it are skipped.
+
+        Returns:
+            A dictionary with the timing rows for each simulation.
+            Uses a tuple of the iteration and subiteration as the key.
+        """
+        bench_rows: dict[Tuple[int,int], list[dict[str, str]]] = {}
+
+        inf_paths: list[Path] = [p for p in self._inf_path.iterdir()
+                                 if p.is_dir() and (p / file_name).exists()]
         if run_nums: # Filter the simulations
             inf_paths = [p for p in inf_paths if int(p.name) in run_nums]
         for p in inf_paths:
@@ -123,17 +286,168 @@ class MetricsCalculator():
                 data = yaml.safe_load(file)
                 iteration = int(data['iteration'])
                 subiteration = int(data['subiteration'])
-            data_path = p / BENCH_RESULTS_FILE_NAME
+            data_path = p / file_name
             # Load the inference results
             with data_path.open('r') as file:
-                reader = csv.DictReader(file)
-                for row in reader:
-                    inference_time = float(row['time_diff'])
-                    prerun_steps = int(row['prerun_steps'])
-                    max_steps = int(row['max_steps'])
-                    inference_times[(iteration, subiteration)] = inference_time / (max_steps - prerun_steps)
-
-        return inference_times
+                bench_rows[(iteration, subiteration)] = [
+                    row for row in csv.DictReader(file)
+                    if row.get('warmup', '0') == '0' and row.get('loop_time', row.get('time_diff'))]
+
+        return bench_rows
+
+    @staticmethod
+    def _get_step_time(row: dict[str, str]) -> float:
+        """
+        Get the time per step of a benchmark timing row.
+        """
+        if 'loop_time' not in row:
+            # wall clock timings of the older benchmarks
+            return float(row['time_diff']) / (int(row['max_steps']) - int(row['prerun_steps']))
+        return float(row['loop_time']) / int(row['steps'])
+
+    def get_workload_table(self,
+                           run_nums: list[int] | None = None) -> dict[Tuple[int,int], dict[str, float]]:
+        """
+        Get the performance of the inference benchmark workload catalogue, in katom-step/s.
+        It is computed from the loop time when LAMMPS does not report it (minimizations).
+
+        Args:
+            run_nums: The list of run numbers to get the performance for.
+            If None, all the simulations with a workload catalogue are used.
+
+        Returns:
+            A dictionary with the katom-step/s of each workload for each simulation.
+            Uses a tuple of the iteration and subiteration as the key.
+            (from the hyperparameter optimization step)
+        """
+        workloads: dict[Tuple[int,int], dict[str, float]] = {}
+
+        inf_paths: list[Path] = [p for p in self._inf_path.iterdir()
+                                 if p.is_dir() and (p / BENCH_WORKLOADS_FILE_NAME).exists()]
+        if run_nums: # Filter the simulations
+            inf_paths = [p for p in inf_paths if int(p.name) in run_nums]
+        for p in inf_paths:
+            with (p / INFO_FILENAME).open('r') as file:
+                data = yaml.safe_load(file)
+                iteration = int(data['iteration'])
+                subiteration = int(data['subiteration'])
+            with (p / BENCH_WORKLOADS_FILE_NAME).open('r') as file:
+                rows = [row for row in csv.DictReader(file) if row['loop_time']]
+
+            workloads[(iteration, subiteration)] = {
+                row['workload']: float(row['katom_step_per_s']) if row['katom_step_per_s']
+                else int(row['atoms']) * int(row['steps']) / float(row['loop_time']) / 1000
+                for row in rows}
+
+        return workloads
+
+    def calculate_scaling(self, run_nums: list[int] | None = None) -> dict[Tuple[int,int], dict[str, Any]]:
+        """
+        Fit the strong and weak scaling curves of the inference benchmark scaling sweeps.
+        Strong scaling is fitted for each system size, weak scaling for each number of atoms per core,
+        when at least two core counts were run.
+
+        Args:
+            run_nums: The list of run numbers to fit the scaling for.
+            If None, all the simulations with a scaling sweep are used.
+
+        Returns:
+            A dictionary with the strong scaling fits, keyed by the number of atoms,
+            and the weak scaling fits, keyed by the number of atoms per core, for each simulation.
+            Uses a tuple of the iteration and subiteration as the key.
+            (from the hyperparameter optimization step)
+        """
+        scaling: dict[Tuple[int,int], dict[str, Any]] = {}
+
+        inf_paths: list[Path] = [p for p in self._inf_path.iterdir()
+                                 if p.is_dir() and (p / BENCH_SCALING_FILE_NAME).exists()]
+        if run_nums: # Filter the simulations
+            inf_paths = [p for p in inf_paths if int(p.name) in run_nums]
+        for p in inf_paths:
+            with (p / INFO_FILENAME).open('r') as file:
+                data = yaml.safe_load(file)
+                iteration = int(data['iteration'])
+                subiteration = int(data['subiteration'])
+            with (p / BENCH_SCALING_FILE_NAME).open('r') as file:
+                rows = [row for row in csv.DictReader(file) if row['loop_time']]
+
+            # group the runs by system size and by number of atoms per core
+            strong_groups: dict[int, list[Tuple[str, int, float]]] = {}
+            weak_groups: dict[int, list[Tuple[str, int, float]]] = {}
+            for row in rows:
+                cores = int(row['ntasks']) * int(row['threads'])
+                atoms = int(row['atoms'])
+                time_per_step = float(row['loop_time']) / int(row['steps'])
+                run = (f"{row['ntasks']}x{row['threads']}", cores, time_per_step)
+                strong_groups.setdefault(atoms, []).append(run)
+                weak_groups.setdefault(round(atoms / cores), []).append(run)
+
+            def fit_groups(groups: dict[int, list[Tuple[str, int, float]]], fit) -> dict[int, dict]:
+                return {key: fit([r[0] for r in runs], np.array([r[1] for r in runs], dtype=float),
+                                 np.array([r[2] for r in runs]))
+                        for key, runs in groups.items() if len({r[1] for r in runs}) > 1}
+
+            scaling[(iteration, subiteration)] = {
+                'strong': fit_groups(strong_groups, fit_strong_scaling),
+                'weak': fit_groups(weak_groups, fit_weak_scaling),
+            }
+
+        return scaling
+
+    def calculate_memory(self, run_nums: list[int] | None = None,
+                         node_memory_gb: float | None = None) -> dict[Tuple[int,int], dict[str, Any]]:
+        """
+        Fit the memory footprint of the inference benchmark memory sweeps:
+        the peak resident memory summed over the MPI tasks against the number of atoms.
+        The sizes that went out of memory are excluded from the fit.
+
+        Args:
+            run_nums: The list of run numbers to fit the memory for.
+            If None, all the simulations with a memory sweep are used.
+            node_memory_gb: The memory of a node, in GB, to estimate the largest system fitting on a node,
+            assuming that all the MPI tasks of the sweep run on the same node.
+
+        Returns:
+            A dictionary with the memory per atom and the fixed memory, the largest number of atoms
+            fitting on a node if the node memory is given, the smallest failed system
+            and the memory of each system size for each simulation.
+            Uses a tuple of the iteration and subiteration as the key.
+            (from the hyperparameter optimization step)
+        """
+        memory: dict[Tuple[int,int], dict[str, Any]] = {}
+
+        inf_paths: list[Path] = [p for p in self._inf_path.iterdir()
+                                 if p.is_dir() and (p / BENCH_MEMORY_FILE_NAME).exists()]
+        if run_nums: # Filter the simulations
+            inf_paths = [p for p in inf_paths if int(p.name) in run_nums]
+        for p in inf_paths:
+            with (p / INFO_FILENAME).open('r') as file:
+                data = yaml.safe_load(file)
+                iteration = int(data['iteration'])
+                subiteration = int(data['subiteration'])
+            with (p / BENCH_MEMORY_FILE_NAME).open('r') as file:
+                rows = [row for row in csv.DictReader(file) if row['system_atoms']]
+
+            sizes: list[dict[str, Any]] = [{
+                'atoms': int(row['system_atoms']),
+                'ntasks': int(row['ntasks']),
+                'completed': row['completed'] == '1',
+                'peak_rss_max_mb': int(row['peak_rss_max_kb']) / 1024,
+                'peak_rss_sum_mb': int(row['peak_rss_sum_kb']) / 1024,
+                'lammps_mem_mb': float(row['lammps_mem_mb']) if row['lammps_mem_mb'] else None,
+            } for row in rows]
+            completed = [size for size in sizes if size['completed']]
+            failed = [size['atoms'] for size in sizes if not size['completed']]
+
+            memory[(iteration, subiteration)] = {
+                **(fit_memory(np.array([size['atoms'] for size in completed], dtype=float),
+                              np.array([size['peak_rss_sum_mb'] for size in completed]) * 2**20,
+                              node_memory_gb * 1e9 if node_memory_gb else None) if completed else {}),
+                'min_failed_atoms': min(failed) if failed else None,
+                'sizes': sizes,
+            }
+
+        return memory
 
     def plot_screw_dislocation(self,
                                run_nums: list[int] | None = None) -> dict[str, list[dict[str, Any]]]:
@@ -0,0 +1,32 @@
+"""
+Fit of the memory footprint of the inference benchmark.
+"""
+
+import numpy as np
+
+def fit_memory(atoms: np.ndarray, memory: np.ndarray,
+               available_memory: float | None = None) -> dict[str, float]:
+    """
+    Fit a linear model, m(n) = a + b * n, to the memory used for n atoms.
+
+    Args:
+        - atoms: the number of atoms of each run.
+        - memory: the memory used by each run, in bytes.
+        - available_memory: the memory available, in bytes, to estimate the largest system fitting in it.
+
+    Returns:
+        dict: the memory per atom b and the fixed memory a, in bytes,
+        and the largest number of atoms fitting in the available memory, if given.
+    """
+    if len(np.unique(atoms)) < 2:
+        # a single system size, the memory is attributed to the atoms
+        base, per_atom = 0.0, float(np.mean(memory / atoms))
+    else:
+        base, per_atom = np.polyfit(atoms, memory, 1)[::-1]
+    fit: dict[str, float] = {
+        'bytes_per_atom': float(per_atom),
+        'base_bytes': float(base),
+    }
+    if available_memory is not None:
+        fit['max_atoms'] = float((available_memory - base) / per_atom) if per_atom > 0 else float('inf')
+    return fit
@@ -0,0 +1,148 @@
+"""
+Surrogate model predicting the q-factor of a potential from cheap information.
+"""
+
+from pathlib import Path
+import math
+import pickle
+
+import yaml
+import numpy as np
+from sklearn.pipeline import make_pipeline # type: ignore
+from sklearn.preprocessing import StandardScaler # type: ignore
+from sklearn.gaussian_process import GaussianProcessRegressor # type: ignore
+from sklearn.gaussian_process.kernels import ConstantKernel, RBF, WhiteKernel # type: ignore
+
+from ..loss_logger import ModelTracker, INFO_FILENAME, INFO_PARM_FILENAME
+from ..experiment.properties_simulator import PROPERTIES_BENCH_DIR_NAME
+from .calculator import MetricsCalculator
+
+ENERGY_FEATURE: str = 'log_valid_energy_loss'
+FORCE_FEATURE: str = 'log_valid_force_loss'
+
+def get_features(valid_energy: float, valid_force: float, params: dict) -> dict[str, float]:
+    """
+    Get the features of a model: the logarithm of the validation losses
+    and the numeric hyperparameters.
+
+    Args:
+        - valid_energy: the validation energy loss.
+        - valid_force: the validation force loss.
+        - params: the hyperparameters of the model.
+
+    Returns:
+        dict[str, float]: the features of the model.
+    """
+    features: dict[str, float] = {
+        ENERGY_FEATURE: math.log(valid_energy),
+        FORCE_FEATURE: math.log(valid_force),
+    }
+    for key, value in params.items():
+        if isinstance(value, (int, float)):
+            name: str = ' '.join(str(k) for k in key) if isinstance(key, tuple) else str(key)
+            features[name] = float(value)
+    return features
+
+class QFactorPredictor():
+    """
+    Gaussian process regression of the q-factor on the validation losses and the hyperparameters,
+    trained on the properties simulations of previous sweeps.
+
+    Args:
+        - feature_names: the names of the features used by the model.
+    """
+    def __init__(self, feature_names: list[str]):
+        self._feature_names = feature_names
+        self._means: np.ndarray = np.zeros(len(feature_names))
+        self._regressor = make_pipeline(
+            StandardScaler(),
+            GaussianProcessRegressor(ConstantKernel() * RBF(np.ones(len(feature_names))) + WhiteKernel(),
+                                     normalize_y=True, n_restarts_optimizer=5, random_state=0),
+        )
+
+    @staticmethod
+    def from_sweeps(sweep_paths: list[Path]) -> 'QFactorPredictor':
+        """
+        Train a predictor on the properties simulations of previous sweeps.
+        The features available in all the simulations are used.
+
+        Args:
+            - sweep_paths: the paths to the sweeps.
+
+        Returns:
+            QFactorPredictor: the trained predictor.
+        """
+        samples: list[dict[str, float]] = []
+        q_factors: list[float] = []
+        for sweep_path in sweep_paths:
+            calculator = MetricsCalculator(sweep_path)
+            for sim_path in sorted((sweep_path / PROPERTIES_BENCH_DIR_NAME).iterdir()):
+                if not sim_path.is_dir():
+                    continue
+                try:
+                    q_factor: float = list(calculator.calculate_q_factors([int(sim_path.name)]).values())[0]
+                    with (sim_path / INFO_FILENAME).open('r', encoding='utf-8') as file:
+                        info: dict = yaml.safe_load(file)
+                    with (sim_path / INFO_PARM_FILENAME).open('rb') as file:
+                        params: dict = pickle.load(file)
+                    features = get_features(float(info['valid_energy_loss']),
+                                            float(info['valid_force_loss']), params)
+                except (FileNotFoundError, IndexError, KeyError, ValueError) as e:
+                    print(f'Skipping {sim_path}: {e}')
+                    continue
+                samples.append(features)
+                q_factors.append(q_factor)
+
+        if len(samples) < 2:
+            raise ValueError('At least two simulations are needed to train the q-factor predictor.')
+        feature_names: list[str] = sorted(set.intersection(*(set(s) for s in samples)))
+        predictor = QFactorPredictor(feature_names)
+        predictor.fit(np.array([[s[name] for name in feature_names] for s in samples]), np.array(q_factors))
+        return predictor
+
+    def fit(self, features: np.ndarray, q_factors: np.ndarray) -> None:
+        """
+        Fit the predictor.
+
+        Args:
+            - features: the features of the models, one row per model.
+            - q_factors: the q-factors of the models.
+        """
+        self._means = features.mean(axis=0)
+        # the q-factor spans orders of magnitude, it is regressed in log space
+        self._regressor.fit(features, np.log(q_factors))
+
+    def predict(self, trackers: list[ModelTracker]) -> list[tuple[float, float]]:
+        """
+        Predict the q-factor of the models.
+        Missing features are replaced by their mean in the training set.
+
+        Args:
+            - trackers: the model trackers, with their validation losses.
+
+        Returns:
+            list[tuple[float, float]]: the predicted log q-factor and its standard deviation for each model.
+        """
+        rows: list[list[float]] = []
+        for tracker in trackers:
+            if tracker.valid_losses is None:
+                raise ValueError('valid loss not calculated.')
+            features = get_features(tracker.valid_losses.energy, tracker.valid_losses.force, tracker.params)
+            rows.append([features.get(name, self._means[i]) for i, name in enumerate(self._feature_names)])
+        means, stds = self._regressor.predict(np.array(rows), return_std=True)
+        return [(float(mean), float(std)) for mean, std in zip(means, stds)]
+
+    def save(self, out_path: Path) -> None:
+        """
+        Save the predictor to a file.
+        """
+        with out_path.open('wb') as file:
+            pickle.dump(self, file)
+
+    @staticmethod
+    def load(path: Path) -> 'QFactorPredictor':
+        """
+        Load a predictor from a file.
+        """
+        with path.open('rb') as file:
+            return pickle.load(file)
@@ -0,0 +1,52 @@
+"""
+Fits of the strong and weak scaling curves of the inference benchmark.
+"""
+
+import numpy as np
+
+def fit_strong_scaling(layouts: list[str], cores: np.ndarray,
+                       times: np.ndarray) -> dict[str, float | dict[str, float]]:
+    """
+    Fit Amdahl's law, t(p) = a + b / p, to the time per step of a fixed system size.
+
+    Args:
+        - layouts: the layout of each run, as 'NxT' for N MPI tasks and T threads.
+        - cores: the number of cores (MPI tasks times threads) of each run.
+        - times: the time per step of each run.
+
+    Returns:
+        dict: the serial fraction a / (a + b) and the parallel efficiency of each layout,
+        relative to the smallest core count.
+    """
+    a, b = np.linalg.lstsq(np.stack([np.ones_like(cores), 1 / cores], axis=1), times, rcond=None)[0]
+    ref: int = int(np.argmin(cores))
+    efficiency: dict[str, float] = {layout: float(times[ref] * cores[ref] / (t * p))
+                                    for layout, p, t in zip(layouts, cores, times)}
+    return {
+        'serial_fraction': float(np.clip(a / (a + b), 0, 1)) if a + b > 0 else float('nan'),
+        'efficiency': efficiency,
+    }
+
+def fit_weak_scaling(layouts: list[str], cores: np.ndarray,
+                     times: np.ndarray) -> dict[str, float | dict[str, float]]:
+    """
+    Fit t(p) = a + b * log2(p / p0) to the time per step of a fixed number of atoms per core,
+    the logarithmic term accounts for the growing communication cost.
+
+    Args:
+        - layouts: the layout of each run, as 'NxT' for N MPI tasks and T threads.
+        - cores: the number of cores (MPI tasks times threads) of each run.
+        - times: the time per step of each run.
+
+    Returns:
+        dict: the relative slope b / a, the increase of the time per step for each doubling of the cores,
+        and the parallel efficiency of each layout, relative to the smallest core count.
+    """
+    ref: int = int(np.argmin(cores))
+    log_cores: np.ndarray = np.log2(cores / cores[ref])
+    a, b = np.linalg.lstsq(np.stack([np.ones_like(cores), log_cores], axis=1), times, rcond=None)[0]
+    efficiency: dict[str, float] = {layout: float(times[ref] / t) for layout, t in zip(layouts, times)}
+    return {
+        'doubling_slope': float(b / a) if a > 0 else float('nan'),
+        'efficiency': efficiency,
+    }
@@ -0,0 +1,27 @@
+"""
+Statistics of the repeated benchmark measurements.
+"""
+
+import numpy as np
+
+def bootstrap_ci(values: np.ndarray, confidence: float = 0.95,
+                 n_resamples: int = 10000, seed: int = 0) -> tuple[float, float]:
+    """
+    Percentile bootstrap confidence interval of the mean.
+
+    Args:
+        - values: the measured values.
+        - confidence: the confidence level of the interval.
+        - n_resamples: the number of bootstrap resamples.
+        - seed: the seed of the random generator, for reproducible intervals.
+
+    Returns:
+        tuple[float, float]: the lower and upper bounds of the interval.
+    """
+    if len(values) < 2:
+        # a single measurement gives no information on the noise
+        return float(values.mean()), float(values.mean())
+    rng = np.random.default_rng(seed)
+    means: np.ndarray = rng.choice(values, size=(n_resamples, len(values)), replace=True).mean(axis=1)
+    alpha: float = (1 - confidence) / 2
+    return float(np.quantile(means, alpha)), float(np.quantile(means, 1 - alpha))
@@ -5,11 +5,15 @@ Models.
 from .model import (
     PotModel,
     Losses,
+    StructureErrors,
+    ERROR_COLUMNS,
     YACE_NAME,
     POTENTIAL_NAME,
     CONFIG_NAME,
     POTENTIAL_TEMPLATE_PATH,
+    LAMMPS_FLAGS_PREFIX,
     gen_from_template,
     )
 from .pace import PotPACE
-from .model_factory import create_model, get_fit_cmd, get_lammps_params
+from .model_factory import create_model, get_model_class, get_fit_cmd, get_lammps_params
+from .calc_bench import bench_calculator, CALC_BENCH_FILE_NAME, CALC_BENCH_FIELDS
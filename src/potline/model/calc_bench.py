@@ -0,0 +1,75 @@
+"""
+Inference benchmark of the models through their ASE calculator, without LAMMPS.
+"""
+
+from time import perf_counter
+
+import numpy as np
+from ase import Atoms
+from ase.build import bulk
+
+from .model import PotModel
+
+CALC_BENCH_FILE_NAME: str = 'calc_bench.csv'
+CALC_BENCH_FIELDS: list[str] = ['atoms', 'load_s', 'first_eval_s', 'step_s', 'us_per_atom_step']
+# same lattice as the LAMMPS inference benchmark
+BENCH_ELEMENT: str = 'Fe'
+BENCH_LATTICE_CONSTANT: float = 2.830
+RATTLE_STDEV: float = 0.01
+
+def bench_calculator(model: PotModel, sizes: list[int], steps: int, warmups: int,
+                     seed: int = 0) -> list[dict[str, float]]:
+    """
+    Time the energy and forces evaluation of a model through its ASE calculator.
+    The setup cost is reported separately from the cost per step:
+    the loading of the model, and the first evaluation of each size, which includes
+    the tracing or compilation of the models that specialise on the number of atoms.
+    A step evaluates a structure with new rattled positions,
+    so that the calculator never returns cached results.
+
+    Args:
+        - model: the model to benchmark.
+        - sizes: the number of cubic bcc cells along each direction, 2 atoms per cell.
+        - steps: the number of timed steps of each size.
+        - warmups: the number of untimed steps before the timed ones.
+        - seed: the seed of the rattled positions.
+
+    Returns:
+        list[dict[str, float]]: the timings of each size, with the CALC_BENCH_FIELDS keys.
+    """
+    rng = np.random.default_rng(seed)
+    start: float = perf_counter()
+    calculator = model.get_calculator()
+    load_time: float = perf_counter() - start
+
+    rows: list[dict[str, float]] = []
+    for size in sizes:
+        atoms: Atoms = bulk(BENCH_ELEMENT, 'bcc', a=BENCH_LATTICE_CONSTANT, cubic=True).repeat(size)
+        atoms.calc = calculator
+        # positions drawn in advance, out of the timed loop
+        positions: np.ndarray = atoms.positions + rng.normal(
+            0, RATTLE_STDEV, (warmups + steps, len(atoms), 3))
+
+        start = perf_counter()
+        atoms.get_potential_energy()
+        atoms.get_forces()
+        first_time: float = perf_counter() - start
+
+        step_times: list[float] = []
+        for step in range(warmups + steps):
+            start = perf_counter()
+            atoms.set_positions(positions[step])
+            atoms.get_potential_energy()
+            atoms.get_forces()
+            if step >= warmups:
+                step_times.append(perf_counter() - start)
+
+        step_time: float = float(np.mean(step_times))
+        rows.append({
+            'atoms': len(atoms),
+            'load_s': load_time,
+            'first_eval_s': first_time,
+            'step_s': step_time,
+            'us_per_atom_step': step_time / len(atoms) * 1e6,
+        })
+    return rows
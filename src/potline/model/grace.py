@@ -4,16 +4,31 @@ Gracemaker wrapper.
 
 from __future__ import annotations
 
+import copy
 import subprocess
 from pathlib import Path
-import shutil
 
 import yaml
+import pandas as pd
+from ase.calculators.calculator import Calculator
 
 from .model import PotModel, POTENTIAL_TEMPLATE_PATH, CONFIG_NAME, Losses, gen_from_template
 from ..dispatcher import SupportedModel
+from ..file_linker import LinkMode, link_tree
+from ..dataset_io import read_dataset, write_dataset, get_data_train_size
 
 LAST_POTENTIAL_NAME: str = 'output_potential.yaml'
+RESTART_IGNORED_NAMES: list[str] = ['saved_model', 'final_model', 'FS_model.yaml']
+EPOCH_CHECKPOINT_PREFIX: str = 'checkpoint.epoch_'
+# split datasets, saved without compression
+TRAIN_DATA_NAME: str = 'train_data.pckl'
+TEST_DATA_NAME: str = 'test_data.pckl'
+# padding of the neighbour lists of the full models, to limit the recompilations
+GRACE_PADDINGS: list[str] = [
+    'pad_verbose',
+    'pad_neighbors_fraction 0.05 pad_atoms_number 10',
+    'pad_neighbors_fraction 0.2 pad_atoms_number 50',
+]
 
 class PotGRACE(PotModel):
     """
@@ -85,19 +100,113 @@ class PotGRACE(PotModel):
         with self._config_filepath.open('w', encoding='utf-8') as file:
             yaml.safe_dump(config, file)
 
+    def get_pair_variants(self, coeff_path: str) -> list[tuple[str, str]]:
+        variants: list[tuple[str, str]] = []
+        full_path: str = coeff_path
+        if not self._pretrained and self._preset == 'FS':
+            # the FS models can also be evaluated as a full model
+            variants.append(('grace/fs', coeff_path))
+            full_path = str(self._seed_path / 'final_model')
+        variants += [(f'grace {padding}', full_path) for padding in GRACE_PADDINGS]
+        return variants
+
+    @staticmethod
+    def get_data_params(config: dict) -> dict:
+        return {'seed': config.get('seed'), 'data': config.get('data')}
+
+    @staticmethod
+    def prepare_data(config: dict, prep_path: Path) -> None:
+        # the graphs are built by gracemaker at every start,
+        # the dataset is only decompressed and split once
+        data: dict = config['data']
+        dataset: pd.DataFrame = read_dataset(data['filename'])
+        # an explicit test set is used as is
+        test_size: float = 0 if 'test_filename' in data else float(data.get('test_size', 0))
+        test_set: pd.DataFrame = dataset.sample(frac=test_size, random_state=config.get('seed'))
+        write_dataset(dataset.drop(test_set.index), prep_path / TRAIN_DATA_NAME)
+        if len(test_set) > 0:
+            write_dataset(test_set, prep_path / TEST_DATA_NAME)
+
+    @staticmethod
+    def use_prepared_data(config: dict, prep_path: Path) -> dict:
+        config = copy.deepcopy(config)
+        config['data']['filename'] = str(prep_path / TRAIN_DATA_NAME)
+        if (prep_path / TEST_DATA_NAME).exists():
+            config['data'].pop('test_size', None)
+            config['data']['test_filename'] = str(prep_path / TEST_DATA_NAME)
+        return config
+
+    def get_calculator(self) -> Calculator:
+        if not self._pretrained and self._preset == 'FS' and self._yace_path.exists():
+            from pyace import PyGRACEFSCalculator # type: ignore
+            return PyGRACEFSCalculator(str(self._yace_path))
+        from tensorpotential.calculator import TPCalculator # type: ignore
+        model_path: Path = self._yace_path
+        if not self._pretrained and not model_path.exists():
+            # the model exported at the end of the training, before the conversion
+            model_path = self._seed_path / 'final_model'
+        return TPCalculator(str(model_path))
+
     @staticmethod
     def get_lammps_params() -> str:
         return ''
 
+    @staticmethod
+    def get_first_step_pattern() -> str:
+        # gracemaker prints the progress of every epoch
+        return r'(?i)epoch\s*#?\s*\d+'
+
+    @staticmethod
+    def get_epoch_pattern() -> str:
+        return r'(?i)epoch\s*#?\s*(\d+)'
+
+    @staticmethod
+    def get_runtime_knobs(config: dict, cpus: int) -> dict[str, list]:
+        batch_size: int = int(config.get('fit', {}).get('batch_size', 32))
+        return {
+            'fit.batch_size': [batch_size, batch_size * 2],
+            'TF_NUM_INTRAOP_THREADS': [cpus, max(1, cpus // 2)],
+            'TF_NUM_INTEROP_THREADS': [2, 1],
+        }
+
+    @staticmethod
+    def get_cpu_settings() -> dict:
+        # TensorFlow falls back to the CPU when the GPUs are hidden
+        return {}
+
+    @staticmethod
+    def get_train_size(config: dict) -> int:
+        return get_data_train_size(config['data'])
+
+    def get_config_maxiter(self) -> int:
+        if self._pretrained:
+            raise NotImplementedError('Pretrained model does not support maxiter setting.')
+        return int(self.get_params()['fit']['maxiter'])
+
+    @staticmethod
+    def get_distributed_fit_cmd(deep: bool = False) -> str:
+        # a single process replicates the model on every visible GPU
+        return ' '.join(['gracemaker', CONFIG_NAME, '-m'] + (['-r'] if deep else []))
+
+    @staticmethod
+    def get_distributed_config(config: dict, world_size: int) -> dict:
+        if world_size > 1:
+            raise ValueError('gracemaker trains on the GPUs of a single process, set ntasks to 1.')
+        return config
+
     def get_name(self) -> SupportedModel:
         return SupportedModel.GRACE
 
-    def switch_out_path(self, out_path: Path):
+    def switch_out_path(self, out_path: Path, link_mode: str = LinkMode.COPY.value):
         if self._pretrained:
             raise NotImplementedError('Pretrained model does not support out path switching.')
 
-        shutil.copytree(self._out_path, out_path, dirs_exist_ok=True)
-        super().switch_out_path(out_path)
+        # the seed directory holds the checkpoints used by the restart,
+        # the exported models and the per-epoch checkpoints are not needed
+        link_tree(self._seed_path, out_path / 'seed' / f'{self._seed_number}', link_mode, mutable=True,
+                  ignore=lambda path: path.name in RESTART_IGNORED_NAMES
+                  or path.name.startswith(EPOCH_CHECKPOINT_PREFIX))
+        super().switch_out_path(out_path, link_mode)
         self._seed_path = self._out_path / 'seed' / f'{self._seed_number}'
         if self._preset == 'FS':
             self._yace_path = self._seed_path / 'FS_model.yaml'
@@ -4,18 +4,29 @@ Pacemaker wrapper for fitting ACE potentials using XPOT in HPC.
 
 from __future__ import annotations
 
+import re
 import sys
-import shutil
+import copy
 import json
+import subprocess
 from pathlib import Path
 
 import yaml
+import ase.io
+from ase.calculators.calculator import Calculator
+from mace.calculators import MACECalculator
 from mace.cli.create_lammps_model import main as create_lammps_model
 
 from .model import PotModel, POTENTIAL_TEMPLATE_PATH, CONFIG_NAME, Losses, gen_from_template
 from ..dispatcher import SupportedModel
+from ..file_linker import LinkMode, link_file
 
 LAST_POTENTIAL_NAME: str = 'output_potential.yaml'
+CHECKPOINT_EPOCH_PATTERN: re.Pattern = re.compile(r'_epoch-(\d+)(_swa)?\.pt$')
+# training options used by the preprocessing, passed to mace_prepro_train when set
+PREPRO_KEYS: list[str] = ['train_file', 'valid_file', 'valid_fraction', 'test_file', 'r_max', 'seed',
+                          'energy_key', 'forces_key', 'stress_key', 'E0s', 'atomic_numbers']
+STATISTICS_NAME: str = 'statistics.json'
 
 class PotMACE(PotModel):
     """
@@ -58,16 +69,7 @@ class PotMACE(PotModel):
         return Losses(rmse_e, rmse_f)
 
     def lampify(self) -> Path:
-        # if the model is trained with swa, names are different
-        if (self._out_path / (self._model_name + '_stagetwo.model')).exists():
-            model_filepath: Path = self._out_path / (self._model_name + '_stagetwo.model')
-            self._yace_path = self._out_path / f'{self._model_name}_stagetwo.model-lammps.pt'
-        elif self._pretrained:
-            model_filepath = self._out_path / self._model_name
-            self._yace_path = self._out_path / f'{self._model_name}.model-lammps.pt'
-        else:
-            model_filepath = self._out_path / (self._model_name + '.model')
-            self._yace_path = self._out_path / f'{self._model_name}.model-lammps.pt'
+        model_filepath, self._yace_path = self._get_model_paths()
 
         old_argv = sys.argv
         sys.argv = ["program", str(model_filepath)]
@@ -96,16 +98,135 @@ class PotMACE(PotModel):
         with self._config_filepath.open('w', encoding='utf-8') as file:
             yaml.safe_dump(config, file)
 
+    def get_pair_variants(self, coeff_path: str) -> list[tuple[str, str]]:
+        return [('mace no_domain_decomposition', coeff_path), ('mace', coeff_path)]
+
+    @staticmethod
+    def get_data_params(config: dict) -> dict:
+        return {key: config[key] for key in PREPRO_KEYS if key in config}
+
+    @staticmethod
+    def prepare_data(config: dict, prep_path: Path) -> None:
+        # the graphs and the statistics are saved to HDF5 files, in train, val and test folders
+        cmd: list[str] = ['mace_prepro_train', f'--h5_prefix={prep_path}/', '--compute_statistics']
+        cmd += [f'--{key}={config[key]}' for key in PREPRO_KEYS if key in config]
+        subprocess.run(cmd, check=True, cwd=prep_path)
+
+    @staticmethod
+    def use_prepared_data(config: dict, prep_path: Path) -> dict:
+        config = copy.deepcopy(config)
+        config.pop('valid_fraction', None)
+        config['train_file'] = str(prep_path / 'train')
+        config['valid_file'] = str(prep_path / 'val')
+        if (prep_path / 'test').exists():
+            config['test_file'] = str(prep_path / 'test')
+        config['statistics_file'] = str(prep_path / STATISTICS_NAME)
+        return config
+
+    def get_calculator(self) -> Calculator:
+        return MACECalculator(model_paths=str(self._get_model_paths()[0]), device='cpu',
+                              default_dtype='float64')
+
     @staticmethod
     def get_lammps_params() -> str:
         return ''
 
+    @staticmethod
+    def get_first_step_pattern() -> str:
+        # first validation of MACE, before the first epoch, as 'Initial: ...' or 'Epoch None: ...'
+        return r'(Initial|Epoch \S+):'
+
+    @staticmethod
+    def get_epoch_pattern() -> str:
+        # validation after each epoch, numbered from 0, the default evaluation interval being one epoch
+        return r'Epoch (\d+):'
+
+    @staticmethod
+    def get_runtime_knobs(config: dict, cpus: int) -> dict[str, list]:
+        batch_size: int = int(config.get('batch_size', 10))
+        pin_memory: bool = bool(config.get('pin_memory', True))
+        return {
+            'num_workers': [int(config.get('num_workers', 0)), min(4, cpus), cpus],
+            'pin_memory': [pin_memory, not pin_memory],
+            'batch_size': [batch_size, batch_size * 2],
+        }
+
+    @staticmethod
+    def get_cpu_settings() -> dict:
+        return {'device': 'cpu'}
+
+    @staticmethod
+    def get_train_size(config: dict) -> int:
+        if Path(config['train_file']).suffix not in ['.xyz', '.extxyz']:
+            raise ValueError(f'Cannot count the structures of {config["train_file"]}, use an xyz file.')
+        size: int = sum(1 for _ in ase.io.iread(config['train_file'], index=':'))
+        # an explicit validation set is read from another file
+        if 'valid_file' in config:
+            return size
+        return round(size * (1 - float(config.get('valid_fraction', 0.1))))
+
+    def get_config_maxiter(self) -> int:
+        if self._pretrained:
+            raise NotImplementedError('Pretrained model does not support maxiter setting.')
+        return int(self.get_params()['max_num_epochs'])
+
+    @staticmethod
+    def get_distributed_fit_cmd(deep: bool = False) -> str:
+        # the ranks read the torch.distributed variables of the launch
+        return ' '.join(['mace_run_train', f'--config {CONFIG_NAME}', '--distributed',
+                         '--launcher torchrun'] + (['--restart_latest'] if deep else []))
+
+    @staticmethod
+    def get_distributed_config(config: dict, world_size: int) -> dict:
+        # the batch sizes are per rank
+        config = copy.deepcopy(config)
+        for key in ['batch_size', 'valid_batch_size']:
+            config[key] = max(1, int(config.get(key, 10)) // world_size)
+        return config
+
     def get_name(self) -> SupportedModel:
         return SupportedModel.MACE
 
-    def switch_out_path(self, out_path: Path):
+    def switch_out_path(self, out_path: Path, link_mode: str = LinkMode.COPY.value):
         if self._pretrained:
             raise NotImplementedError('Pretrained model does not support switching output path.')
 
-        shutil.copytree(self._out_path / 'checkpoints', out_path / 'checkpoints', dirs_exist_ok=True)
-        super().switch_out_path(out_path)
+        # only the latest checkpoint (and the latest SWA one) is needed to resume
+        (out_path / 'checkpoints').mkdir(parents=True, exist_ok=True)
+        for checkpoint in self._get_latest_checkpoints():
+            link_file(checkpoint, out_path / 'checkpoints' / checkpoint.name, link_mode, mutable=True)
+        super().switch_out_path(out_path, link_mode)
+
+    def _get_model_paths(self) -> tuple[Path, Path]:
+        """
+        Get the paths to the trained model and to its LAMMPS conversion.
+
+        Returns:
+            tuple[Path, Path]: the path to the trained model and to the converted model.
+        """
+        # if the model is trained with swa, names are different
+        if (self._out_path / (self._model_name + '_stagetwo.model')).exists():
+            return (self._out_path / (self._model_name + '_stagetwo.model'),
+                    self._out_path / f'{self._model_name}_stagetwo.model-lammps.pt')
+        if self._pretrained:
+            return (self._out_path / self._model_name,
+                    self._out_path / f'{self._model_name}.model-lammps.pt')
+        return (self._out_path / (self._model_name + '.model'),
+                self._out_path / f'{self._model_name}.model-lammps.pt')
+
+    def _get_latest_checkpoints(self) -> list[Path]:
+        """
+        Get the latest checkpoint files, one for the regular and one for the SWA checkpoints.
+
+        Returns:
+            list[Path]: the latest checkpoint files.
+        """
+        latest: dict[bool, tuple[int, Path]] = {}
+        for checkpoint in (self._out_path / 'checkpoints').glob('*.pt'):
+            match = CHECKPOINT_EPOCH_PATTERN.search(checkpoint.name)
+            if match is None:
+                continue
+            epoch, swa = int(match.group(1)), match.group(2) is not None
+            if swa not in latest or epoch > latest[swa][0]:
+                latest[swa] = (epoch, checkpoint)
+        return [checkpoint for _, checkpoint in latest.values()]
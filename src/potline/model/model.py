@@ -5,21 +5,30 @@ Base class for MLPs in XPOT using HPC.
 from __future__ import annotations
 
 import math
-import shutil
 from pathlib import Path
 from abc import ABC, abstractmethod
 from string import Template
 
 import yaml
 import numpy as np
+from ase.calculators.calculator import Calculator
 
 from ..config_reader import ConfigReader
 from ..dispatcher import DispatcherManager, JobType
+from ..file_linker import LinkMode, link_file
 
 YACE_NAME: str = 'model.yace'
 POTENTIAL_NAME: str = 'potential.in'
 CONFIG_NAME: str = "optimized_params.yaml"
 POTENTIAL_TEMPLATE_PATH: Path = Path(__file__).parent / 'template' / POTENTIAL_NAME
+# tuned LAMMPS command line flags are stored in the potential file as a comment
+LAMMPS_FLAGS_PREFIX: str = '# lammps_flags: '
+# shell expansion reading the flags from the potential file of the working directory,
+# escaped to be expanded by the eval running LAMMPS in the experiment scripts
+LAMMPS_FLAGS_CMD: str = f"\\$(sed -n 's/^{LAMMPS_FLAGS_PREFIX}//p' ./{POTENTIAL_NAME})"
+# per-structure columns of the errors, energies in eV/atom and forces in eV/A
+ERROR_COLUMNS: list[str] = ['structure', 'n_atoms', 'config_type', 'energy_ref', 'energy_pred',
+                            'energy_error', 'force_rmse', 'force_mae', 'force_max']
 
 class Losses():
     """
@@ -33,20 +42,101 @@ class Losses():
         self.energy: float = energy if not math.isnan(energy) else float(np.finfo(np.float32).max)
         self.force: float = force if not math.isnan(force) else float(np.finfo(np.float32).max)
 
-class RawLosses():
+class StructureErrors():
     """
-    Raw losses class for the model.
+    Per-structure errors of a model on a dataset, the representation shared by the model families.
+    Every column is a numpy array with one value per structure, energies in eV/atom
+    and forces in eV/A, and the norm of the force error of every atom is kept in a single array,
+    the atoms of structure i following the atoms of the structures before it.
 
     Args:
-        - energies: list of energy losses
-        - forces: list of force losses
-        - atom_counts: list of atom counts
+        - columns: the per-structure columns, with the ERROR_COLUMNS keys.
+        - atom_force_error: the norm of the force error of every atom.
     """
-    def __init__(self, energies: list[float], forces: list[float],
-                 atom_counts: list[float]):
-        self.energies: list[float] = energies
-        self.forces: list[float] = forces
-        self.atom_counts: list[float] = atom_counts
+    def __init__(self, columns: dict[str, np.ndarray], atom_force_error: np.ndarray):
+        self.columns: dict[str, np.ndarray] = columns
+        self.atom_force_error: np.ndarray = atom_force_error
+
+    def __len__(self) -> int:
+        return len(self.columns['n_atoms'])
+
+    @staticmethod
+    def from_predictions(n_atoms: np.ndarray, energy_ref: np.ndarray, energy_pred: np.ndarray,
+                         force_diff: np.ndarray, config_types: np.ndarray | None = None,
+                         first_index: int = 0) -> StructureErrors:
+        """
+        Reduce the predictions of a model to per-structure errors, for all the structures at once.
+
+        Args:
+            - n_atoms: the number of atoms of each structure.
+            - energy_ref: the reference energy per atom of each structure.
+            - energy_pred: the predicted energy per atom of each structure.
+            - force_diff: the difference between the predicted and the reference forces of every atom.
+            - config_types: the configuration type of each structure.
+            - first_index: the index of the first structure in the dataset.
+
+        Returns:
+            StructureErrors: the per-structure errors.
+        """
+        starts: np.ndarray = np.concatenate([[0], np.cumsum(n_atoms)[:-1]])
+        abs_diff: np.ndarray = np.abs(force_diff)
+        components: np.ndarray = 3 * n_atoms
+        columns: dict[str, np.ndarray] = {
+            'structure': np.arange(first_index, first_index + len(n_atoms)),
+            'n_atoms': n_atoms,
+            'config_type': np.array(config_types if config_types is not None else [''] * len(n_atoms),
+                                    dtype=str),
+            'energy_ref': energy_ref,
+            'energy_pred': energy_pred,
+            'energy_error': energy_pred - energy_ref,
+            'force_rmse': np.sqrt(np.add.reduceat((force_diff ** 2).sum(axis=1), starts) / components),
+            'force_mae': np.add.reduceat(abs_diff.sum(axis=1), starts) / components,
+            'force_max': np.maximum.reduceat(abs_diff.max(axis=1), starts),
+        }
+        return StructureErrors(columns, np.linalg.norm(force_diff, axis=1).astype(np.float32))
+
+    @staticmethod
+    def concatenate(parts: list[StructureErrors]) -> StructureErrors:
+        """
+        Concatenate the errors of consecutive parts of a dataset.
+        """
+        return StructureErrors({key: np.concatenate([part.columns[key] for part in parts])
+                                for key in ERROR_COLUMNS},
+                               np.concatenate([part.atom_force_error for part in parts]))
+
+    def summarize(self) -> dict[str, float]:
+        """
+        Reduce the errors to the metrics of the dataset,
+        in the units of the pacemaker metrics: eV/atom and eV/A per force component.
+
+        Returns:
+            dict[str, float]: the metrics of the dataset.
+        """
+        components: np.ndarray = 3 * self.columns['n_atoms']
+        return {
+            'structures': len(self),
+            'rmse_epa': float(np.sqrt(np.mean(self.columns['energy_error'] ** 2))),
+            'mae_epa': float(np.mean(np.abs(self.columns['energy_error']))),
+            'rmse_f_comp': float(np.sqrt((self.columns['force_rmse'] ** 2 * components).sum()
+                                         / components.sum())),
+            'mae_f_comp': float((self.columns['force_mae'] * components).sum() / components.sum()),
+            'max_f': float(self.columns['force_max'].max()),
+        }
+
+    def save(self, out_path: Path) -> None:
+        """
+        Write the errors to a npz file, one array per column.
+        """
+        arrays: dict[str, np.ndarray] = {'atom_force_error': self.atom_force_error, **self.columns}
+        np.savez(out_path, **arrays)
+
+    @staticmethod
+    def load(errors_path: Path) -> StructureErrors:
+        """
+        Read the errors written by save.
+        """
+        with np.load(errors_path) as data:
+            return StructureErrors({key: data[key] for key in ERROR_COLUMNS}, data['atom_force_error'])
 
 def gen_from_template(template_path: Path, values: dict[str, str | int | float | Path], out_filepath: Path):
     """
@@ -92,6 +182,16 @@ class PotModel(ABC):
             Losses: the losses from the fitting process.
         """
 
+    def collect_raw_errors(self) -> StructureErrors:
+        """
+        Collect the per-structure errors on the test set from the files written by the trainer.
+
+        Returns:
+            StructureErrors: the per-structure errors.
+        """
+        raise NotImplementedError(f'{type(self).__name__} does not write per-structure predictions, '
+                                  'use the evaluation on a common test set.')
+
     @abstractmethod
     def lampify(self) -> Path:
         """
@@ -130,6 +230,165 @@ class PotModel(ABC):
             str: the model specific LAMMPS parameters.
         """
 
+    @staticmethod
+    @abstractmethod
+    def get_first_step_pattern() -> str:
+        """
+        Get the regular expression of the first progress line printed by the trainer,
+        used to time the first training step.
+
+        Returns:
+            str: the regular expression.
+        """
+
+    @staticmethod
+    @abstractmethod
+    def get_epoch_pattern() -> str:
+        """
+        Get the regular expression of the progress lines printed by the trainer for each iteration, or epoch,
+        with the iteration number as its group, used to count the iterations trained by a timed run.
+
+        Returns:
+            str: the regular expression.
+        """
+
+    @abstractmethod
+    def get_pair_variants(self, coeff_path: str) -> list[tuple[str, str]]:
+        """
+        Get the pair styles worth benchmarking for the model, for the LAMMPS tuning.
+
+        Args:
+            - coeff_path: the model file used in the current potential file.
+
+        Returns:
+            list[tuple[str, str]]: the pair styles and the model files they use.
+        """
+
+    @staticmethod
+    @abstractmethod
+    def get_data_params(config: dict) -> dict:
+        """
+        Get the parameters of a training configuration that determine the preprocessed dataset,
+        such as the dataset files, the cutoff and the split.
+
+        Args:
+            - config: the training configuration.
+
+        Returns:
+            dict: the parameters determining the preprocessed dataset.
+        """
+
+    @staticmethod
+    @abstractmethod
+    def prepare_data(config: dict, prep_path: Path) -> None:
+        """
+        Preprocess the dataset of a training configuration into the native cached format of the trainer.
+
+        Args:
+            - config: the training configuration.
+            - prep_path: the directory where the preprocessed dataset is written.
+        """
+
+    @staticmethod
+    @abstractmethod
+    def use_prepared_data(config: dict, prep_path: Path) -> dict:
+        """
+        Point a training configuration at a preprocessed dataset.
+
+        Args:
+            - config: the training configuration, it is not modified.
+            - prep_path: the directory of the preprocessed dataset.
+
+        Returns:
+            dict: the training configuration using the preprocessed dataset.
+        """
+
+    @staticmethod
+    @abstractmethod
+    def get_runtime_knobs(config: dict, cpus: int) -> dict[str, list]:
+        """
+        Get the runtime settings of the trainer worth tuning for the training throughput,
+        which do not change the model, with the values to try, the first one being the baseline.
+        The settings are dotted paths in the training configuration,
+        or environment variables when written in upper case.
+
+        Args:
+            - config: the training configuration.
+            - cpus: the number of CPUs of the training jobs.
+
+        Returns:
+            dict[str, list]: the values to try for each setting.
+        """
+
+    @staticmethod
+    @abstractmethod
+    def get_cpu_settings() -> dict:
+        """
+        Get the settings of the training configuration for training on the CPU only.
+
+        Returns:
+            dict: the values of the dotted paths of the training configuration.
+        """
+
+    @staticmethod
+    @abstractmethod
+    def get_train_size(config: dict) -> int:
+        """
+        Get the number of training structures of a training configuration, without the held-out ones.
+
+        Args:
+            - config: the training configuration.
+
+        Returns:
+            int: the number of training structures.
+        """
+
+    @abstractmethod
+    def get_config_maxiter(self) -> int:
+        """
+        Get the maximum number of iterations, or epochs, of the training configuration.
+
+        Returns:
+            int: the maximum number of iterations.
+        """
+
+    @staticmethod
+    def get_distributed_fit_cmd(deep: bool = False) -> str:
+        """
+        Get the command of the data-parallel training, run by every rank of the launch.
+
+        Args:
+            - deep: flag for deep training.
+
+        Returns:
+            str: the command of every rank.
+        """
+        raise NotImplementedError('The trainer of the model does not support data-parallel training.')
+
+    @staticmethod
+    def get_distributed_config(config: dict, world_size: int) -> dict:
+        """
+        Get the training configuration of a data-parallel training over several ranks,
+        with the same global batch as the training on a single rank.
+
+        Args:
+            - config: the training configuration, it is not modified.
+            - world_size: the number of ranks.
+
+        Returns:
+            dict: the training configuration of every rank.
+        """
+        raise NotImplementedError('The trainer of the model does not support data-parallel training.')
+
+    @abstractmethod
+    def get_calculator(self) -> Calculator:
+        """
+        Load the trained model as an ASE calculator, on the CPU.
+
+        Returns:
+            Calculator: the ASE calculator of the model.
+        """
+
     def get_out_path(self) -> Path:
         """
         Get the output path of the model.
@@ -139,14 +398,16 @@ class PotModel(ABC):
         """
         return self._out_path
 
-    def switch_out_path(self, out_path: Path):
+    def switch_out_path(self, out_path: Path, link_mode: str = LinkMode.COPY.value):
         """
         Switch the output path of the model.
+        Only the files needed to resume the training are placed in the new path.
 
         Args:
             - out_path: the new output path.
+            - link_mode: how the files needed to resume the training are placed in the new path.
         """
-        shutil.copy(self._config_filepath, out_path)
+        link_file(self._config_filepath, out_path / self._config_filepath.name, link_mode, mutable=True)
         self._out_path = out_path
         self._config_filepath = self._out_path / self._config_filepath.name
         self._yace_path = self._out_path / YACE_NAME
@@ -3,8 +3,10 @@ XpotModel interface and factory function.
 """
 
 from pathlib import Path
-from .model import PotModel
+from .model import PotModel, LAMMPS_FLAGS_CMD
 from ..dispatcher.slurm_preset import SupportedModel
+from ..dispatcher.dispatcher_manager import (FIRST_STEP_SCRIPT_PATH, DISTRIBUTED_SCRIPT_PATH,
+                                             DIST_CHECK_SCRIPT_PATH)
 
 def create_model(model_name: str, out_path: Path, pretrained: bool = False) -> PotModel:
     """
@@ -28,41 +30,68 @@ def create_model(model_name: str, out_path: Path, pretrained: bool = False) -> P
 
     raise ValueError(f"Unsupported model: {model_name}")
 
-def get_fit_cmd(model_name: str, deep: bool) -> str:
+def get_model_class(model_name: str) -> type[PotModel]:
     """
-    Get the fitting command for a model
+    Get the class of a model, for its static methods.
 
     Args:
         - model_name: name of the model
-        - deep: flag for deep training
     """
     if model_name == SupportedModel.PACE.value:
         from .pace import PotPACE
-        return PotPACE.get_fit_cmd(deep)
+        return PotPACE
     if model_name == SupportedModel.MACE.value:
         from .mace import PotMACE
-        return PotMACE.get_fit_cmd(deep)
+        return PotMACE
     if model_name == SupportedModel.GRACE.value:
         from .grace import PotGRACE
-        return PotGRACE.get_fit_cmd(deep)
+        return PotGRACE
 
     raise ValueError(f"Unsupported model: {model_name}")
 
+def get_fit_cmd(model_name: str, deep: bool, compile_cache_path: Path | None = None,
+                timed: bool = False, distributed: bool = False) -> str:
+    """
+    Get the fitting command for a model.
+    With a compile cache, or when timed, the command is timed to its first training step.
+    A data-parallel command is run by every rank of the launch settings of its directory,
+    after a check of the communication between the ranks.
+
+    Args:
+        - model_name: name of the model
+        - deep: flag for deep training
+        - compile_cache_path: path to the compile cache of the sweep
+        - timed: flag for timing the command without a compile cache
+        - distributed: flag for data-parallel training
+    """
+    model_class = get_model_class(model_name)
+    fit_cmd: str = model_class.get_fit_cmd(deep) if not distributed \
+        else f'bash {DISTRIBUTED_SCRIPT_PATH} {model_class.get_distributed_fit_cmd(deep)}'
+    if compile_cache_path is not None or timed:
+        cache_opt: str = f' --cache {compile_cache_path}' if compile_cache_path is not None else ''
+        fit_cmd = f"python {FIRST_STEP_SCRIPT_PATH} --pattern '{model_class.get_first_step_pattern()}'" \
+            f" --epochs '{model_class.get_epoch_pattern()}'{cache_opt} -- {fit_cmd}"
+    if distributed:
+        fit_cmd = f'bash {DISTRIBUTED_SCRIPT_PATH} python {DIST_CHECK_SCRIPT_PATH} && {fit_cmd}'
+    return fit_cmd
+
 def get_lammps_params(model_name: str) -> str:
     """
-    Get the LAMMPS parameters for a model
+    Get the LAMMPS parameters for a model.
+    The parameters include the flags tuned for each potential, read from its potential file
+    when LAMMPS is run, so the result is meant to be used inside a double-quoted command.
 
     Args:
         - model_name: name of the model
     """
     if model_name == SupportedModel.PACE.value:
         from .pace import PotPACE
-        return PotPACE.get_lammps_params()
+        return f'{PotPACE.get_lammps_params()} {LAMMPS_FLAGS_CMD}'
     if model_name == SupportedModel.MACE.value:
         from .mace import PotMACE
-        return PotMACE.get_lammps_params()
+        return f'{PotMACE.get_lammps_params()} {LAMMPS_FLAGS_CMD}'
     if model_name == SupportedModel.GRACE.value:
         from .grace import PotGRACE
-        return PotGRACE.get_lammps_params()
+        return f'{PotGRACE.get_lammps_params()} {LAMMPS_FLAGS_CMD}'
 
     raise ValueError(f"Unsupported model: {model_name}")
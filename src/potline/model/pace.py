@@ -4,17 +4,28 @@ Pacemaker wrapper for fitting ACE potentials using XPOT in HPC.
 
 from __future__ import annotations
 
+import copy
 import subprocess
 from pathlib import Path
-import shutil
 
 import yaml
+import numpy as np
 import pandas as pd
+from ase.calculators.calculator import Calculator
 
-from .model import PotModel, POTENTIAL_TEMPLATE_PATH, CONFIG_NAME, Losses, gen_from_template
+from .model import (PotModel, POTENTIAL_TEMPLATE_PATH, CONFIG_NAME, Losses, StructureErrors,
+                    gen_from_template)
 from ..dispatcher import SupportedModel
+from ..file_linker import LinkMode, link_file
+from ..dataset_io import read_dataset, get_data_train_size
 
 LAST_POTENTIAL_NAME: str = 'output_potential.yaml'
+# datasets with the neighbour lists, saved by the pacemaker dry run
+FITTING_DATA_NAME: str = 'fitting_data_info.pckl.gzip'
+TEST_DATA_NAME: str = 'test_data_info.pckl.gzip'
+TEST_PRED_NAME: str = 'test_pred.pckl.gzip'
+# GPU memory in MB preallocated by TensorFlow when tried against the default on-demand growth
+TUNED_MEM_LIMIT: int = 8000
 
 class PotPACE(PotModel):
     """
@@ -58,24 +69,90 @@ class PotPACE(PotModel):
         with self._config_filepath.open('w', encoding='utf-8') as file:
             yaml.safe_dump(config, file)
 
+    def get_pair_variants(self, coeff_path: str) -> list[tuple[str, str]]:
+        # evaluators of the ACE basis
+        return [('pace recursive', coeff_path), ('pace product', coeff_path)]
+
+    @staticmethod
+    def get_data_params(config: dict) -> dict:
+        return {'cutoff': config.get('cutoff'), 'seed': config.get('seed'), 'data': config.get('data')}
+
+    @staticmethod
+    def prepare_data(config: dict, prep_path: Path) -> None:
+        # the dry run loads the data, builds the neighbour lists and saves the split datasets
+        with (prep_path / CONFIG_NAME).open('w', encoding='utf-8') as file:
+            yaml.safe_dump(config, file)
+        subprocess.run(['pacemaker', CONFIG_NAME, '--dry-run'], check=True, cwd=prep_path)
+
+    @staticmethod
+    def use_prepared_data(config: dict, prep_path: Path) -> dict:
+        config = copy.deepcopy(config)
+        config['data']['filename'] = str(prep_path / FITTING_DATA_NAME)
+        if (prep_path / TEST_DATA_NAME).exists():
+            config['data'].pop('test_size', None)
+            config['data']['test_filename'] = str(prep_path / TEST_DATA_NAME)
+        return config
+
+    def get_calculator(self) -> Calculator:
+        from pyace import PyACECalculator # type: ignore
+        return PyACECalculator(str(self._out_path / LAST_POTENTIAL_NAME))
+
     @staticmethod
     def get_lammps_params() -> str:
         return ''
 
-    def get_name(self) -> SupportedModel:
-        return SupportedModel.PACE
+    @staticmethod
+    def get_first_step_pattern() -> str:
+        # pacemaker prints a line per optimizer iteration, as 'Iteration   #1   (1 evals): Loss ...'
+        return r'Iteration\s+#\d+'
 
-    def switch_out_path(self, out_path: Path):
-        shutil.copy(self._out_path / LAST_POTENTIAL_NAME, out_path / LAST_POTENTIAL_NAME)
-        super().switch_out_path(out_path)
+    @staticmethod
+    def get_epoch_pattern() -> str:
+        return r'Iteration\s+#(\d+)'
+
+    @staticmethod
+    def get_runtime_knobs(config: dict, cpus: int) -> dict[str, list]:
+        # the fit uses the whole dataset at every iteration, the batches only split its evaluation
+        backend: dict = config.get('backend', {})
+        batch_size: int = int(backend.get('batch_size', 100))
+        reduction: bool = bool(backend.get('batch_size_reduction', True))
+        # a limit of 0 lets the memory grow on demand, a fixed limit is allocated at the start
+        mem_limit: int = int(backend.get('gpu_config', {}).get('mem_limit', 0))
+        return {
+            'backend.batch_size': [batch_size, batch_size * 2, max(1, batch_size // 2)],
+            'backend.batch_size_reduction': [reduction, not reduction],
+            'backend.gpu_config.mem_limit': [mem_limit, 0 if mem_limit else TUNED_MEM_LIMIT],
+            'TF_NUM_INTRAOP_THREADS': [cpus, max(1, cpus // 2)],
+            'TF_NUM_INTEROP_THREADS': [2, 1],
+        }
+
+    @staticmethod
+    def get_cpu_settings() -> dict:
+        # TensorFlow falls back to the CPU when the GPUs are hidden
+        return {}
 
-    def _collect_raw_errors(self) -> pd.DataFrame:
-        """
-        Collect errors from the fitting process.
+    @staticmethod
+    def get_train_size(config: dict) -> int:
+        return get_data_train_size(config['data'])
+
+    def get_config_maxiter(self) -> int:
+        return int(self.get_params()['fit']['maxiter'])
+
+    def get_name(self) -> SupportedModel:
+        return SupportedModel.PACE
 
-        Returns
-            pd.DataFrame: the errors from the fitting process
-        """
-        errors_filepath: Path = self._out_path / "test_pred.pckl.gzip"
-        df = pd.read_pickle(errors_filepath, compression="gzip")
-        return df
+    def switch_out_path(self, out_path: Path, link_mode: str = LinkMode.COPY.value):
+        link_file(self._out_path / LAST_POTENTIAL_NAME, out_path / LAST_POTENTIAL_NAME,
+                  link_mode, mutable=True)
+        super().switch_out_path(out_path, link_mode)
+
+    def collect_raw_errors(self) -> StructureErrors:
+        # predictions of the test set saved by pacemaker, with the corrected reference energies
+        frame: pd.DataFrame = read_dataset(self._out_path / TEST_PRED_NAME)
+        n_atoms: np.ndarray = np.array([len(forces) for forces in frame['forces']])
+        force_diff: np.ndarray = np.concatenate(list(frame['forces_pred'])) \
+            - np.concatenate(list(frame['forces']))
+        return StructureErrors.from_predictions(
+            n_atoms, frame['energy_corrected'].to_numpy() / n_atoms,
+            frame['energy_pred'].to_numpy() / n_atoms, force_diff,
+            frame['name'].astype(str).to_numpy() if 'name' in frame else None)
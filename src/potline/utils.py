@@ -3,15 +3,44 @@ CLI utilities for PotLine.
 """
 
 from pathlib import Path
+import math
 
 from .loss_logger import ModelTracker
 from .hyper_searcher import PotOptimizer
 from .deep_trainer import DeepTrainer
+from .metrics_builder import QFactorPredictor
 
-def filter_best_loss(model_list: list[ModelTracker], energy_weight: float, n: int) -> list[ModelTracker]:
+def filter_best_loss(model_list: list[ModelTracker], energy_weight: float, n: int,
+                     predictor_path: Path | None = None, margin: float = 1.0) -> list[ModelTracker]:
+    """
+    Select the best models.
+    Without a q-factor predictor, the models with the lowest validation loss are selected.
+    With a predictor, the models are ranked by their optimistic predicted q-factor,
+    the predicted log q-factor minus margin times its standard deviation,
+    so that uncertain models are still given a chance.
+
+    Args:
+        - model_list: list of model trackers
+        - energy_weight: weight of the energy loss
+        - n: number of models to select
+        - predictor_path: path to the trained q-factor predictor
+        - margin: number of standard deviations subtracted from the predicted log q-factor
+
+    Returns:
+        - list of the selected model trackers
+    """
     sorted_models = sorted(model_list,
                         key=lambda model: model.get_total_valid_loss(energy_weight))
-    return sorted_models[:n]
+    if predictor_path is None or len(sorted_models) <= n:
+        return sorted_models[:n]
+
+    predictions = QFactorPredictor.load(predictor_path).predict(sorted_models)
+    ranking = sorted(range(len(sorted_models)),
+                     key=lambda i: predictions[i][0] - margin * predictions[i][1])
+    for i in ranking[:n]:
+        print(f'Selected model {sorted_models[i].iteration}-{sorted_models[i].subiter}: ' +
+              f'predicted q-factor {math.exp(predictions[i][0]):.4g}')
+    return [sorted_models[i] for i in ranking[:n]]
 
 
 def get_model_trackers(sweep_path: Path, model_name: str,
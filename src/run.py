@@ -7,9 +7,11 @@ from pathlib import Path
 
 from potline.config_reader import ConfigReader
 from potline.model import PotModel
-from potline.hyper_searcher import PotOptimizer
+from potline.hyper_searcher import PotOptimizer, ThroughputTuner
 from potline.deep_trainer import DeepTrainer
-from potline.experiment import PropertiesSimulator, InferenceBencher, HardSplitter, Dislocator, Cracker
+from potline.evaluator import ModelEvaluator
+from potline.experiment import (PropertiesSimulator, InferenceBencher, HardSplitter, Dislocator, Cracker,
+                               Screener, PairTuner, LayoutTuner)
 
 def parse_args() -> Namespace:
     """
@@ -17,15 +19,25 @@ def parse_args() -> Namespace:
     """
     parser: ArgumentParser = ArgumentParser(description='Process some parameters.')
     parser.add_argument('--config', type=str, help='Path to the config file')
+    parser.add_argument('--throughputtune', action='store_true',
+                        help='Tune the runtime settings of the trainer before the hyperparameter search')
     parser.add_argument('--nohyper', action='store_false', help='Disable hyperparameter search')
     parser.add_argument('--hypiter', type=int, default=1, help='Hyperparameter search starting iteration')
     parser.add_argument('--nodeep', action='store_false', help='Disable deep training')
     parser.add_argument('--noconversion', action='store_false', help='Disable yace conversion')
+    parser.add_argument('--evaluate', action='store_true',
+                        help='Evaluate the candidate models on a common test set after the conversion')
+    parser.add_argument('--pairtune', action='store_true',
+                        help='Tune the pair style and LAMMPS flags of the models before the experiments')
+    parser.add_argument('--layouttune', action='store_true',
+                        help='Tune the thread/rank layout of the models before the experiments')
     parser.add_argument('--noinference', action='store_false', help='Disable inference benchmark')
     parser.add_argument('--noproperties', action='store_false', help='Disable properties simulation')
     parser.add_argument('--nohss', action='store_false', help='Disable hard split screw simulation')
     parser.add_argument('--nodislocations', action='store_false', help='Disable dislocations simulation')
     parser.add_argument('--nocracks', action='store_false', help='Disable cracks simulation')
+    parser.add_argument('--screening', action='store_true',
+                        help='Screen the models before the hss, dislocations and cracks simulations')
     return parser.parse_args()
 
 if __name__ == '__main__':
@@ -35,8 +47,11 @@ if __name__ == '__main__':
     gen_conf = ConfigReader(conf_path).get_general_config()
     gen_conf.sweep_path.mkdir(exist_ok=True)
 
+    if args.throughputtune:
+        next_id = ThroughputTuner.run_tune(conf_path)
+
     if args.nohyper:
-        next_id = PotOptimizer.run_hyp(conf_path, args.hypiter)
+        next_id = PotOptimizer.run_hyp(conf_path, args.hypiter, dependency=next_id)
 
     if args.nodeep:
         next_id = DeepTrainer.run_deep(conf_path, dependency=next_id)
@@ -44,17 +59,29 @@ if __name__ == '__main__':
     if args.noconversion:
         next_id = PotModel.run_conv(conf_path, dependency=next_id)
 
+    if args.evaluate:
+        ModelEvaluator.run_eval(conf_path, dependency=next_id)
+
+    if args.pairtune:
+        next_id = PairTuner(conf_path).run_tune(dependency=next_id)
+
+    if args.layouttune:
+        next_id = LayoutTuner(conf_path).run_tune(dependency=next_id)
+
     if args.noinference:
         InferenceBencher(conf_path).run_inf(dependency=next_id)
 
+    if args.screening:
+        next_id = Screener(conf_path).run_sim(dependency=next_id)
+
     if args.nohss:
-        HardSplitter(conf_path).run_sim(dependency=next_id)
+        HardSplitter(conf_path).run_sim(dependency=next_id, screened=args.screening)
 
     if args.nodislocations:
-        Dislocator(conf_path).run_sim(dependency=next_id)
+        Dislocator(conf_path).run_sim(dependency=next_id, screened=args.screening)
 
     if args.noproperties:
         next_id = PropertiesSimulator(conf_path).run_sim(dependency=next_id)
 
     if args.nocracks:
-        Cracker(conf_path).run_sim(dependency=next_id)
+        Cracker(conf_path).run_sim(dependency=next_id, screened=args.screening)
@@ -0,0 +1,44 @@
+"""
+CLI entry point for the error analytics of the models of a sweep.
+"""
+
+from argparse import Namespace, ArgumentParser
+from pathlib import Path
+
+from potline.utils import get_model_trackers
+from potline.config_reader import ConfigReader
+from potline.evaluator import ErrorAnalytics, ANALYTICS_DIR_NAME, EVAL_DIR_NAME
+
+def parse_args() -> Namespace:
+    """
+    Parse the command line arguments.
+    """
+    parser: ArgumentParser = ArgumentParser(description='Analyse the per-structure errors of the models.')
+    parser.add_argument('--config', type=str, help='Path to the config file')
+    parser.add_argument('--trainer', action='store_true',
+                        help='Use the test predictions written by the trainer instead of the evaluation')
+    parser.add_argument('--deep', action='store_true',
+                        help='With --trainer, use the deep trained models instead of the trials')
+    parser.add_argument('--top', type=int, default=20, help='Number of worst structures to report')
+    return parser.parse_args()
+
+if __name__ == '__main__':
+    args: Namespace = parse_args()
+    gen_config = ConfigReader(Path(args.config).resolve()).get_general_config()
+    analytics = ErrorAnalytics(args.top)
+
+    if args.trainer:
+        tracker_list = get_model_trackers(gen_config.sweep_path, gen_config.model_name, not args.deep)
+        for tracker in sorted(tracker_list, key=lambda t: (t.iteration, t.subiter)):
+            try:
+                analytics.add(f'{tracker.iteration}-{tracker.subiter}', tracker.model.collect_raw_errors())
+            except (FileNotFoundError, NotImplementedError) as e:
+                print(f'Skipping model {tracker.iteration}-{tracker.subiter}: {e}')
+    else:
+        for errors_path in sorted((gen_config.sweep_path / EVAL_DIR_NAME).glob('errors_*.npz')):
+            analytics.add_file(errors_path.stem.removeprefix('errors_'), errors_path)
+
+    if len(analytics) == 0:
+        raise FileNotFoundError('No per-structure errors found, run the evaluation first.')
+    analytics.write(gen_config.sweep_path / ANALYTICS_DIR_NAME)
+    print(f'Error analytics written to {gen_config.sweep_path / ANALYTICS_DIR_NAME}')
@@ -0,0 +1,62 @@
+"""
+CLI entry point for benchmarking the models through their ASE calculator, on the CPU and without LAMMPS.
+"""
+
+import os
+import csv
+from argparse import Namespace, ArgumentParser
+from pathlib import Path
+
+# the benchmark measures the CPU cost, the GPUs are hidden before the models are loaded
+os.environ['CUDA_VISIBLE_DEVICES'] = ''
+
+# pylint: disable=wrong-import-position
+from potline.utils import get_model_trackers
+from potline.config_reader import ConfigReader
+from potline.model import bench_calculator, CALC_BENCH_FILE_NAME, CALC_BENCH_FIELDS
+
+def parse_args() -> Namespace:
+    """
+    Parse the command line arguments.
+    """
+    parser: ArgumentParser = ArgumentParser(description='Benchmark the models through their ASE calculator.')
+    parser.add_argument('--config', type=str, help='Path to the config file')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[2, 4, 8],
+                        help='Number of cubic bcc cells along each direction')
+    parser.add_argument('--steps', type=int, default=10, help='Number of timed steps')
+    parser.add_argument('--warmups', type=int, default=2,
+                        help='Number of untimed steps before the timed ones')
+    parser.add_argument('--deep', action='store_true',
+                        help='Benchmark the deep trained models instead of the hyperparameter search trials')
+    return parser.parse_args()
+
+if __name__ == '__main__':
+    args: Namespace = parse_args()
+    config_path: Path = Path(args.config).resolve()
+    gen_config = ConfigReader(config_path).get_general_config()
+
+    tracker_list = get_model_trackers(gen_config.sweep_path, gen_config.model_name, not args.deep,
+                                      pretrained_path=gen_config.pretrained_path)
+
+    # one file per model, and a table of the whole sweep to compare them
+    with (gen_config.sweep_path / CALC_BENCH_FILE_NAME).open('w', encoding='utf-8', newline='') as sweep_file:
+        sweep_writer = csv.DictWriter(sweep_file, ['iteration', 'subiteration'] + CALC_BENCH_FIELDS)
+        sweep_writer.writeheader()
+        for tracker in sorted(tracker_list, key=lambda t: (t.iteration, t.subiter)):
+            try:
+                rows = bench_calculator(tracker.model, args.sizes, args.steps, args.warmups)
+            except (FileNotFoundError, NotImplementedError, ValueError) as e:
+                print(f'Skipping model {tracker.iteration}-{tracker.subiter}: {e}')
+                continue
+            with (tracker.model.get_out_path() / CALC_BENCH_FILE_NAME).open(
+                    'w', encoding='utf-8', newline='') as file:
+                writer = csv.DictWriter(file, CALC_BENCH_FIELDS)
+                writer.writeheader()
+                writer.writerows(rows)
+            for row in rows:
+                sweep_writer.writerow({'iteration': tracker.iteration,
+                                       'subiteration': tracker.subiter, **row})
+                print(f'Model {tracker.iteration}-{tracker.subiter}, {row["atoms"]} atoms:'
+                      f' load {row["load_s"]:.3g} s,'
+                      f' first evaluation {row["first_eval_s"]:.3g} s,'
+                      f' {row["us_per_atom_step"]:.3g} us/atom/step')
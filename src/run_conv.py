@@ -29,7 +29,8 @@ if __name__ == '__main__':
 
     tracker_list = get_model_trackers(gen_config.sweep_path, gen_config.model_name,
                                       pretrained_path=gen_config.pretrained_path)
-    best_trackers = filter_best_loss(tracker_list, energy_weight, gen_config.best_n_models)
+    best_trackers = filter_best_loss(tracker_list, energy_weight, gen_config.best_n_models,
+                                     gen_config.q_predictor_path, gen_config.q_predictor_margin)
 
     for tracker in best_trackers:
         tracker.model.lampify()
@@ -2,6 +2,7 @@
 CLI entry point for running deep training.
 """
 
+import sys
 from argparse import Namespace, ArgumentParser
 from pathlib import Path
 
@@ -16,16 +17,32 @@ def parse_deep() -> Namespace:
     parser: ArgumentParser = ArgumentParser(description='Process some parameters.')
     parser.add_argument('--config', type=str, help='Path to the config file')
     parser.add_argument('--collect', action='store_true', help='Collect losses')
+    parser.add_argument('--parity', action='store_true',
+                        help='Check the parity runs and release or cancel the deep training')
+    parser.add_argument('--fitid', type=int, help='Id of the held deep training jobs')
+    parser.add_argument('--collectid', type=int, help='Id of the collection job')
     return parser.parse_args()
 
 if __name__ == '__main__':
     deep_args: Namespace = parse_deep()
     config_path: Path = Path(deep_args.config).resolve()
     deep_config = ConfigReader(config_path).get_deep_train_config()
+    gen_config = ConfigReader(config_path).get_general_config()
+
+    if deep_args.parity:
+        # the held training jobs are cancelled if the check itself fails
+        parity_passed: bool = False
+        try:
+            parity_passed = DeepTrainer(config_path, []).check_parity()
+        finally:
+            DeepTrainer.release_deep(parity_passed, deep_args.fitid, deep_args.collectid,
+                                     deep_config.best_n_models)
+        sys.exit(0)
 
     tracker_list = get_model_trackers(deep_config.sweep_path, deep_config.model_name,
                                       force_from_hyp=not deep_args.collect)
-    best_trackers = filter_best_loss(tracker_list, deep_config.energy_weight, deep_config.best_n_models)
+    best_trackers = filter_best_loss(tracker_list, deep_config.energy_weight, deep_config.best_n_models,
+                                     gen_config.q_predictor_path, gen_config.q_predictor_margin)
 
     if not deep_args.collect:
         DeepTrainer(config_path, best_trackers).prep_deep()
@@ -0,0 +1,24 @@
+"""
+CLI entry point for evaluating the candidate models on a common test set.
+"""
+
+from argparse import Namespace, ArgumentParser
+from pathlib import Path
+
+from potline.evaluator import ModelEvaluator
+
+def parse_args() -> Namespace:
+    """
+    Parse the command line arguments.
+    """
+    parser: ArgumentParser = ArgumentParser(description='Evaluate the candidate models on a common test set.')
+    parser.add_argument('--config', type=str, help='Path to the config file')
+    return parser.parse_args()
+
+if __name__ == '__main__':
+    args: Namespace = parse_args()
+    rows = ModelEvaluator(Path(args.config).resolve()).evaluate()
+    for row in rows:
+        print(f'{row["stage"]} model {row["iteration"]}-{row["subiteration"]}:'
+              f' energy RMSE {row["rmse_epa"] * 1000:.4g} meV/atom,'
+              f' force RMSE {row["rmse_f_comp"] * 1000:.4g} meV/A, loss {row["loss"]:.4g}')
@@ -2,12 +2,13 @@
 CLI entry point for running properties simulations.
 """
 
+import sys
 from argparse import Namespace, ArgumentParser
 from pathlib import Path
 
 from potline.utils import get_model_trackers, filter_best_loss
 from potline.config_reader import ConfigReader
-from potline.experiment import Experiment
+from potline.experiment import Experiment, ResultStore, Screener, BenchHistory
 
 def parse_config() -> Namespace:
     """
@@ -17,12 +18,36 @@ def parse_config() -> Namespace:
     parser.add_argument('--config', type=str, help='Path to the config file')
     parser.add_argument('--copydir', type=str, help='Path to the directory to copy')
     parser.add_argument('--outpath', type=str, help='Path to the output directory')
+    parser.add_argument('--command', type=str, default='', help='Command running the experiment')
+    parser.add_argument('--runid', type=int, help='Id of the held experiment jobs to release')
+    parser.add_argument('--store', action='store_true', help='Save the results in the result store')
+    parser.add_argument('--nostore', action='store_true', help='Do not use the result store')
+    parser.add_argument('--history', action='store_true', help='Append the run timings to the history')
+    parser.add_argument('--elapsed', type=float, default=0, help='Wall time of the run, in seconds')
+    parser.add_argument('--layout', type=str, default='', help='Layout of the run, as NxT')
+    parser.add_argument('--screened', action='store_true', help='Skip the models that failed the screening')
     return parser.parse_args()
 
 if __name__ == '__main__':
     args: Namespace = parse_config()
     config_path: Path = Path(args.config).resolve()
     gen_config = ConfigReader(config_path).get_general_config()
+    store = ResultStore(gen_config.result_store_path) \
+        if gen_config.result_store_path and not args.nostore else None
+
+    if args.store:
+        if store is None:
+            raise ValueError('No result store path defined in the config file.')
+        store.save_result(Path(args.outpath))
+        sys.exit(0)
+
+    if args.history:
+        if gen_config.history_path is None:
+            raise ValueError('No history path defined in the config file.')
+        BenchHistory(gen_config.history_path).record(Path(args.outpath), gen_config.sweep_path,
+                                                     gen_config.cluster, gen_config.lammps_bin_path,
+                                                     args.layout, args.elapsed)
+        sys.exit(0)
 
     # placeholder for pretrained models,
     # the value does not matter since the list has only 1 model
@@ -32,6 +57,19 @@ if __name__ == '__main__':
 
     tracker_list = get_model_trackers(gen_config.sweep_path, gen_config.model_name,
                                       pretrained_path=gen_config.pretrained_path)
-    best_trackers = filter_best_loss(tracker_list, energy_weight, gen_config.best_n_models)
+    best_trackers = filter_best_loss(tracker_list, energy_weight, gen_config.best_n_models,
+                                     gen_config.q_predictor_path, gen_config.q_predictor_margin)
 
-    Experiment.prep_exp(Path(args.outpath), Path(args.copydir), best_trackers)
+    # the held experiment jobs are released only once the preparation and the screening succeeded,
+    # if either fails they are all cancelled
+    run_ids: list[int] = []
+    try:
+        prepared_ids: list[int] = Experiment.prep_exp(Path(args.outpath), Path(args.copydir), best_trackers,
+                                                      store, args.command, gen_config.link_mode)
+        if args.screened:
+            passed_ids = Screener(config_path).get_passed_ids()
+            prepared_ids = [run_id for run_id in prepared_ids if run_id in passed_ids]
+        run_ids = prepared_ids
+    finally:
+        if args.runid:
+            Experiment.release_runs(args.runid, run_ids, gen_config.best_n_models)
@@ -0,0 +1,45 @@
+"""
+CLI entry point for comparing the experiment timings recorded in the history.
+"""
+
+import sys
+from argparse import Namespace, ArgumentParser
+from pathlib import Path
+
+from potline.config_reader import ConfigReader
+from potline.experiment import BenchHistory
+
+def parse_args() -> Namespace:
+    """
+    Parse the command line arguments.
+    """
+    parser: ArgumentParser = ArgumentParser(description='Flag the throughput regressions in the history.')
+    parser.add_argument('--config', type=str, help='Path to the config file, for its history path')
+    parser.add_argument('--history', type=str, help='Path to the history directory, overrides the config')
+    parser.add_argument('--by', type=str, default='build', choices=['build', 'sweep'],
+                        help='Compare consecutive LAMMPS builds or sweeps')
+    parser.add_argument('--threshold', type=float, default=0.05,
+                        help='Relative slowdown above which a metric is flagged')
+    return parser.parse_args()
+
+if __name__ == '__main__':
+    args: Namespace = parse_args()
+    history_path: Path | None = Path(args.history).resolve() if args.history else None
+    if history_path is None and args.config:
+        history_path = ConfigReader(Path(args.config).resolve()).get_general_config().history_path
+    if history_path is None:
+        raise ValueError('No history path given on the command line or in the config file.')
+
+    regressions = BenchHistory(history_path).find_regressions(args.by, args.threshold)
+    for regression in regressions:
+        old, new = regression['old'], regression['new']
+        if args.by == 'build':
+            old, new = old[:12], new[:12]
+        print(f'{regression["experiment"]} model {regression["model_hash"][:12]}'
+              f' on {regression["cluster"]}/{regression["partition"]} layout {regression["layout"]}:'
+              f' {regression["metric"]} {regression["old_value"]:.4g} -> {regression["new_value"]:.4g}'
+              f' ({regression["change"]:+.1%}), {args.by} {old} -> {new}')
+    if not regressions:
+        print('No regressions found.')
+    # a non-zero exit code lets the comparison gate a rebuild
+    sys.exit(1 if regressions else 0)
@@ -0,0 +1,22 @@
+"""
+CLI entry point for training the q-factor predictor.
+"""
+
+from argparse import Namespace, ArgumentParser
+from pathlib import Path
+
+from potline.metrics_builder import QFactorPredictor
+
+def parse_args() -> Namespace:
+    """
+    Parse the command line arguments.
+    """
+    parser: ArgumentParser = ArgumentParser(description='Train the q-factor predictor on previous sweeps.')
+    parser.add_argument('--sweeps', type=str, nargs='+', help='Paths to the sweeps to train on')
+    parser.add_argument('--outpath', type=str, help='Path to the output predictor file')
+    return parser.parse_args()
+
+if __name__ == '__main__':
+    args: Namespace = parse_args()
+    predictor = QFactorPredictor.from_sweeps([Path(sweep).resolve() for sweep in args.sweeps])
+    predictor.save(Path(args.outpath).resolve())
@@ -0,0 +1,53 @@
+"""
+CLI entry point for reducing a training dataset to a diverse subset of its configurations.
+"""
+
+import csv
+from argparse import Namespace, ArgumentParser
+from pathlib import Path
+
+from potline.data_reducer import DataReducer, REPORT_FILE_NAME
+
+def parse_args() -> Namespace:
+    """
+    Parse the command line arguments.
+    """
+    parser: ArgumentParser = ArgumentParser(description='Reduce a training dataset to a diverse subset.')
+    parser.add_argument('--data', type=str, help='Path to the dataset, pckl.gzip or xyz')
+    parser.add_argument('--outpath', type=str, help='Path to the output directory')
+    parser.add_argument('--fractions', type=float, nargs='+', default=[0.1, 0.25, 0.5],
+                        help='Fractions of the configurations to keep')
+    parser.add_argument('--method', type=str, default='fps', choices=['fps', 'kmedoids'],
+                        help='Farthest point sampling or k-medoids')
+    parser.add_argument('--strata', type=int, default=5, help='Number of energy strata')
+    parser.add_argument('--cutoff', type=float, default=5.0, help='Cutoff of the descriptors')
+    parser.add_argument('--energykey', type=str, default='energy', help='Energy key of the xyz datasets')
+    parser.add_argument('--testsize', type=float, default=0.1,
+                        help='Fraction of the configurations held out for the report')
+    parser.add_argument('--seed', type=int, default=42, help='Seed of the held-out split')
+    return parser.parse_args()
+
+if __name__ == '__main__':
+    args: Namespace = parse_args()
+    data_path: Path = Path(args.data).resolve()
+    out_path: Path = Path(args.outpath).resolve()
+    out_path.mkdir(parents=True, exist_ok=True)
+    reducer = DataReducer(data_path, args.cutoff, energy_key=args.energykey)
+
+    # accuracy/size trade-off, selected from the configurations left after the held-out split
+    rows = reducer.evaluate(args.fractions, args.strata, args.method, args.testsize, seed=args.seed)
+    with (out_path / REPORT_FILE_NAME).open('w', encoding='utf-8', newline='') as file:
+        writer = csv.DictWriter(file, list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+    for row in rows:
+        print(f'{row["fraction"]:.3g} ({row["size"]} configurations): knn error {row["knn_mae_mev"]:.3g}'
+              f' meV/atom, random {row["random_knn_mae_mev"]:.3g} meV/atom')
+
+    # reduced datasets, selected from all the configurations
+    suffixes: str = ''.join(data_path.suffixes)
+    for fraction in args.fractions:
+        indices = reducer.select(fraction, args.strata, args.method)
+        reduced_path: Path = out_path / f'{data_path.name[:-len(suffixes)]}_{fraction:g}{suffixes}'
+        reducer.save(indices, reduced_path)
+        print(f'Saved {len(indices)} of {len(reducer)} configurations to {reduced_path}')
@@ -0,0 +1,26 @@
+"""
+CLI entry point for running the throughput tuning of the trainer.
+"""
+
+from argparse import Namespace, ArgumentParser
+from pathlib import Path
+
+from potline.hyper_searcher import ThroughputTuner
+
+def parse_throughput() -> Namespace:
+    """
+    Parse the throughput tuning arguments.
+    """
+    parser: ArgumentParser = ArgumentParser(description='Process some parameters.')
+    parser.add_argument('--config', type=str, help='Path to the config file')
+    parser.add_argument('--collect', action='store_true', help='Collect the calibration runs')
+    return parser.parse_args()
+
+if __name__ == '__main__':
+    throughput_args: Namespace = parse_throughput()
+    config_path: Path = Path(throughput_args.config).resolve()
+
+    if not throughput_args.collect:
+        ThroughputTuner(config_path).prepare()
+    else:
+        ThroughputTuner(config_path).collect()
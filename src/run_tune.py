@@ -0,0 +1,43 @@
+"""
+CLI entry point for the tuning of a model, run from its tuning directory.
+"""
+
+from argparse import Namespace, ArgumentParser
+from pathlib import Path
+
+from potline.utils import get_model_trackers
+from potline.config_reader import ConfigReader
+from potline.experiment import Experiment, PairTuner, LayoutTuner
+
+def parse_args() -> Namespace:
+    """
+    Parse the command line arguments.
+    """
+    parser: ArgumentParser = ArgumentParser(description='Process some parameters.')
+    parser.add_argument('--config', type=str, help='Path to the config file')
+    parser.add_argument('--outpath', type=str, help='Path to the tuning directory of the model')
+    parser.add_argument('--variants', action='store_true', help='Write the pair styles to benchmark')
+    parser.add_argument('--apply', action='store_true', help='Write the tuned potential in the model')
+    parser.add_argument('--layout', action='store_true', help='Write the tuned layout in the model')
+    parser.add_argument('--partition', type=str, default='', help='Partition the layout was tuned on')
+    return parser.parse_args()
+
+if __name__ == '__main__':
+    args: Namespace = parse_args()
+    config_path: Path = Path(args.config).resolve()
+    run_path: Path = Path(args.outpath).resolve()
+    gen_config = ConfigReader(config_path).get_general_config()
+
+    iteration, subiter = Experiment.read_run_info(run_path)
+    tracker_list = get_model_trackers(gen_config.sweep_path, gen_config.model_name,
+                                      pretrained_path=gen_config.pretrained_path)
+    trackers = [t for t in tracker_list if t.iteration == iteration and t.subiter == subiter]
+    if not trackers:
+        raise FileNotFoundError(f'Model {iteration}-{subiter} not found in {gen_config.sweep_path}')
+
+    if args.variants:
+        PairTuner(config_path).write_variants(run_path, trackers[0])
+    if args.apply:
+        PairTuner(config_path).apply(run_path, trackers[0])
+    if args.layout:
+        LayoutTuner.apply(run_path, trackers[0], args.partition)
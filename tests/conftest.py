@@ -0,0 +1,36 @@
+"""
+Shared setup of the tests, the package is imported from the src directory.
+The test modules of the package are not collected when one of its dependencies is missing.
+The training backends (mace, torch) are imported by the models when they are used,
+so only the tests running a backend check it themselves.
+"""
+
+import sys
+from importlib.util import find_spec
+from pathlib import Path
+
+SRC_PATH: Path = Path(__file__).resolve().parents[1] / 'src'
+sys.path.insert(0, str(SRC_PATH))
+
+# third-party packages imported by the modules of the package
+PACKAGE_DEPENDENCIES: list[str] = ['hjson', 'yaml', 'numpy', 'scipy', 'pandas', 'matplotlib', 'ase',
+                                   'sklearn', 'skopt', 'xpot', 'tabulate', 'simple_slurm']
+# test modules running the scripts of the package, without importing it
+SCRIPT_TESTS: list[str] = ['test_distributed.py']
+MISSING_DEPENDENCIES: list[str] = [name for name in PACKAGE_DEPENDENCIES if find_spec(name) is None]
+
+def pytest_ignore_collect(collection_path: Path) -> bool | None:
+    """
+    Skip the test modules of the package without its dependencies.
+    """
+    if MISSING_DEPENDENCIES and collection_path.name.startswith('test_') and collection_path.suffix == '.py':
+        return collection_path.name not in SCRIPT_TESTS
+    return None
+
+def pytest_report_header() -> str | None:
+    """
+    Report the test modules skipped by the missing dependencies.
+    """
+    if MISSING_DEPENDENCIES:
+        return f'tests of the package not collected, missing: {", ".join(MISSING_DEPENDENCIES)}'
+    return None
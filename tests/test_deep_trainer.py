@@ -0,0 +1,17 @@
+"""
+Tests of the rank count of the data-parallel deep training.
+"""
+
+import pytest
+
+from potline.deep_trainer.deep_trainer import get_world_size
+
+@pytest.mark.parametrize('slurm_opts, world_size', [
+    ({}, 1),
+    ({'ntasks': 8}, 8),
+    ({'ntasks': '4', 'nodes': 2, 'ntasks_per_node': 4}, 4),
+    ({'nodes': 2, 'ntasks_per_node': 4}, 8),
+    ({'nodes': 3}, 3),
+])
+def test_get_world_size(slurm_opts: dict, world_size: int):
+    assert get_world_size(slurm_opts) == world_size
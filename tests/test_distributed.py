@@ -0,0 +1,84 @@
+"""
+Tests of the local launch of the data-parallel training, with CPU ranks.
+"""
+
+import os
+import sys
+import json
+import subprocess
+from pathlib import Path
+
+import pytest
+
+DISPATCHER_PATH: Path = Path(__file__).resolve().parents[1] / 'src' / 'potline' / 'dispatcher'
+DISTRIBUTED_SCRIPT: Path = DISPATCHER_PATH / 'distributed.sh'
+DIST_CHECK_SCRIPT: Path = DISPATCHER_PATH / 'dist_check.py'
+RANK_VARIABLES: list[str] = ['RANK', 'LOCAL_RANK', 'NODE_RANK', 'WORLD_SIZE', 'LOCAL_WORLD_SIZE',
+                             'MASTER_ADDR', 'MASTER_PORT']
+
+def launch(run_path: Path, world_size: int, command: list[str],
+           timeout: int = 120) -> subprocess.CompletedProcess:
+    """
+    Launch a command on local ranks with the gloo backend, outside Slurm.
+    """
+    (run_path / 'launch.env').write_text(f'export DIST_WORLD_SIZE={world_size}\n'
+                                         'export DIST_BACKEND=gloo\n', encoding='utf-8')
+    env: dict = {k: v for k, v in os.environ.items() if not k.startswith('SLURM_')}
+    return subprocess.run(['bash', str(DISTRIBUTED_SCRIPT)] + command, cwd=run_path, env=env,
+                          capture_output=True, text=True, timeout=timeout, check=False)
+
+def test_local_launch_sets_rank_variables(tmp_path: Path):
+    # every rank writes its variables to its own file
+    writer: str = 'import os, json; open(f"rank_{os.environ[\'RANK\']}.json", "w").write(' \
+        f'json.dumps({{k: os.environ[k] for k in {RANK_VARIABLES}}}))'
+    result = launch(tmp_path, 2, [sys.executable, '-c', writer])
+    assert result.returncode == 0, result.stderr
+    ranks: list[dict] = [json.loads(path.read_text(encoding='utf-8'))
+                         for path in sorted(tmp_path.glob('rank_*.json'))]
+    assert sorted(int(r['RANK']) for r in ranks) == [0, 1]
+    assert sorted(int(r['LOCAL_RANK']) for r in ranks) == [0, 1]
+    for rank in ranks:
+        assert rank['WORLD_SIZE'] == '2'
+        assert rank['LOCAL_WORLD_SIZE'] == '2'
+        assert rank['NODE_RANK'] == '0'
+        assert rank['MASTER_ADDR'] == '127.0.0.1'
+    assert len({rank['MASTER_PORT'] for rank in ranks}) == 1
+
+def test_local_launch_fails_with_a_rank(tmp_path: Path):
+    result = launch(tmp_path, 3, ['sh', '-c', 'exit $((RANK == 2))'])
+    assert result.returncode == 1
+
+def test_gloo_check_on_two_ranks(tmp_path: Path):
+    pytest.importorskip('torch')
+    result = launch(tmp_path, 2, [sys.executable, str(DIST_CHECK_SCRIPT)])
+    assert result.returncode == 0, result.stdout + result.stderr
+    assert result.stdout.count(', ok') == 2
+
+def test_mace_cpu_run(tmp_path: Path):
+    # MACE creates its process group with its own backend, so the CPU run uses a single rank
+    pytest.importorskip('mace')
+    ase_io = pytest.importorskip('ase.io')
+    from ase.build import bulk
+    from ase.calculators.emt import EMT
+
+    structures = []
+    for i in range(12):
+        atoms = bulk('Cu', 'fcc', a=3.6, cubic=True)
+        atoms.rattle(0.05, seed=i)
+        atoms.calc = EMT()
+        atoms.info['REF_energy'] = atoms.get_potential_energy()
+        atoms.arrays['REF_forces'] = atoms.get_forces()
+        atoms.calc = None
+        structures.append(atoms)
+    ase_io.write(tmp_path / 'train.xyz', structures, format='extxyz')
+    config: dict = {
+        'name': 'tiny', 'seed': 1, 'device': 'cpu', 'default_dtype': 'float64',
+        'train_file': 'train.xyz', 'valid_fraction': 0.25, 'energy_key': 'REF_energy',
+        'forces_key': 'REF_forces', 'E0s': 'average', 'r_max': 3.0, 'num_channels': 8,
+        'max_L': 0, 'max_num_epochs': 2, 'batch_size': 2, 'valid_batch_size': 2,
+    }
+    (tmp_path / 'config.yaml').write_text(json.dumps(config), encoding='utf-8')
+    result = launch(tmp_path, 1, ['mace_run_train', '--config', 'config.yaml'], timeout=600)
+    assert result.returncode == 0, result.stdout + result.stderr
+    results: list[Path] = list((tmp_path / 'results').glob('*.txt'))
+    assert results and '"mode": "eval"' in results[0].read_text(encoding='utf-8')
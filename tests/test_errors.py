@@ -0,0 +1,84 @@
+"""
+Tests of the per-structure errors and of their streaming analytics.
+"""
+
+import csv
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from potline.model import StructureErrors
+from potline.evaluator import ErrorAnalytics
+from potline.evaluator.analytics import HIST_EDGES
+
+def get_errors(energy_shift: float = 0.0, first_index: int = 0) -> StructureErrors:
+    """
+    Errors of a structure of one atom and of a structure of two atoms.
+    """
+    force_diff: np.ndarray = np.array([[3.0, 0.0, 0.0], [0.0, 0.0, 0.0], [0.0, 4.0, 0.0]])
+    return StructureErrors.from_predictions(
+        np.array([1, 2]), np.array([-1.0, -2.0]), np.array([-0.9, -2.2]) + energy_shift, force_diff,
+        np.array(['bulk', 'surface']), first_index)
+
+def test_from_predictions():
+    errors: StructureErrors = get_errors(first_index=10)
+    assert len(errors) == 2
+    assert errors.columns['structure'].tolist() == [10, 11]
+    assert errors.columns['energy_error'] == pytest.approx([0.1, -0.2])
+    assert errors.columns['force_rmse'] == pytest.approx([np.sqrt(3.0), np.sqrt(16 / 6)])
+    assert errors.columns['force_mae'] == pytest.approx([1.0, 4 / 6])
+    assert errors.columns['force_max'] == pytest.approx([3.0, 4.0])
+    assert errors.atom_force_error == pytest.approx([3.0, 0.0, 4.0])
+
+def test_summarize_weights_the_force_components():
+    summary: dict[str, float] = get_errors().summarize()
+    assert summary['structures'] == 2
+    assert summary['rmse_epa'] == pytest.approx(np.sqrt(0.025))
+    assert summary['mae_epa'] == pytest.approx(0.15)
+    assert summary['rmse_f_comp'] == pytest.approx(5 / 3)
+    assert summary['mae_f_comp'] == pytest.approx(7 / 9)
+    assert summary['max_f'] == pytest.approx(4.0)
+
+def test_save_and_load(tmp_path: Path):
+    errors: StructureErrors = get_errors()
+    errors.save(tmp_path / 'errors.npz')
+    loaded: StructureErrors = StructureErrors.load(tmp_path / 'errors.npz')
+    assert loaded.summarize() == pytest.approx(errors.summarize())
+    assert loaded.columns['config_type'].tolist() == ['bulk', 'surface']
+
+def test_concatenate():
+    errors: StructureErrors = StructureErrors.concatenate([get_errors(), get_errors(first_index=2)])
+    assert errors.columns['structure'].tolist() == [0, 1, 2, 3]
+    assert len(errors.atom_force_error) == 6
+
+def test_quantiles_are_bin_edges():
+    analytics = ErrorAnalytics()
+    analytics.add('model', get_errors())
+    for quantile in analytics.get_quantiles('force_max'):
+        # the errors are 3 and 4 eV/A, the quantiles are the upper edge of their bin
+        assert 3.0 <= quantile <= 4.0 * HIST_EDGES[1] / HIST_EDGES[0]
+
+def test_worst_structures_across_models(tmp_path: Path):
+    analytics = ErrorAnalytics(top_n=2)
+    analytics.add('a', get_errors())
+    analytics.add('b', get_errors(energy_shift=-1.0))
+    assert len(analytics) == 2
+    analytics.write(tmp_path)
+    with (tmp_path / 'worst_structures.csv').open('r', encoding='utf-8') as file:
+        worst: list[dict] = [row for row in csv.DictReader(file) if row['metric'] == 'energy_error']
+    assert [(row['model'], row['structure']) for row in worst] == [('b', '1'), ('b', '0')]
+
+def test_errors_by_config_type(tmp_path: Path):
+    analytics = ErrorAnalytics()
+    analytics.add('a', get_errors())
+    analytics.add('b', get_errors())
+    analytics.write(tmp_path)
+    with (tmp_path / 'errors_by_config_type.csv').open('r', encoding='utf-8') as file:
+        rows: dict[tuple[str, str], dict] = {(row['model'], row['config_type']): row
+                                             for row in csv.DictReader(file)}
+    assert set(rows) == {(label, config_type) for label in ['a', 'b', 'all']
+                         for config_type in ['bulk', 'surface']}
+    assert int(rows[('all', 'bulk')]['structures']) == 2
+    assert float(rows[('a', 'surface')]['mae_epa']) == pytest.approx(0.2)
+    assert float(rows[('all', 'bulk')]['rmse_f_comp']) == pytest.approx(np.sqrt(3.0))
@@ -0,0 +1,51 @@
+"""
+Tests of the regression detection of the benchmark history.
+"""
+
+import json
+from pathlib import Path
+
+import pytest
+
+from potline.experiment.history import BenchHistory, HISTORY_FILE_NAME
+
+def make_record(build: str, sweep: str, speed: float, layout: str = '4x2') -> dict:
+    return {'experiment': 'inference_bench', 'model_hash': 'm', 'potential_hash': 'p', 'cluster': 'c',
+            'partition': 'gpu', 'layout': layout, 'proc_bind': 'spread', 'places': 'threads',
+            'lammps_hash': build, 'sweep': sweep, 'metrics': {'timesteps_per_s': speed, 'runs_per_hour': 10}}
+
+def make_history(tmp_path: Path, records: list[dict]) -> BenchHistory:
+    history = BenchHistory(tmp_path)
+    (tmp_path / HISTORY_FILE_NAME).write_text(''.join(json.dumps(record) + '\n' for record in records),
+                                              encoding='utf-8')
+    return history
+
+def test_regression_between_builds(tmp_path: Path):
+    history = make_history(tmp_path, [make_record('b1', 's1', 100), make_record('b1', 's1', 104),
+                                      make_record('b2', 's1', 90), make_record('b2', 's1', 80)])
+    regressions: list[dict] = history.find_regressions('build', 0.05)
+    assert len(regressions) == 1
+    assert regressions[0]['metric'] == 'timesteps_per_s'
+    assert (regressions[0]['old'], regressions[0]['new']) == ('b1', 'b2')
+    assert regressions[0]['old_value'] == pytest.approx(102)
+    assert regressions[0]['new_value'] == pytest.approx(85)
+    assert regressions[0]['change'] == pytest.approx(85 / 102 - 1)
+
+def test_slowdown_below_threshold(tmp_path: Path):
+    history = make_history(tmp_path, [make_record('b1', 's1', 100), make_record('b2', 's1', 97)])
+    assert not history.find_regressions('build', 0.05)
+
+def test_only_same_key_compared(tmp_path: Path):
+    history = make_history(tmp_path, [make_record('b1', 's1', 100, '4x2'),
+                                      make_record('b2', 's1', 50, '8x1')])
+    assert not history.find_regressions('build')
+
+def test_sweeps_compared_within_a_build(tmp_path: Path):
+    history = make_history(tmp_path, [make_record('b1', 's1', 100), make_record('b2', 's2', 50),
+                                      make_record('b1', 's3', 60)])
+    regressions: list[dict] = history.find_regressions('sweep')
+    assert [(r['old'], r['new'], r['lammps_hash']) for r in regressions] == [('s1', 's3', 'b1')]
+
+def test_unknown_version(tmp_path: Path):
+    with pytest.raises(ValueError):
+        make_history(tmp_path, []).find_regressions('node')
@@ -0,0 +1,52 @@
+"""
+Tests of the keys of the content-addressed result store.
+"""
+
+from pathlib import Path
+
+import pytest
+
+from potline.experiment.result_store import ResultStore
+
+@pytest.fixture(name='experiment')
+def fixture_experiment(tmp_path: Path) -> dict[str, Path]:
+    """
+    A potential referencing a model file, an experiment template and a LAMMPS binary.
+    """
+    model_path: Path = tmp_path / 'model.yaml'
+    model_path.write_text('model 1\n', encoding='utf-8')
+    pot_path: Path = tmp_path / 'potential.in'
+    pot_path.write_text(f'pair_style pace\npair_coeff * * {model_path} Fe\n', encoding='utf-8')
+    template_path: Path = tmp_path / 'template'
+    template_path.mkdir()
+    (template_path / 'in.lmp').write_text('run 10\n', encoding='utf-8')
+    lmp_path: Path = tmp_path / 'lmp'
+    lmp_path.write_text('binary 1\n', encoding='utf-8')
+    return {'store': tmp_path / 'store', 'model': model_path, 'pot': pot_path,
+            'template': template_path, 'lmp': lmp_path}
+
+def get_key(experiment: dict[str, Path], command: str | None = None) -> str:
+    return ResultStore(experiment['store']).get_key(
+        experiment['pot'], experiment['template'], command or f'bash submit.sh {experiment["lmp"]}')
+
+def test_key_is_stable(experiment: dict[str, Path]):
+    assert get_key(experiment) == get_key(experiment)
+
+@pytest.mark.parametrize('changed', ['model', 'pot', 'lmp'])
+def test_key_changes_with_the_files(experiment: dict[str, Path], changed: str):
+    key: str = get_key(experiment)
+    with experiment[changed].open('a', encoding='utf-8') as file:
+        file.write('# changed\n')
+    assert get_key(experiment) != key
+
+def test_key_changes_with_the_template(experiment: dict[str, Path]):
+    key: str = get_key(experiment)
+    (experiment['template'] / 'in.lmp').write_text('run 20\n', encoding='utf-8')
+    assert get_key(experiment) != key
+
+def test_key_changes_with_the_command(experiment: dict[str, Path]):
+    assert get_key(experiment, f'bash submit.sh {experiment["lmp"]} 100') != get_key(experiment)
+
+def test_path_tokens_keep_existing_absolute_paths(experiment: dict[str, Path]):
+    text: str = f'pair_coeff * * "{experiment["model"]}" Fe /missing/file relative.yaml # {experiment["lmp"]}'
+    assert ResultStore.path_tokens(text) == [experiment['model']]
@@ -0,0 +1,44 @@
+"""
+Tests of the diverse subset selection of the dataset reduction.
+"""
+
+import numpy as np
+import pytest
+
+from potline.data_reducer import farthest_point_sampling, k_medoids, stratified_select
+
+CENTRES: np.ndarray = np.array([[0.0, 0.0], [10.0, 0.0], [0.0, 10.0]])
+OFFSETS: np.ndarray = np.array([[0.0, 0.0], [0.5, 0.0], [-0.5, 0.0], [0.0, 0.5], [0.0, -0.5]])
+
+def get_clusters() -> np.ndarray:
+    """
+    Three separated clusters of five points, the first point of each cluster being its centre.
+    """
+    return np.concatenate([centre + OFFSETS for centre in CENTRES])
+
+def test_farthest_point_sampling_spreads():
+    features: np.ndarray = np.arange(10, dtype=float)[:, None]
+    assert farthest_point_sampling(features, 3, start=0).tolist() == [0, 9, 4]
+
+def test_k_medoids_finds_the_cluster_centres():
+    medoids: np.ndarray = k_medoids(get_clusters(), 3)
+    assert sorted(medoids.tolist()) == [0, 5, 10]
+
+def test_stratified_select_keeps_every_stratum():
+    rng = np.random.default_rng(0)
+    features: np.ndarray = rng.normal(size=(40, 3))
+    energies: np.ndarray = np.repeat([-4.0, -3.0, -2.0, -1.0], 10) + rng.uniform(0, 0.1, 40)
+    for method in ['fps', 'kmedoids']:
+        selected: np.ndarray = stratified_select(features, energies, 0.2, 4, method)
+        assert len(selected) == 8
+        assert np.all(np.diff(selected) > 0)
+        assert np.bincount(selected // 10, minlength=4).tolist() == [2, 2, 2, 2]
+
+def test_stratified_select_keeps_one_per_stratum():
+    features: np.ndarray = get_clusters()
+    energies: np.ndarray = np.repeat([-3.0, -2.0, -1.0], 5)
+    assert len(stratified_select(features, energies, 0.01, 3)) == 3
+
+def test_stratified_select_unknown_method():
+    with pytest.raises(ValueError):
+        stratified_select(get_clusters(), np.zeros(15), 0.5, 2, 'random')
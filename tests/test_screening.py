@@ -0,0 +1,64 @@
+"""
+Tests of the checks of the screening results.
+"""
+
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from potline.experiment.screening.screening import Screener
+
+RESULTS: str = '''a0 = 2.831000 angstrom
+Elastic Constant C11all = 243.5 GPa
+Elastic Constant C12all = 1.38e+02 GPa
+Elastic Constant C44all = 116.0 GPa
+Bulk Modulus = 173.0 GPa
+'''
+REF_VALUES: dict[str, float] = {'a0': 2.83, 'c11': 243.0, 'c12': 138.0, 'c44': 122.0}
+
+def get_screener() -> Screener:
+    screener = Screener.__new__(Screener)
+    screener._screen_config = SimpleNamespace( # pylint: disable=protected-access
+        a0_tolerance=0.01, elastic_tolerance=0.02, max_energy_drift=1e-3)
+    return screener
+
+def write_run(run_path: Path, results: str | None, drift: float | None) -> None:
+    data_path: Path = run_path / 'data'
+    data_path.mkdir(parents=True)
+    (data_path / 'smoke.dat').write_text('0 0\n', encoding='utf-8')
+    if results is not None:
+        (data_path / 'results.txt').write_text(results, encoding='utf-8')
+    if drift is not None:
+        time: np.ndarray = np.linspace(0, 10, 11)
+        np.savetxt(data_path / 'nve.dat', np.column_stack([time, -4 + drift * time]), header='t etotal')
+
+@pytest.mark.parametrize('prop, value', [('a0', 2.831), ('c11', 243.5), ('c12', 138.0), ('c44', 116.0)])
+def test_results_patterns(prop: str, value: float):
+    match = Screener.RESULTS_PATTERNS[prop].search(RESULTS)
+    assert match is not None
+    assert float(match.group(1)) == pytest.approx(value)
+
+def test_energy_drift_is_the_slope(tmp_path: Path):
+    write_run(tmp_path, None, -2e-4)
+    assert Screener._energy_drift(tmp_path / 'data' / 'nve.dat') == pytest.approx(2e-4) # pylint: disable=protected-access
+
+def test_energy_drift_rejects_non_finite(tmp_path: Path):
+    (tmp_path / 'nve.dat').write_text('0 -4\n1 nan\n', encoding='utf-8')
+    assert Screener._energy_drift(tmp_path / 'nve.dat') is None # pylint: disable=protected-access
+
+def test_check_run(tmp_path: Path):
+    write_run(tmp_path, RESULTS, 1e-4)
+    checks: dict[str, str] = get_screener()._check_run(tmp_path, REF_VALUES) # pylint: disable=protected-access
+    assert checks['smoke'] == checks['a0'] == checks['c11'] == checks['c12'] == checks['drift'] == 'passed'
+    assert checks['c44'].startswith('relative error')
+
+def test_check_run_without_results(tmp_path: Path):
+    write_run(tmp_path, None, None)
+    checks: dict[str, str] = get_screener()._check_run(tmp_path, REF_VALUES) # pylint: disable=protected-access
+    assert checks == {'smoke': 'passed', 'a0': 'no result', 'c11': 'no result', 'c12': 'no result',
+                      'c44': 'no result', 'drift': 'no result'}
+
+def test_failed_smoke_test(tmp_path: Path):
+    assert get_screener()._check_run(tmp_path, REF_VALUES) == {'smoke': 'no result'} # pylint: disable=protected-access
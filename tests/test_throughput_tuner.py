@@ -0,0 +1,85 @@
+"""
+Tests of the calibration runs of the throughput tuning and of the choice of the settings.
+"""
+
+import json
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+import yaml
+
+from potline.dispatcher import FIRST_STEP_FILE_NAME
+from potline.hyper_searcher.throughput_tuner import (
+    ThroughputTuner, apply_settings, write_env, get_throughput, TUNING_INFO_NAME, BEST_SETTINGS_NAME)
+
+KNOBS: dict[str, list] = {'batch_size': [16, 32, 16], 'num_workers': [0, 4], 'OMP_NUM_THREADS': [8]}
+
+def get_tuner(out_path: Path, cpu: bool = True, repeats: int = 2,
+              noise_margin: float = 0.05) -> ThroughputTuner:
+    tuner = ThroughputTuner.__new__(ThroughputTuner)
+    tuner._tune_config = SimpleNamespace( # pylint: disable=protected-access
+        knobs=KNOBS, cpu=cpu, repeats=repeats, noise_margin=noise_margin)
+    tuner._out_path = out_path # pylint: disable=protected-access
+    return tuner
+
+def test_knobs_without_duplicates_or_single_values(tmp_path: Path):
+    assert get_tuner(tmp_path).get_knobs() == {'batch_size': [16, 32], 'num_workers': [0, 4]}
+
+def test_candidates(tmp_path: Path):
+    candidates: list[dict] = get_tuner(tmp_path).get_candidates()
+    # baseline and one other value of each setting, repeated, on the device and on the CPU
+    assert len(candidates) == 3 * 2 * 2
+    assert [c['device'] for c in candidates[:6]] == ['device'] * 6
+    assert [(c['knob'], c['repeat']) for c in candidates[:6]] == [
+        ('baseline', 0), ('baseline', 1), ('batch_size', 0), ('batch_size', 1),
+        ('num_workers', 0), ('num_workers', 1)]
+    assert candidates[0]['settings'] == {'batch_size': 16, 'num_workers': 0}
+    assert candidates[2]['settings'] == {'batch_size': 32, 'num_workers': 0}
+    assert candidates[4]['settings'] == {'batch_size': 16, 'num_workers': 4}
+    assert len(get_tuner(tmp_path, cpu=False, repeats=1).get_candidates()) == 3
+
+def test_apply_settings():
+    config: dict = {'fit': {'batch_size': 8}, 'seed': 1}
+    tuned: dict = apply_settings(config, {'fit.batch_size': 32, 'backend.gpu_config.mem_limit': 8000,
+                                          'TF_NUM_INTEROP_THREADS': 2})
+    assert tuned == {'fit': {'batch_size': 32}, 'seed': 1, 'backend': {'gpu_config': {'mem_limit': 8000}}}
+    assert config == {'fit': {'batch_size': 8}, 'seed': 1}
+
+def test_write_env(tmp_path: Path):
+    write_env(tmp_path / 'runtime.env', {'fit.batch_size': 32, 'TF_NUM_INTEROP_THREADS': 2})
+    assert (tmp_path / 'runtime.env').read_text(encoding='utf-8') == 'export TF_NUM_INTEROP_THREADS=2\n'
+
+@pytest.mark.parametrize('speeds, expected', [
+    # samples/s of the runs of the baseline, batch_size=32 and num_workers=4, two repeats each
+    ([100, 100, 104, 104, 120, 118], {'batch_size': 16, 'num_workers': 4}),
+    ([100, 100, 120, 118, 101, 103], {'batch_size': 32, 'num_workers': 0}),
+    # a noisy baseline raises the margin above noise_margin
+    ([80, 120, 115, 115, 90, 90], {'batch_size': 16, 'num_workers': 0}),
+])
+def test_collect_requires_a_margin(tmp_path: Path, speeds: list[float], expected: dict):
+    tuner: ThroughputTuner = get_tuner(tmp_path, cpu=False)
+    with (tmp_path / TUNING_INFO_NAME).open('w', encoding='utf-8') as file:
+        yaml.safe_dump({'train_size': 100, 'maxiter': 10}, file)
+    for i, speed in enumerate(speeds):
+        run_path: Path = tmp_path / str(i + 1)
+        run_path.mkdir()
+        # 1000 samples in 1000 / speed seconds after the first step
+        (run_path / FIRST_STEP_FILE_NAME).write_text(json.dumps(
+            {'time_to_first_step': 5.0, 'elapsed': 5.0 + 1000 / speed, 'exit_code': 0}), encoding='utf-8')
+    assert tuner.collect() == expected
+    with (tmp_path / BEST_SETTINGS_NAME).open('r', encoding='utf-8') as file:
+        assert yaml.safe_load(file) == expected
+
+def test_throughput_of_the_epochs_trained(tmp_path: Path):
+    # a run resumed at epoch 80 of 100 trains 20 epochs in 40 s
+    (tmp_path / FIRST_STEP_FILE_NAME).write_text(json.dumps(
+        {'time_to_first_step': 10.0, 'elapsed': 50.0, 'epochs': 20, 'exit_code': 0}), encoding='utf-8')
+    throughput: dict | None = get_throughput(tmp_path, 100, 100)
+    assert throughput is not None
+    assert throughput['samples_per_s'] == pytest.approx(50.0)
+    assert throughput['s_per_epoch'] == pytest.approx(2.0)
+    # without a count, the epochs of the configuration are used
+    (tmp_path / FIRST_STEP_FILE_NAME).write_text(json.dumps(
+        {'time_to_first_step': 10.0, 'elapsed': 50.0, 'exit_code': 0}), encoding='utf-8')
+    assert get_throughput(tmp_path, 100, 100)['epochs'] == 100
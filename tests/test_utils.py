@@ -0,0 +1,52 @@
+"""
+Tests of the selection of the best models.
+"""
+
+import math
+from pathlib import Path
+
+import pytest
+
+from potline import utils
+
+class Tracker():
+    """
+    Model tracker with a fixed validation loss.
+    """
+    def __init__(self, iteration: int, loss: float):
+        self.iteration = iteration
+        self.subiter = 0
+        self.loss = loss
+
+    def get_total_valid_loss(self, energy_weight: float) -> float:
+        return self.loss * energy_weight
+
+class Predictor():
+    """
+    Q-factor predictor with fixed predictions per iteration.
+    """
+    def __init__(self, predictions: dict[int, tuple[float, float]]):
+        self.predictions = predictions
+
+    def predict(self, trackers: list[Tracker]) -> list[tuple[float, float]]:
+        return [self.predictions[tracker.iteration] for tracker in trackers]
+
+TRACKERS: list[Tracker] = [Tracker(1, 0.3), Tracker(2, 0.1), Tracker(3, 0.2), Tracker(4, 0.4)]
+
+def get_iterations(trackers: list) -> list[int]:
+    return [tracker.iteration for tracker in trackers]
+
+def test_lowest_losses_first():
+    assert get_iterations(utils.filter_best_loss(TRACKERS, 0.5, 2)) == [2, 3]
+
+def test_all_models_when_not_enough():
+    assert get_iterations(utils.filter_best_loss(TRACKERS, 0.5, 10)) == [2, 3, 1, 4]
+
+@pytest.mark.parametrize('margin, expected', [(0.0, [4, 1]), (1.0, [4, 3]), (10.0, [3, 4])])
+def test_ranking_by_optimistic_q_factor(monkeypatch: pytest.MonkeyPatch, margin: float, expected: list[int]):
+    # predicted log q-factor and standard deviation, the lowest optimistic value is the best
+    predictor = Predictor({1: (math.log(2.0), 0.0), 2: (math.log(5.0), 0.1), 3: (math.log(3.0), 0.5),
+                           4: (math.log(1.5), 0.2)})
+    monkeypatch.setattr(utils.QFactorPredictor, 'load', lambda _: predictor)
+    selected = utils.filter_best_loss(TRACKERS, 0.5, 2, Path('predictor.pkl'), margin)
+    assert get_iterations(selected) == expected